@@ -0,0 +1,125 @@
+"""
+Admission Control
+
+Keeps bursts of refresh requests from turning into a pile of agent runs.
+
+- RateLimiter: a token bucket per client, so one client clicking refresh
+  over and over is turned away after a short burst.
+- RunBudget: a token bucket of agent runs for the whole process, so many
+  clients clicking in turn can't spend the model quota either. The last few
+  runs of the bucket are reserved for one kind of refresh (scheduled
+  revalidation by default, or manual clicks), so when runs get scarce that
+  kind still gets to start one while the other is turned away.
+
+Neither limits runs that are already going: NewsCache runs one refresh at a
+time per process (and one across processes with a SharedSnapshotStore), and
+every refresh requested meanwhile joins it at no cost. Both answer with a
+Retry-After estimate so the HTTP layer can reply 429.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class Saturated(Exception):
+    """A refresh was refused because the agent run budget is spent"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Agent run budget is spent, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token bucket per client"""
+
+    def __init__(self, rate, burst, max_clients=10000):
+        """
+        Args:
+            rate: Tokens added per second (sustained requests per second)
+            burst: Bucket size (requests allowed back to back)
+            max_clients: Buckets kept; the least recently seen are dropped
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, client):
+        """
+        Take a token for a client.
+
+        Returns:
+            0 if the request is allowed, otherwise the whole seconds until
+            the client's next token
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = max(1, math.ceil((1 - tokens) / self.rate))
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RunBudget:
+    """Token bucket of agent runs with a reserve for the priority kind of refresh"""
+
+    def __init__(self, rate, burst, reserve=0, priority="scheduled"):
+        """
+        Args:
+            rate: Runs added per second (sustained runs per second)
+            burst: Bucket size (runs allowed back to back)
+            reserve: Runs at the bottom of the bucket only the priority kind
+                may start
+            priority: Kind of refresh that may use the reserve, "scheduled"
+                or "manual"
+        """
+        self.rate = rate
+        self.burst = burst
+        self.reserve = reserve
+        self.priority = priority
+        self.started = {"scheduled": 0, "manual": 0}
+        self.refused = {"scheduled": 0, "manual": 0}
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, kind):
+        """
+        Take a run for a refresh of the given kind.
+
+        Returns:
+            0 if the run may start, otherwise the whole seconds until a run
+            of this kind could
+        """
+        needed = 1 if kind == self.priority else 1 + self.reserve
+        now = time.monotonic()
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= needed:
+                self._tokens -= 1
+                self.started[kind] = self.started.get(kind, 0) + 1
+                return 0
+            self.refused[kind] = self.refused.get(kind, 0) + 1
+            return max(1, math.ceil((needed - self._tokens) / self.rate))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "available": round(min(self.burst, self._tokens + (time.monotonic() - self._updated) * self.rate), 2),
+                "burst": self.burst,
+                "reserve": self.reserve,
+                "priority": self.priority,
+                "started": dict(self.started),
+                "refused": dict(self.refused),
+            }
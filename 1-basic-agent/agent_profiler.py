@@ -0,0 +1,373 @@
+"""
+Per-Agent Profiler
+
+Records wall time, model time, tool time and input/output tokens for every
+agent invocation in a run and rolls them up per agent. It hooks into the
+agent callbacks of a whole graph: sub-agents, workflow agents (sequential,
+parallel, loop) and agents wrapped in an AgentTool, which run as a separate
+invocation inside the caller's tool call.
+
+Existing callbacks keep working: the profiler wraps them instead of
+replacing them, and notes when one of them answers in place of the model or
+a tool (e.g. a cache hit or a skipped search).
+
+A run that is cancelled (e.g. at its deadline) never reaches its
+after_agent callbacks; run it inside scope() so its open spans are closed
+and the run is still recorded.
+
+Usage:
+    profiler = AgentProfiler()
+    profiler.instrument(root_agent)
+    with profiler.scope():
+        ... run the agent ...
+    print(format_run(profiler.last_run()))
+"""
+
+import contextvars
+import inspect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from agent_utils import iter_agents
+
+# Span of the agent whose callbacks are running, used as the parent of any
+# agent started below it (including AgentTool runs, which get a new invocation)
+_current_span = contextvars.ContextVar("agent_profiler_span", default=None)
+
+# Runs started inside the innermost scope(), closed when it exits
+_scope_runs = contextvars.ContextVar("agent_profiler_scope", default=None)
+
+
+def _chain(original, before=None, after=None):
+    """
+    Callback that runs before(**kwargs), then the original callback(s) until
+    one returns a value, then after(result, **kwargs).
+
+    Stays synchronous unless an original callback is async, so it works with
+    ADK releases that do not await callbacks.
+    """
+    callbacks = list(original) if isinstance(original, (list, tuple)) else [original] if original else []
+
+    async def finish(pending, remaining, kwargs):
+        result = await pending
+        for callback in remaining:
+            if result is not None:
+                break
+            result = callback(**kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+        if after is not None:
+            after(result, **kwargs)
+        return result
+
+    def callback(**kwargs):
+        if before is not None:
+            before(**kwargs)
+        result = None
+        for index, current in enumerate(callbacks):
+            result = current(**kwargs)
+            if inspect.isawaitable(result):
+                return finish(result, callbacks[index + 1:], kwargs)
+            if result is not None:
+                break
+        if after is not None:
+            after(result, **kwargs)
+        return result
+
+    return callback
+
+
+class AgentSpan:
+    """One invocation of one agent"""
+
+    def __init__(self, agent, invocation_id, parent, run):
+        self.agent = agent
+        self.invocation_id = invocation_id
+        self.parent = parent
+        self.run = run
+        self.path = f"{parent.path} > {agent}" if parent else agent
+        self.started = time.perf_counter()
+        self.ended = None
+        self.model_seconds = 0.0
+        self.model_calls = 0
+        self.model_skipped = 0
+        self.tool_seconds = 0.0
+        self.tool_calls = 0
+        self.tool_skipped = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.model_started = None
+        self.tools_started = {}
+
+    @property
+    def seconds(self):
+        return (self.ended or time.perf_counter()) - self.started
+
+
+class AgentRun:
+    """All agent spans started under one top-level agent invocation"""
+
+    def __init__(self):
+        self.spans = []
+
+    def summary(self):
+        """Run totals plus per-agent totals, in the order agents first ran"""
+        root = self.spans[0]
+        agents = {}
+        for span in self.spans:
+            totals = agents.get(span.agent)
+            if totals is None:
+                totals = agents[span.agent] = {
+                    "path": span.path,
+                    "invocations": 0,
+                    "seconds": 0.0,
+                    "model_seconds": 0.0,
+                    "model_calls": 0,
+                    "model_skipped": 0,
+                    "tool_seconds": 0.0,
+                    "tool_calls": 0,
+                    "tool_skipped": 0,
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                }
+            totals["invocations"] += 1
+            totals["seconds"] += span.seconds
+            for key in ("model_seconds", "model_calls", "model_skipped", "tool_seconds",
+                        "tool_calls", "tool_skipped", "input_tokens", "output_tokens"):
+                totals[key] += getattr(span, key)
+        for totals in agents.values():
+            for key in ("seconds", "model_seconds", "tool_seconds"):
+                totals[key] = round(totals[key], 4)
+        return {
+            "agent": root.agent,
+            "seconds": round(root.seconds, 4),
+            "model_seconds": round(sum(span.model_seconds for span in self.spans), 4),
+            "model_calls": sum(span.model_calls for span in self.spans),
+            "input_tokens": sum(span.input_tokens for span in self.spans),
+            "output_tokens": sum(span.output_tokens for span in self.spans),
+            "agents": agents,
+        }
+
+
+class AgentProfiler:
+    """Per-agent latency and token accounting through agent callbacks"""
+
+    def __init__(self, history=50, on_run=None):
+        """
+        Args:
+            history: Number of recent run summaries kept
+            on_run: Optional function called with each finished run's summary
+        """
+        self.on_run = on_run
+        self._runs = deque(maxlen=history)
+        self._open = {}
+        self._instrumented = set()
+        self._lock = threading.Lock()
+
+    def instrument(self, agent):
+        """Add profiling callbacks to an agent and every agent below it"""
+        for current in iter_agents(agent):
+            if id(current) in self._instrumented:
+                continue
+            self._instrumented.add(id(current))
+            current.before_agent_callback = _chain(
+                current.before_agent_callback, before=self._agent_started, after=self._agent_answered
+            )
+            current.after_agent_callback = _chain(
+                current.after_agent_callback, before=self._agent_finished
+            )
+            if not hasattr(current, "before_model_callback"):
+                continue  # workflow agents have no model or tools of their own
+            current.before_model_callback = _chain(
+                current.before_model_callback, before=self._model_started, after=self._model_answered
+            )
+            current.after_model_callback = _chain(
+                current.after_model_callback, before=self._model_finished
+            )
+            current.before_tool_callback = _chain(
+                current.before_tool_callback, before=self._tool_started, after=self._tool_answered
+            )
+            current.after_tool_callback = _chain(
+                current.after_tool_callback, before=self._tool_finished
+            )
+        return agent
+
+    @contextmanager
+    def scope(self):
+        """
+        Close the spans of the runs started in the block when it exits.
+
+        A cancelled run leaves its spans open; they are ended at the time the
+        block exits, and the run is recorded as if its agents had finished.
+        """
+        runs = []
+        token = _scope_runs.set(runs)
+        try:
+            yield
+        finally:
+            _scope_runs.reset(token)
+            for run in runs:
+                self._close(run)
+
+    def _close(self, run):
+        unfinished = [span for span in run.spans if span.ended is None]
+        if not unfinished:
+            return
+        now = time.perf_counter()
+        for span in unfinished:
+            self._open.pop((span.invocation_id, span.agent), None)
+            span.ended = now
+        if run.spans[0] in unfinished:
+            self._record(run)
+
+    def runs(self):
+        """Summaries of recent runs, oldest first"""
+        with self._lock:
+            return list(self._runs)
+
+    def last_run(self):
+        """Summary of the most recent run, or None"""
+        with self._lock:
+            return self._runs[-1] if self._runs else None
+
+    def mean(self):
+        """Average of the recent runs, in the same shape as a run summary, or None"""
+        runs = self.runs()
+        if not runs:
+            return None
+
+        def average(totals_list):
+            combined = {}
+            for totals in totals_list:
+                for key, value in totals.items():
+                    if isinstance(value, str):
+                        combined.setdefault(key, value)
+                    elif isinstance(value, (int, float)):
+                        combined[key] = combined.get(key, 0) + value
+            return {
+                key: value if isinstance(value, str) else round(value / len(runs), 4)
+                for key, value in combined.items()
+            }
+
+        names = list(dict.fromkeys(name for run in runs for name in run["agents"]))
+        summary = average(runs)
+        summary["runs"] = len(runs)
+        summary["agents"] = {
+            name: average(run["agents"][name] for run in runs if name in run["agents"])
+            for name in names
+        }
+        return summary
+
+    # --- Agent invocations ---
+
+    def _span(self, context):
+        return self._open.get((context.invocation_id, context.agent_name))
+
+    def _agent_started(self, callback_context):
+        parent = _current_span.get()
+        if parent is not None:
+            run = parent.run
+        else:
+            run = AgentRun()
+            runs = _scope_runs.get()
+            if runs is not None:
+                runs.append(run)
+        span = AgentSpan(callback_context.agent_name, callback_context.invocation_id, parent, run)
+        run.spans.append(span)
+        self._open[(span.invocation_id, span.agent)] = span
+        _current_span.set(span)
+
+    def _agent_answered(self, result, callback_context):
+        if result is not None:
+            # The callback answered for the agent, which will not run
+            self._agent_finished(callback_context)
+
+    def _agent_finished(self, callback_context):
+        span = self._open.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        if span is None:
+            return
+        span.ended = time.perf_counter()
+        _current_span.set(span.parent)
+        if span.parent is None:
+            self._record(span.run)
+
+    def _record(self, run):
+        summary = run.summary()
+        with self._lock:
+            self._runs.append(summary)
+        if self.on_run is not None:
+            self.on_run(summary)
+
+    # --- Model calls ---
+
+    def _model_started(self, callback_context, llm_request):
+        span = self._span(callback_context)
+        if span is not None:
+            span.model_started = time.perf_counter()
+
+    def _model_answered(self, result, callback_context, llm_request):
+        span = self._span(callback_context)
+        if span is not None and result is not None:
+            # A callback answered instead of the model (e.g. a cache hit)
+            span.model_started = None
+            span.model_skipped += 1
+
+    def _model_finished(self, callback_context, llm_response):
+        span = self._span(callback_context)
+        if span is None or span.model_started is None or llm_response.partial:
+            return
+        span.model_seconds += time.perf_counter() - span.model_started
+        span.model_started = None
+        span.model_calls += 1
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            span.input_tokens += usage.prompt_token_count or 0
+            span.output_tokens += usage.candidates_token_count or 0
+
+    # --- Tool calls ---
+
+    @staticmethod
+    def _tool_key(tool, tool_context):
+        return getattr(tool_context, "function_call_id", None) or tool.name
+
+    def _tool_started(self, tool, args, tool_context):
+        span = self._span(tool_context)
+        if span is not None:
+            span.tools_started[self._tool_key(tool, tool_context)] = time.perf_counter()
+
+    def _tool_answered(self, result, tool, args, tool_context):
+        span = self._span(tool_context)
+        if span is not None and result is not None:
+            # A callback answered instead of the tool (e.g. a spent search budget)
+            span.tools_started.pop(self._tool_key(tool, tool_context), None)
+            span.tool_skipped += 1
+
+    def _tool_finished(self, tool, args, tool_context, tool_response):
+        span = self._span(tool_context)
+        if span is None:
+            return
+        started = span.tools_started.pop(self._tool_key(tool, tool_context), None)
+        if started is not None:
+            span.tool_seconds += time.perf_counter() - started
+            span.tool_calls += 1
+
+
+def format_run(summary):
+    """Text table of a run summary (or of mean()), one line per agent"""
+    if not summary:
+        return "no runs recorded"
+    lines = [
+        f"{summary['agent']}: {summary['seconds'] * 1000:.0f}ms, {summary['model_calls']:g} model calls, "
+        f"{summary['input_tokens']:.0f} in / {summary['output_tokens']:.0f} out tokens",
+        f"  {'agent':<48} {'runs':>5} {'wall':>9} {'model':>9} {'tool':>9} {'in tok':>7} {'out tok':>7}",
+    ]
+    for name, totals in summary["agents"].items():
+        label = "  " * totals["path"].count(" > ") + name
+        lines.append(
+            f"  {label:<48} {totals['invocations']:>5g} "
+            f"{totals['seconds'] * 1000:>7.0f}ms {totals['model_seconds'] * 1000:>7.0f}ms "
+            f"{totals['tool_seconds'] * 1000:>7.0f}ms {totals['input_tokens']:>7.0f} {totals['output_tokens']:>7.0f}"
+        )
+    return "\n".join(lines)
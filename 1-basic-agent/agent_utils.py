@@ -0,0 +1,29 @@
+"""
+Agent Graph Helpers
+
+Walks an ADK agent graph the way a run reaches it: sub-agents, workflow
+agents and agents wrapped in an AgentTool. Used by the app, the profiler and
+the fake LLM, none of which should depend on the others for it.
+
+Usage:
+    from agent_utils import iter_agents
+    names = [agent.name for agent in iter_agents(root_agent)]
+"""
+
+from google.adk.tools.agent_tool import AgentTool
+
+
+def iter_agents(agent):
+    """Yield an agent and everything below it, including AgentTool agents"""
+    seen = set()
+    pending = [agent]
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        pending.extend(getattr(current, "sub_agents", None) or [])
+        for tool in getattr(current, "tools", None) or []:
+            if isinstance(tool, AgentTool):
+                pending.append(tool.agent)
@@ -0,0 +1,72 @@
+"""
+Persistent Agent Event Loop
+
+Runs one long-lived asyncio event loop on a background thread and accepts
+coroutines from any thread. Every agent run shares the same loop, so the
+Runner, its session service and the Gemini client's HTTP connections are
+reused across requests instead of being torn down with a per-request loop.
+"""
+
+import asyncio
+import threading
+
+
+class AgentWorker:
+    """Background thread that owns an asyncio event loop for agent runs"""
+
+    def __init__(self, name="agent-worker"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+
+    def start(self):
+        """Start the loop thread if it isn't running yet"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            return loop
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the worker loop from any thread.
+
+        Returns:
+            concurrent.futures.Future resolving to the coroutine's result
+        """
+        loop = self.start()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the worker loop and block until it finishes"""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self):
+        """Stop the loop and wait for the thread to exit"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -1,11 +1,29 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
 from flask_cors import CORS
 import asyncio
+import json
+import queue
+import threading
+import time
 import uuid
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+from admission import RateLimiter, RunBudget, Saturated
+from agent_worker import AgentWorker
+from dedup import SimHashIndex
+from feed_scheduler import FeedScheduler
+from feeds import DEFAULT_FEEDS, FeedPoller
+from headline_store import HeadlineStore
+from http_cache import conditional_response
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Registry
+from news_cache import NewsCache
+from news_parser import ArticleObjectStream, NewsStreamParser, parse_news_text, parse_structured_articles
+from news_session import NewsSessionManager
+from shared_cache import SharedSnapshotStore
+from topics import TopicViews, item_topics, match_topics, parse_topic_assignments, select_per_topic
+
 # Load environment variables from greeting_agent directory
 env_path = os.path.join(os.path.dirname(__file__), 'greeting_agent', '.env')
 load_dotenv(env_path)
@@ -13,92 +31,187 @@ load_dotenv(env_path)
 app = Flask(__name__)
 CORS(app)
 
-# Simplified approach - try to import and handle gracefully
-try:
-    from greeting_agent.agent import root_agent
-    from google.adk.runners import Runner
-    from google.adk.sessions import InMemorySessionService
-    from google.genai import types
-    
-    # Check if API key is available
-    api_key = os.getenv('GOOGLE_API_KEY')
-    if not api_key:
-        print("⚠️  Warning: GOOGLE_API_KEY not found in environment variables")
-        print("📝 Please create a .env file with your Google API key")
-        print("   1. Copy .env.example to .env")
-        print("   2. Add your Google API key to GOOGLE_API_KEY")
-        print("   3. Get your API key from: https://aistudio.google.com/app/apikey")
-        ADK_AVAILABLE = False
-    else:
-        # Initialize session service and runner
-        session_service = InMemorySessionService()
-        runner = Runner(
-            agent=root_agent,
-            app_name="AI_News_Assistant",
-            session_service=session_service,
-        )
-        
-        # Global session management
-        GLOBAL_SESSION_ID = None
-        GLOBAL_USER_ID = "news_ticker_user"
-        ADK_AVAILABLE = True
-    
-except ImportError as e:
-    print(f"ADK imports failed: {e}")
-    print("Running in mock mode - install dependencies first")
-    ADK_AVAILABLE = False
-    root_agent = None
-    session_service = None
-    runner = None
-
-def get_or_create_session():
-    """Get or create a global session for the news ticker"""
-    if not ADK_AVAILABLE:
-        return "mock_session"
-        
-    global GLOBAL_SESSION_ID
+# Long-lived event loop shared by every agent run
+agent_worker = AgentWorker()
+
+# Seconds a cached headline snapshot is served before it is revalidated
+NEWS_CACHE_TTL = float(os.getenv('NEWS_CACHE_TTL', '300'))
+
+# Responses smaller than this are sent uncompressed
+NEWS_COMPRESS_MIN_BYTES = int(os.getenv('NEWS_COMPRESS_MIN_BYTES', '500'))
+
+# SQLite archive of every headline the agent has returned
+NEWS_ARCHIVE_PATH = os.getenv(
+    'NEWS_ARCHIVE_PATH', os.path.join(os.path.dirname(__file__), 'news_archive.db')
+)
+
+# Number of headlines shown on the ticker
+NEWS_TICKER_SIZE = int(os.getenv('NEWS_TICKER_SIZE', '5'))
+
+# Comma-separated ticker topics served at /api/news?topic=<name>, the first
+# being the default. One refresh fetches the news of every topic and labels
+# the new headlines with their topics in a single classifier call.
+NEWS_TOPICS = [topic.strip() for topic in os.getenv('NEWS_TOPICS', 'AI').split(',') if topic.strip()] or ['AI']
+
+# Headlines whose SimHash fingerprints differ in at most this many bits are
+# treated as the same story; NEWS_DEDUP_CAPACITY bounds the fingerprint index
+NEWS_DEDUP_DISTANCE = int(os.getenv('NEWS_DEDUP_DISTANCE', '6'))
+NEWS_DEDUP_CAPACITY = int(os.getenv('NEWS_DEDUP_CAPACITY', '10000'))
+
+# Most headlines returned by one /api/news?since= request
+NEWS_DELTA_LIMIT = int(os.getenv('NEWS_DELTA_LIMIT', '100'))
+
+# How the ticker session is rotated: "refresh" (new session per refresh)
+# or "window" (reuse a session for NEWS_SESSION_MAX_TURNS refreshes)
+NEWS_SESSION_POLICY = os.getenv('NEWS_SESSION_POLICY', 'refresh')
+NEWS_SESSION_MAX_TURNS = int(os.getenv('NEWS_SESSION_MAX_TURNS', '3'))
+
+# Seconds between keep-alive comments on idle /api/news/stream connections
+NEWS_STREAM_HEARTBEAT = float(os.getenv('NEWS_STREAM_HEARTBEAT', '15'))
+
+# Agent graph the ticker runs: "parallel" (search all source groups at once,
+# then format) or "orchestrated" (the root agent calls the search tool per group)
+NEWS_PIPELINE = os.getenv('NEWS_PIPELINE', 'parallel')
+
+# SQLite file shared by every worker process so they serve one headline
+# snapshot and run one refresh between them (unset = per-process cache). The
+# refreshing worker renews its lease while the refresh runs; the TTL is how
+# long a worker that dies mid-refresh holds up the others.
+NEWS_SHARED_CACHE_PATH = os.getenv('NEWS_SHARED_CACHE_PATH', '')
+NEWS_REFRESH_LEASE_TTL = float(os.getenv('NEWS_REFRESH_LEASE_TTL', '30'))
+
+# Run the real agent pipeline against scripted fake models (no API key or
+# network needed); latency is per model call, chunk delay per streamed chunk
+NEWS_FAKE_LLM = os.getenv('NEWS_FAKE_LLM', '').lower() in ('1', 'true', 'yes')
+NEWS_FAKE_LLM_LATENCY = float(os.getenv('NEWS_FAKE_LLM_LATENCY', '0.5'))
+NEWS_FAKE_LLM_CHUNK_DELAY = float(os.getenv('NEWS_FAKE_LLM_CHUNK_DELAY', '0.02'))
+
+# Where refreshes get their articles: "search" (the search agents) or "feeds"
+# (poll the sources' RSS/Atom feeds and format only new entries in one model
+# call, searching instead only when every feed fails). NEWS_FEEDS is a
+# comma-separated list of feed URLs (http, https or file) and defaults to the
+# AI feeds of the sources the search specialist covers, so it has to be set to
+# feeds covering any other topic. NEWS_FEED_MAX_ENTRIES caps the entries
+# read per feed and the new entries, newest first, that go to the formatter
+# per refresh; the rest are formatted by the next refresh.
+NEWS_INGEST = os.getenv('NEWS_INGEST', 'search')
+NEWS_FEEDS = [url.strip() for url in os.getenv('NEWS_FEEDS', '').split(',') if url.strip()] or list(DEFAULT_FEEDS)
+NEWS_FEED_TIMEOUT = float(os.getenv('NEWS_FEED_TIMEOUT', '10'))
+NEWS_FEED_MAX_AGE = float(os.getenv('NEWS_FEED_MAX_AGE', '86400'))
+NEWS_FEED_MAX_ENTRIES = int(os.getenv('NEWS_FEED_MAX_ENTRIES', '30'))
+
+# How feeds are polled in feeds mode: "adaptive" polls each feed in the
+# background on its own interval, learned from its publish rate in the feed
+# and the archive (between the min and max interval, backing off on errors),
+# and refreshes the ticker when new entries arrive; "refresh" polls every
+# feed on every refresh. At most NEWS_FEED_MAX_CONCURRENT feed requests run
+# at once.
+NEWS_FEED_SCHEDULE = os.getenv('NEWS_FEED_SCHEDULE', 'adaptive')
+NEWS_FEED_MIN_INTERVAL = float(os.getenv('NEWS_FEED_MIN_INTERVAL', '60'))
+NEWS_FEED_MAX_INTERVAL = float(os.getenv('NEWS_FEED_MAX_INTERVAL', '3600'))
+NEWS_FEED_MAX_CONCURRENT = int(os.getenv('NEWS_FEED_MAX_CONCURRENT', '4'))
+
+# Hard limit in seconds on one agent run (0 = none). When it passes, the run
+# and its searches are cancelled and the headlines found so far are served,
+# marked as partial. A multi-topic refresh classifies its headlines within
+# whatever time the run left.
+NEWS_RUN_DEADLINE = float(os.getenv('NEWS_RUN_DEADLINE', '120'))
+
+# How the agent graph is loaded: "eager" (before the app serves anything) or
+# "background" (serve / and cached headlines right away while google.adk and
+# the agents are imported on a thread). NEWS_WARMUP sends a one-token model
+# request once the agents are loaded, so the first refresh finds an open connection.
+NEWS_STARTUP = os.getenv('NEWS_STARTUP', 'eager')
+NEWS_WARMUP = os.getenv('NEWS_WARMUP', '').lower() in ('1', 'true', 'yes')
+
+# Manual refreshes allowed per client: sustained rate per minute and burst.
+# Clients are told apart by IP, or by NEWS_CLIENT_IP_HEADER (e.g.
+# X-Forwarded-For) when the app runs behind a proxy.
+NEWS_REFRESH_RATE = float(os.getenv('NEWS_REFRESH_RATE', '6'))
+NEWS_REFRESH_BURST = int(os.getenv('NEWS_REFRESH_BURST', '3'))
+NEWS_CLIENT_IP_HEADER = os.getenv('NEWS_CLIENT_IP_HEADER', '')
+if NEWS_REFRESH_RATE <= 0 or NEWS_REFRESH_BURST < 1:
+    raise ValueError("NEWS_REFRESH_RATE and NEWS_REFRESH_BURST must be greater than 0")
+
+# Agent runs this process may start per hour, across all clients (0 = no
+# limit), and how many back to back. The last NEWS_RUN_RESERVE runs of the
+# budget are kept for NEWS_REFRESH_PRIORITY refreshes: "scheduled" (the
+# background revalidation keeps the ticker fresh while clicks get a 429) or
+# "manual" (clicks still start a run while revalidation waits). Refreshes
+# that join a run already going never use the budget.
+NEWS_RUN_RATE = float(os.getenv('NEWS_RUN_RATE', '0'))
+NEWS_RUN_BURST = int(os.getenv('NEWS_RUN_BURST', '10'))
+NEWS_RUN_RESERVE = int(os.getenv('NEWS_RUN_RESERVE', '2'))
+NEWS_REFRESH_PRIORITY = os.getenv('NEWS_REFRESH_PRIORITY', 'scheduled')
+if NEWS_REFRESH_PRIORITY not in ('scheduled', 'manual'):
+    raise ValueError("NEWS_REFRESH_PRIORITY must be 'scheduled' or 'manual'")
+if NEWS_RUN_RATE < 0 or (NEWS_RUN_RATE > 0 and not 0 <= NEWS_RUN_RESERVE < NEWS_RUN_BURST):
+    raise ValueError("NEWS_RUN_RATE must be 0 or more, and NEWS_RUN_RESERVE between 0 and NEWS_RUN_BURST - 1")
+
+# Prometheus metrics served on /metrics; values the app already tracks are
+# read when /metrics is scraped (registered next to the /metrics route)
+metrics = Registry(prefix='news_ticker_')
+http_requests = metrics.counter(
+    'http_requests_total', 'HTTP requests by route, method and status', ['endpoint', 'method', 'status']
+)
+http_request_seconds = metrics.histogram(
+    'http_request_duration_seconds', 'Time to build an HTTP response by route', ['endpoint']
+)
+agent_runs = metrics.counter(
+    'agent_runs_total', 'Agent runs by outcome (ok, deadline, error, mock)', ['outcome']
+)
+agent_run_seconds = metrics.histogram(
+    'agent_run_duration_seconds', 'Wall time of agent runs by outcome', ['outcome']
+)
+agent_runs_in_flight = metrics.gauge('agent_runs_in_flight', 'Agent runs currently in progress')
+agent_seconds = metrics.histogram(
+    'agent_duration_seconds', 'Wall time of each agent within a run', ['agent']
+)
+agent_tokens = metrics.counter(
+    'agent_tokens_total', 'Model tokens by agent and direction (input, output)', ['agent', 'direction']
+)
+searches = metrics.counter('searches_total', 'Searches run or skipped by the search budget', ['result'])
+admission_rejections = metrics.counter(
+    'admission_rejections_total', 'Requests answered 429 by reason (rate_limited, saturated)', ['reason']
+)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    # Route patterns rather than raw paths keep the label set bounded
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    http_requests.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    started = g.get('request_started')
+    if started is not None:
+        http_request_seconds.observe(time.perf_counter() - started, endpoint=endpoint)
+    return response
+
+def record_agent_profile(run):
+    """Log a refresh's per-agent profile and add it to the metrics"""
+    print(f"Agent profile: {run['seconds']:.2f}s, " + ", ".join(  # Debug logging
+        f"{name} {totals['seconds']:.2f}s/{totals['input_tokens'] + totals['output_tokens']} tok"
+        for name, totals in run['agents'].items()
+    ))
+    for name, totals in run['agents'].items():
+        agent_seconds.observe(totals['seconds'], agent=name)
+        agent_tokens.inc(totals['input_tokens'], agent=name, direction='input')
+        agent_tokens.inc(totals['output_tokens'], agent=name, direction='output')
+
+def mock_news_response():
+    """Five placeholder headlines timestamped over the last few hours"""
+    current_time = datetime.now()
     
-    if GLOBAL_SESSION_ID is None:
-        # Create a new session
-        session = session_service.create_session(
-            app_name="AI_News_Assistant",
-            user_id=GLOBAL_USER_ID,
-            state={}
-        )
-        GLOBAL_SESSION_ID = session.id
-        return session.id
+    # Generate realistic timestamps for today
+    time1 = current_time.replace(hour=current_time.hour, minute=current_time.minute)
+    time2 = current_time.replace(hour=max(0, current_time.hour - 1), minute=45)
+    time3 = current_time.replace(hour=max(0, current_time.hour - 2), minute=30)
+    time4 = current_time.replace(hour=max(0, current_time.hour - 3), minute=15)
+    time5 = current_time.replace(hour=max(0, current_time.hour - 4), minute=0)
     
-    # Try to get existing session
-    try:
-        session_service.get_session(
-            app_name="AI_News_Assistant", 
-            user_id=GLOBAL_USER_ID, 
-            session_id=GLOBAL_SESSION_ID
-        )
-        return GLOBAL_SESSION_ID
-    except:
-        # Session not found, create a new one
-        session = session_service.create_session(
-            app_name="AI_News_Assistant",
-            user_id=GLOBAL_USER_ID,
-            state={}
-        )
-        GLOBAL_SESSION_ID = session.id
-        return session.id
-
-async def run_agent_async(user_message):
-    """Run the agent asynchronously"""
-    if not ADK_AVAILABLE:
-        current_time = datetime.now()
-        
-        # Generate realistic timestamps for today
-        time1 = current_time.replace(hour=current_time.hour, minute=current_time.minute)
-        time2 = current_time.replace(hour=max(0, current_time.hour - 1), minute=45)
-        time3 = current_time.replace(hour=max(0, current_time.hour - 2), minute=30)
-        time4 = current_time.replace(hour=max(0, current_time.hour - 3), minute=15)
-        time5 = current_time.replace(hour=max(0, current_time.hour - 4), minute=0)
-        
-        return f"""Date: {time1.strftime('%Y-%m-%d %H:%M')}
+    return f"""Date: {time1.strftime('%Y-%m-%d %H:%M')}
 Source: Mock Source 1
 Headline: [Test] Mock News 1 - This is a test headline
 
@@ -117,142 +230,817 @@ Headline: [Test] Mock News 4 - One more test headline
 Date: {time5.strftime('%Y-%m-%d %H:%M')}
 Source: Mock Source 5
 Headline: [Test] Mock News 5 - Final test headline"""
-    
+
+# Agent graph and runner, filled in by load_agent()
+ADK_AVAILABLE = False
+root_agent = None
+news_agent = None
+news_answer_authors = set()
+news_formatter_authors = set()
+session_service = None
+runner = None
+feed_runner = None
+classifier_runner = None
+news_sessions = None
+NEWS_ARTICLES_KEY = None
+TOPIC_ASSIGNMENTS_KEY = None
+SEARCH_BUDGET_KEY = None
+search_cache = None
+agent_profiler = None
+GLOBAL_USER_ID = "news_ticker_user"
+
+# Set once load_agent() has finished, in real or mock mode
+agent_ready = threading.Event()
+
+def load_agent():
+    """
+    Import google.adk and the agents, then build the runner and sessions.
+
+    Simplified approach - if the imports fail the app keeps running in mock mode.
+    """
+    global ADK_AVAILABLE, root_agent, news_agent, news_answer_authors, news_formatter_authors
+    global session_service, runner, feed_runner
+    global classifier_runner, news_sessions, NEWS_ARTICLES_KEY, TOPIC_ASSIGNMENTS_KEY, SEARCH_BUDGET_KEY
+    global search_cache, agent_profiler
+    global RunConfig, StreamingMode, types, run_deadline
+    started_at = time.perf_counter()
     try:
-        # Use global session management
-        session_id = get_or_create_session()
+        from greeting_agent.agent import (
+            root_agent, news_pipeline, group_searchers, pipeline_formatter, feed_formatter, NEWS_ARTICLES_KEY
+        )
+        from greeting_agent.agent import topic_classifier, TOPIC_ASSIGNMENTS_KEY
+        from greeting_agent.agent import search_budget, search_cache, TARGET_ARTICLES
+        from greeting_agent.search_budget import SEARCH_BUDGET_KEY, run_deadline
+        from google.adk.agents.run_config import RunConfig, StreamingMode
+        from google.adk.runners import Runner
+        from google.adk.sessions import InMemorySessionService
+        from google.genai import types
+        from agent_utils import iter_agents
+        
+        # The parallel pipeline searches every source group at once; the
+        # orchestrated root agent decides which searches to run one by one
+        news_agent = root_agent if NEWS_PIPELINE == 'orchestrated' else news_pipeline
+        
+        # Only the agent writing the final answer is parsed for headlines; the
+        # parallel searchers' raw findings would interleave in the text stream
+        news_answer_authors = {root_agent.name, pipeline_formatter.name}
+        
+        # Formatters whose streamed JSON is read article by article (the
+        # orchestrated root agent's formatter runs inside its tool call, so
+        # its articles only arrive once it has finished)
+        news_formatter_authors = {pipeline_formatter.name, feed_formatter.name}
+        
+        # Searching stops at the target number of articles, which every topic needs
+        search_budget.target_articles = TARGET_ARTICLES * len(NEWS_TOPICS)
+        
+        # Check if API key is available
+        api_key = os.getenv('GOOGLE_API_KEY')
+        if NEWS_FAKE_LLM:
+            from fake_llm import install_fake_llm
+
+            # Same tool calls and state as the real agents, with mock headlines
+            mock_articles = lambda: json.dumps({'articles': parse_news_text(mock_news_response())})
+            install_fake_llm(
+                news_agent,
+                scripts={
+                    root_agent.name: [
+                        {"tool": "news_search_specialist", "args": {"request": "Find today's AI news"}},
+                        {"tool": "news_formatter", "args": {"request": "Format these articles"}},
+                    ],
+                    "news_search_specialist": [mock_news_response],
+                    "news_formatter": [mock_articles],
+                    **{searcher.name: [mock_news_response] for searcher in group_searchers},
+                    "news_pipeline_formatter": [mock_articles],
+                },
+                latency=NEWS_FAKE_LLM_LATENCY,
+                chunk_delay=NEWS_FAKE_LLM_CHUNK_DELAY,
+            )
+            # The feed formatter turns the feed entries it is given into articles
+            install_fake_llm(
+                feed_formatter,
+                responder=lambda llm_request, step: json.dumps(
+                    {'articles': parse_news_text(request_text(llm_request))[:5]}
+                ),
+                latency=NEWS_FAKE_LLM_LATENCY,
+                chunk_delay=NEWS_FAKE_LLM_CHUNK_DELAY,
+            )
+            # The classifier labels headlines by the topic names they mention
+            install_fake_llm(
+                topic_classifier,
+                responder=lambda llm_request, step: fake_topic_assignments(request_text(llm_request)),
+                latency=NEWS_FAKE_LLM_LATENCY,
+                chunk_delay=NEWS_FAKE_LLM_CHUNK_DELAY,
+            )
+            print(f"🧪 Using fake LLM ({NEWS_FAKE_LLM_LATENCY}s per model call)")
+        
+        # One model object (and HTTP client) per model name, shared by every
+        # agent, so connections opened by one agent are reused by the others
+        models = {}
+        for current in [*iter_agents(news_agent), feed_formatter, topic_classifier]:
+            if isinstance(getattr(current, 'model', None), str) and current.model:
+                current.model = models.setdefault(current.model, current.canonical_model)
+        
+        # Wall, model and tool time plus tokens of every agent in each refresh
+        from agent_profiler import AgentProfiler
+        agent_profiler = AgentProfiler(on_run=record_agent_profile)
+        agent_profiler.instrument(news_agent)
+        agent_profiler.instrument(feed_formatter)
+        agent_profiler.instrument(topic_classifier)
+        
+        if not api_key and not NEWS_FAKE_LLM:
+            print("⚠️  Warning: GOOGLE_API_KEY not found in environment variables")
+            print("📝 Please create a .env file with your Google API key")
+            print("   1. Copy .env.example to .env")
+            print("   2. Add your Google API key to GOOGLE_API_KEY")
+            print("   3. Get your API key from: https://aistudio.google.com/app/apikey")
+            ADK_AVAILABLE = False
+        else:
+            # Initialize session service and runner
+            session_service = InMemorySessionService()
+            runner = Runner(
+                agent=news_agent,
+                app_name="AI_News_Assistant",
+                session_service=session_service,
+            )
+            # Formats new feed entries when NEWS_INGEST=feeds
+            feed_runner = Runner(
+                agent=feed_formatter,
+                app_name="AI_News_Assistant",
+                session_service=session_service,
+            )
+            
+            # Labels the headlines of a multi-topic refresh in one batch
+            classifier_runner = Runner(
+                agent=topic_classifier,
+                app_name="AI_News_Assistant",
+                session_service=session_service,
+            )
+            
+            # Session management - rotated so the prompt history stays bounded
+            news_sessions = NewsSessionManager(
+                session_service,
+                app_name="AI_News_Assistant",
+                user_id=GLOBAL_USER_ID,
+                policy=NEWS_SESSION_POLICY,
+                max_turns=NEWS_SESSION_MAX_TURNS,
+            )
+            ADK_AVAILABLE = True
+            if NEWS_WARMUP and not NEWS_FAKE_LLM:
+                agent_worker.run(warm_up_models(models.values()))
+        
+    except ImportError as e:
+        print(f"ADK imports failed: {e}")
+        print("Running in mock mode - install dependencies first")
+        ADK_AVAILABLE = False
+    finally:
+        print(f"Agent graph loaded in {time.perf_counter() - started_at:.2f}s")  # Debug logging
+        agent_ready.set()
+
+def request_text(llm_request):
+    """Text of the user messages in a model request"""
+    return "\n".join(
+        part.text
+        for content in llm_request.contents or []
+        if content.role == "user"
+        for part in content.parts or []
+        if part.text
+    )
+
+def fake_topic_assignments(prompt):
+    """Fake classifier answer: each numbered headline gets the listed topics it names"""
+    lines = prompt.splitlines()
+    topics = next((line.split(':', 1)[1] for line in lines if line.startswith('Topics:')), '')
+    topics = [topic.strip() for topic in topics.split(',') if topic.strip()]
+    assignments = []
+    for line in lines:
+        number, _, headline = line.partition('. ')
+        if number.isdigit():
+            assignments.append({'index': int(number), 'topics': match_topics(headline, topics)})
+    return json.dumps({'assignments': assignments})
+
+async def warm_up_models(models):
+    """
+    Send a one-token request through each shared model so the TLS handshake
+    and connection setup happen before the first refresh instead of during it.
+    """
+    for model in models:
+        client = getattr(model, 'api_client', None)
+        if client is None:
+            continue
+        started_at = time.perf_counter()
+        try:
+            await client.aio.models.generate_content(
+                model=model.model,
+                contents='ping',
+                config=types.GenerateContentConfig(max_output_tokens=1),
+            )
+            print(f"Warmed up {model.model} in {time.perf_counter() - started_at:.2f}s")  # Debug logging
+        except Exception as e:
+            print(f"Warm-up of {model.model} failed: {str(e)}")  # Debug logging
+
+if NEWS_STARTUP == 'background':
+    # Serve the page and cached headlines while google.adk is imported;
+    # refreshes wait in run_agent_sync() until the agents are ready
+    threading.Thread(target=load_agent, name='agent-loader', daemon=True).start()
+else:
+    load_agent()
+
+# Searches, tokens and articles used by the latest refresh
+last_search_budget = {}
+
+def search_findings(event):
+    """Raw search results in an event: a searcher's answer or a search tool's response"""
+    content = getattr(event, 'content', None)
+    findings = []
+    for part in (getattr(content, 'parts', None) or []):
+        if getattr(part, 'text', None) and getattr(event, 'author', None) not in news_answer_authors:
+            findings.append(part.text)
+        function_response = getattr(part, 'function_response', None)
+        result = getattr(function_response, 'response', None) or {}
+        if isinstance(result, dict) and isinstance(result.get('result'), str):
+            findings.append(result['result'])
+    return findings
+
+async def run_agent_async(user_message, on_text=None, on_articles=None, on_deadline=None, deadline=None,
+                          feeds=False):
+    """
+    Run the agent asynchronously.
+
+    If on_text is given, it is called with each piece of response text as the
+    model streams it, followed by a newline once each message is complete.
+    If on_articles is given, it is called with {"articles": [...]} holding
+    each article of the formatter's structured output as soon as the
+    formatter has written it, and with any articles not streamed that way
+    once the formatter has saved its output to state.
+
+    The run is cancelled once deadline seconds (NEWS_RUN_DEADLINE by default)
+    have passed. If the answer had not started by then, the search results
+    found so far are passed to on_text instead; on_deadline is called and the
+    partial response is returned.
+
+    With feeds=True the message holds feed entries and only the feed
+    formatter runs, instead of the search agents.
+    """
+    deadline = NEWS_RUN_DEADLINE if deadline is None else deadline
+    agent_runs_in_flight.inc()
+    run_started = time.perf_counter()
+    outcome = 'error'
+    try:
+        if not ADK_AVAILABLE:
+            response = mock_news_response()
+            if on_text:
+                on_text(response + "\n")
+            outcome = 'mock'
+            return response
+        
+        # Use a session from the rotation policy
+        session_id, history_events = await news_sessions.acquire()
+        started_at = time.monotonic()
+        prompt_tokens = 0
             
         # Create content for the message
         content = types.Content(role="user", parts=[types.Part(text=user_message)])
         
+        # Stream partial text so headlines can be parsed while the model writes
+        run_config = RunConfig(
+            streaming_mode=StreamingMode.SSE if on_text or on_articles else StreamingMode.NONE
+        )
+        
         # Run the agent and collect response
         final_response = None
-        async for event in runner.run_async(
-            user_id=GLOBAL_USER_ID, 
-            session_id=session_id, 
-            new_message=content
-        ):
-            if hasattr(event, 'content') and event.content:
-                if hasattr(event.content, 'parts') and event.content.parts:
-                    for part in event.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            final_response = part.text
-                            break
-                elif hasattr(event.content, 'text'):
-                    final_response = event.content.text
+        search_budget = None
+        streamed = False
+        answered = False
+        findings = []
+        article_stream = ArticleObjectStream()
+        streamed_articles = []
+        
+        async def consume_events():
+            nonlocal prompt_tokens, final_response, search_budget, streamed, answered
+            async for event in (feed_runner if feeds else runner).run_async(
+                user_id=GLOBAL_USER_ID, 
+                session_id=session_id, 
+                new_message=content,
+                run_config=run_config
+            ):
+                # Track prompt size so session growth shows up in the stats
+                usage = getattr(event, 'usage_metadata', None)
+                if usage is not None and not getattr(event, 'partial', False):
+                    prompt_tokens += getattr(usage, 'prompt_token_count', None) or 0
+                
+                # Articles are passed on one by one while the formatter streams its JSON
+                if (getattr(event, 'partial', False) and on_articles
+                        and getattr(event, 'author', None) in news_formatter_authors):
+                    for part in (getattr(getattr(event, 'content', None), 'parts', None) or []):
+                        articles = article_stream.feed(getattr(part, 'text', None) or '')
+                        if articles:
+                            streamed_articles.extend(articles)
+                            final_response = json.dumps({'articles': streamed_articles})
+                            answered = True
+                            on_articles({'articles': articles})
+                
+                # The formatter's structured output arrives as a state change
+                state_delta = getattr(getattr(event, 'actions', None), 'state_delta', None) or {}
+                if NEWS_ARTICLES_KEY in state_delta:
+                    value = state_delta[NEWS_ARTICLES_KEY]
+                    final_response = json.dumps(value)
+                    answered = True
+                    if on_articles and article_stream.objects:
+                        # Only the articles the stream did not already pass on
+                        articles = value.get('articles') if isinstance(value, dict) else None
+                        if isinstance(articles, list) and articles[article_stream.objects:]:
+                            on_articles(dict(value, articles=articles[article_stream.objects:]))
+                    elif on_articles:
+                        on_articles(value)
+                if SEARCH_BUDGET_KEY in state_delta:
+                    search_budget = state_delta[SEARCH_BUDGET_KEY]
+                
+                # Kept in case the deadline passes before the answer is written
+                if not getattr(event, 'partial', False):
+                    findings.extend(search_findings(event))
+                
+                if getattr(event, 'author', None) not in news_answer_authors:
+                    continue
+                
+                text = None
+                if hasattr(event, 'content') and event.content:
+                    if hasattr(event.content, 'parts') and event.content.parts:
+                        for part in event.content.parts:
+                            if hasattr(part, 'text') and part.text:
+                                text = part.text
+                                break
+                    elif hasattr(event.content, 'text'):
+                        text = event.content.text
+                if text:
+                    answered = True
+                
+                if getattr(event, 'partial', False):
+                    # Partial chunks are repeated in full by the following final event
+                    if text and on_text:
+                        on_text(text)
+                        streamed = True
+                    continue
+                
+                if text:
+                    final_response = text
+                    if on_text:
+                        on_text("\n" if streamed else text + "\n")
+                streamed = False
         
+        # AgentTool runs and parallel searchers inherit the deadline, so the
+        # search budget stops starting searches shortly before it passes
+        expires_at = time.monotonic() + deadline if deadline > 0 else None
+        deadline_token = run_deadline.set(expires_at)
+        timed_out = False
+        try:
+            # Cancels every model and tool call still in flight when it expires
+            with agent_profiler.scope():
+                await asyncio.wait_for(consume_events(), timeout=deadline if deadline > 0 else None)
+        except asyncio.TimeoutError:
+            if expires_at is None or time.monotonic() < expires_at:
+                raise  # a timeout inside the agent, not the run deadline
+            timed_out = True
+        finally:
+            run_deadline.reset(deadline_token)
+        
+        news_sessions.record_run(session_id, history_events, prompt_tokens, started_at)
+        if search_budget is not None:
+            last_search_budget.clear()
+            last_search_budget.update(search_budget)
+            searches.inc(search_budget['searches'], result='run')
+            searches.inc(search_budget['skipped'], result='skipped')
+            print(f"Search budget used: {search_budget}")  # Debug logging
+        
+        if timed_out:
+            print(f"Agent run passed its {deadline:g}s deadline, "
+                  f"{'keeping the partial answer' if answered else f'parsing {len(findings)} search results'}")  # Debug logging
+            # The cut-off turn may end in a tool call without a response
+            news_sessions.retire(session_id)
+            if not answered and on_text:
+                for text in findings:
+                    on_text(text + "\n")
+            if on_deadline:
+                on_deadline()
+            outcome = 'deadline'
+            return final_response or "\n".join(findings) or "Deadline passed before any news was found"
+        
+        outcome = 'ok'
         return final_response or "No response received from agent"
         
     except Exception as e:
         print(f"Error in run_agent_async: {str(e)}")  # Debug logging
         return f"Error: {str(e)}"
+    finally:
+        agent_runs_in_flight.dec()
+        agent_runs.inc(outcome=outcome)
+        agent_run_seconds.observe(time.perf_counter() - run_started, outcome=outcome)
 
-def run_agent_sync(user_message):
-    """Run the agent in a synchronous context"""
-    if not ADK_AVAILABLE:
-        # Return mock data directly (not async)
-        current_time = datetime.now()
-        
-        # Generate realistic timestamps for today
-        time1 = current_time.replace(hour=current_time.hour, minute=current_time.minute)
-        time2 = current_time.replace(hour=max(0, current_time.hour - 1), minute=45)
-        time3 = current_time.replace(hour=max(0, current_time.hour - 2), minute=30)
-        time4 = current_time.replace(hour=max(0, current_time.hour - 3), minute=15)
-        time5 = current_time.replace(hour=max(0, current_time.hour - 4), minute=0)
-        
-        return f"""Date: {time1.strftime('%Y-%m-%d %H:%M')}
-Source: Mock Source 1
-Headline: [Test] Mock News 1 - This is a test headline
-
-Date: {time2.strftime('%Y-%m-%d %H:%M')}
-Source: Mock Source 2
-Headline: [Test] Mock News 2 - This is another test headline
-
-Date: {time3.strftime('%Y-%m-%d %H:%M')}
-Source: Mock Source 3
-Headline: [Test] Mock News 3 - Yet another test headline
-
-Date: {time4.strftime('%Y-%m-%d %H:%M')}
-Source: Mock Source 4
-Headline: [Test] Mock News 4 - One more test headline
-
-Date: {time5.strftime('%Y-%m-%d %H:%M')}
-Source: Mock Source 5
-Headline: [Test] Mock News 5 - Final test headline"""
-        
+def run_agent_sync(user_message, on_text=None, on_articles=None, on_deadline=None, deadline=None,
+                   feeds=False):
+    """Run the agent on the shared worker loop and wait for its response"""
+    if not agent_ready.is_set():
+        print("Waiting for the agent graph to load...")  # Debug logging
+        agent_ready.wait()
+    print(f"Using {'MOCK' if not ADK_AVAILABLE else 'REAL'} data mode")  # Debug mode indicator
+    deadline = NEWS_RUN_DEADLINE if deadline is None else deadline
     try:
         print(f"Running agent with message: {user_message[:100]}...")  # Debug logging
         
-        # Create new event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        # Run the agent
-        response = loop.run_until_complete(run_agent_async(user_message))
-        loop.close()
+        # The run cancels itself at the deadline; the extra time only frees
+        # this thread if cancelling the run hangs
+        response = agent_worker.run(
+            run_agent_async(user_message, on_text, on_articles, on_deadline, deadline, feeds),
+            timeout=deadline + 10 if deadline > 0 else None,
+        )
         
         print(f"Agent response: {response[:200]}...")  # Debug logging
         return response
     except Exception as e:
         print(f"Error in run_agent_sync: {str(e)}")  # Debug logging
-        if 'loop' in locals():
-            loop.close()
         return f"Error: {str(e)}"
 
-def parse_news_data(news_text):
-    """Parse news data from agent response into structured format"""
-    news_items = []
-    current_item = {}
-    
-    # Split by double newline to separate articles
-    articles = [article.strip() for article in news_text.split('\n\n') if article.strip()]
-    
-    for article in articles:
-        lines = [line.strip() for line in article.split('\n') if line.strip()]
-        if len(lines) >= 3:  # Ensure we have at least date, source, and headline
-            for line in lines:
-                if line.startswith('Date:'):
-                    current_item['date'] = line.replace('Date:', '').strip()
-                elif line.startswith('Source:'):
-                    current_item['source'] = line.replace('Source:', '').strip()
-                elif line.startswith('Headline:'):
-                    current_item['headline'] = line.replace('Headline:', '').strip()
-            
-            if all(key in current_item for key in ['date', 'source', 'headline']):
-                news_items.append(current_item.copy())
-                current_item = {}
-    
-    return news_items
+async def run_classifier_async(user_message, timeout=None):
+    """
+    Run the topic classifier in a throwaway session and return its structured
+    output, or None if the run failed or took longer than timeout seconds.
+    """
+    agent_runs_in_flight.inc()
+    run_started = time.perf_counter()
+    outcome = 'error'
+    try:
+        content = types.Content(role="user", parts=[types.Part(text=user_message)])
+        assignments = None
+
+        async def consume_events():
+            nonlocal assignments
+            async with news_sessions.scratch() as session_id:
+                async for event in classifier_runner.run_async(
+                    user_id=GLOBAL_USER_ID, session_id=session_id, new_message=content
+                ):
+                    state_delta = getattr(getattr(event, 'actions', None), 'state_delta', None) or {}
+                    if TOPIC_ASSIGNMENTS_KEY in state_delta:
+                        assignments = state_delta[TOPIC_ASSIGNMENTS_KEY]
+
+        try:
+            with agent_profiler.scope():
+                await asyncio.wait_for(consume_events(), timeout=timeout)
+        except asyncio.TimeoutError:
+            outcome = 'deadline'
+            return None
+        outcome = 'ok'
+        return assignments
+    except Exception as e:
+        print(f"Error in run_classifier_async: {str(e)}")  # Debug logging
+        return None
+    finally:
+        agent_runs_in_flight.dec()
+        agent_runs.inc(outcome=outcome)
+        agent_run_seconds.observe(time.perf_counter() - run_started, outcome=outcome)
+
+def build_classification_prompt(items):
+    """Topics and numbered headlines for one classifier call"""
+    lines = [f"{number}. {item['headline']} ({item['source']})" for number, item in enumerate(items, 1)]
+    return f"Topics: {', '.join(NEWS_TOPICS)}\n\nHeadlines:\n" + "\n".join(lines)
+
+# How new headlines got their topics: from the classifier, or by topic names
+# in the headline when it could not run; "skipped" counts batches left to the
+# fallback because the refresh had no time left for a classifier run
+topic_stats = {'batches': 0, 'classified': 0, 'fallback': 0, 'skipped': 0}
+
+def classify_topics(items, expires_at=None):
+    """
+    Label new items with their topics, all of them in one classifier call.
+
+    With a single topic nothing needs labelling. Items the classifier cannot
+    place, or every item if it fails, fall back to the topic names they
+    mention and then to the default topic. The classifier run ends at
+    expires_at (time.monotonic(), None for no limit), and is not started
+    once it has passed.
+    """
+    if len(NEWS_TOPICS) == 1 or not items:
+        return items
+    labels = [[] for _ in items]
+    timeout = None if expires_at is None else expires_at - time.monotonic()
+    if ADK_AVAILABLE and timeout is not None and timeout <= 0:
+        print(f"No time left to classify {len(items)} headlines, matching topic names instead")  # Debug logging
+        topic_stats['skipped'] += 1
+    elif ADK_AVAILABLE:
+        started_at = time.monotonic()
+        value = agent_worker.run(
+            run_classifier_async(build_classification_prompt(items), timeout),
+            timeout=timeout + 10 if timeout is not None else None,
+        )
+        try:
+            if value is not None:
+                labels = parse_topic_assignments(value, len(items), NEWS_TOPICS)
+                topic_stats['batches'] += 1
+        except ValueError as e:
+            print(f"Invalid topic assignments: {str(e)}")  # Debug logging
+        print(f"Classified {len(items)} headlines into topics in "
+              f"{time.monotonic() - started_at:.2f}s")  # Debug logging
+    classified = [dict(item, topics=topics or item_topics(item, NEWS_TOPICS)) for item, topics in zip(items, labels)]
+    topic_stats['classified'] += sum(1 for topics in labels if topics)
+    topic_stats['fallback'] += sum(1 for topics in labels if not topics)
+    return classified
 
 @app.route('/')
 def index():
     """Serve the main page"""
     return render_template('index.html')
 
+def build_news_prompt():
+    """Build the news request sent to the agent, covering every ticker topic"""
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    if len(NEWS_TOPICS) > 1:
+        wanted = f"the 5 most significant news articles from today for EACH of these topics: {', '.join(NEWS_TOPICS)}"
+    else:
+        wanted = f"EXACTLY 5 {NEWS_TOPICS[0]} news articles from today"
+    return (
+        f"IMPORTANT: Find {wanted}. " +
+        "Search multiple sources if needed - tech sites, company blogs, research sites, and business news. " +
+        ("Keep searching different sources until you have 5 articles for every topic. " if len(NEWS_TOPICS) > 1
+         else "Keep searching different sources until you have exactly 5 articles. ") +
+        f"All articles must be from {current_date}. " +
+        "Include exact publication times. Sort by newest first."
+    )
+
+def build_feed_prompt(entries):
+    """Feed entries in the labelled format the formatter reads"""
+    blocks = [
+        f"Date: {entry['published'].strftime('%Y-%m-%d %H:%M') if entry['published'] else 'unknown'}\n"
+        f"Source: {entry['source']}\n"
+        f"Headline: {entry['title']}\n"
+        f"Summary: {entry['summary']}"
+        for entry in entries
+    ]
+    topics = f"news on {', '.join(NEWS_TOPICS)}" if len(NEWS_TOPICS) > 1 else f"{NEWS_TOPICS[0]} news"
+    return (
+        f"Format today's most significant {topics} from these {len(entries)} new feed entries. " +
+        f"Today is {datetime.now().strftime('%Y-%m-%d')}.\n\n" + "\n\n".join(blocks)
+    )
+
+def fetch_news(on_item=None):
+    """
+    Run the agent and return the ticker with any genuinely new stories added.
+
+    Headlines that are near-duplicates of a story already seen, on an earlier
+    refresh or from another source, are dropped. If on_item is given, it is
+    called with each new item as soon as the agent has written it. When the
+    run deadline passes, the items found so far are returned marked partial.
+    With NEWS_INGEST=feeds, new feed entries are formatted instead of
+    searching, and a refresh without new entries makes no model call.
+    """
+    parser = NewsStreamParser()
+    parsed_items = []
+    new_items = []
+    structured = []
+    deadline_passed = []
+
+    def accept(item):
+        parsed_items.append(item)
+        if story_index.check_and_add(item['headline'], item) is None:
+            new_items.append(item)
+            if on_item:
+                on_item(item)
+
+    def on_text(text):
+        for item in parser.feed(text):
+            # Text is only a fallback once the formatter's articles are in
+            if not structured:
+                accept(item)
+
+    def on_articles(value):
+        try:
+            items = parse_structured_articles(value)
+        except ValueError as e:
+            print(f"Invalid structured articles: {str(e)}")  # Debug logging
+            news_parse_stats['schema_errors'] += 1
+            return
+        structured.append(items)
+        for item in items:
+            accept(item)
+
+    started_at = time.monotonic()
+    prompt, feeds, entries = build_news_prompt(), False, []
+    if feed_poller is not None:
+        if feed_scheduler is not None:
+            feed_scheduler.start()
+            # Feeds due now (all of them on the first refresh) are polled here,
+            # the rest keep whatever the schedule has found since the last refresh
+            feed_scheduler.poll_due()
+            entries = feed_scheduler.take()
+        else:
+            entries = feed_poller.poll()
+        entries = take_feed_backlog(entries)
+        if entries:
+            prompt, feeds = build_feed_prompt(entries[:NEWS_FEED_MAX_ENTRIES]), True
+        elif not feed_poller.all_failed():
+            # Every feed is unchanged or only has entries passed on before
+            print("No new feed entries, keeping the current ticker")  # Debug logging
+            return compose_ticker([])
+        else:
+            print("Every feed failed, searching instead")  # Debug logging
+    # The run deadline covers the classifier run as well
+    expires_at = time.monotonic() + NEWS_RUN_DEADLINE if NEWS_RUN_DEADLINE > 0 else None
+    agent_response = run_agent_sync(
+        prompt, on_text, on_articles, on_deadline=lambda: deadline_passed.append(True), feeds=feeds
+    )
+    print(f"Agent response received: {len(agent_response)} characters")  # Debug logging
+    for item in parser.close():
+        if not structured:
+            accept(item)
+    record_parse_result('structured' if structured else 'text', parsed_items, started_at)
+    if deadline_passed:
+        news_parse_stats['partial'] += 1
+    if feeds:
+        # The poller passes each entry on only once, so entries beyond the
+        # prompt, or of a run that failed or was cut off, wait for the next one
+        formatted = parsed_items and not deadline_passed
+        feed_backlog[:] = entries[NEWS_FEED_MAX_ENTRIES:] if formatted else entries
+
+    if not parsed_items:
+        # The run failed or returned nothing usable - keep the current ticker
+        return []
+    print(f"Parsed {len(parsed_items)} headlines, {len(new_items)} new")  # Debug logging
+
+    try:
+        ids = headline_store.add_items(new_items)
+        # Copies, since the streamed originals may still be serialised elsewhere
+        new_items = [dict(item, id=item_id) for item, item_id in zip(new_items, ids)]
+    except Exception as e:
+        print(f"Error archiving headlines: {str(e)}")  # Debug logging
+    # One batch for the whole shared result set, however many topics there are
+    new_items = classify_topics(new_items, expires_at)
+    if deadline_passed:
+        # Sources that had not answered yet may have had newer stories
+        new_items = [dict(item, partial=True) for item in new_items]
+    return compose_ticker(new_items, complete=not deadline_passed)
+
+# How each refresh's headlines were obtained: "structured" from the
+# formatter's output_schema, "text" by parsing the response text, "failed"
+# when neither produced any items; "partial" counts refreshes cut off by the
+# run deadline
+news_parse_stats = {
+    'structured': 0,
+    'text': 0,
+    'failed': 0,
+    'schema_errors': 0,
+    'partial': 0,
+    'seconds': {'structured': 0.0, 'text': 0.0, 'failed': 0.0},
+}
+
+def record_parse_result(path, items, started_at):
+    """Count a refresh under the path that produced its items"""
+    if not items:
+        path = 'failed'
+    news_parse_stats[path] += 1
+    news_parse_stats['seconds'][path] += time.monotonic() - started_at
+
+def parse_stats():
+    """Refresh counts, failure rate and mean run time per parse path"""
+    runs = sum(news_parse_stats[path] for path in ('structured', 'text', 'failed'))
+    return {
+        'runs': runs,
+        'structured': news_parse_stats['structured'],
+        'text': news_parse_stats['text'],
+        'failed': news_parse_stats['failed'],
+        'schema_errors': news_parse_stats['schema_errors'],
+        'partial': news_parse_stats['partial'],
+        'failure_rate': round(news_parse_stats['failed'] / runs, 4) if runs else None,
+        'mean_seconds': {
+            path: round(seconds / news_parse_stats[path], 3)
+            for path, seconds in news_parse_stats['seconds'].items()
+            if news_parse_stats[path]
+        },
+    }
+
+def compose_ticker(new_items, complete=True):
+    """
+    Merge new stories into the current ticker, newest first.
+
+    A complete refresh clears the partial mark of stories kept from an
+    earlier refresh that was cut off by its deadline.
+    """
+    previous = news_cache.peek()
+    if previous is None:
+        # After a restart, pick up where the archive left off
+        previous = [
+            {'date': item['date'], 'source': item['source'], 'headline': item['headline'], 'id': item['id']}
+            for item in headline_store.search(limit=NEWS_TICKER_SIZE * len(NEWS_TOPICS))
+        ]
+    # The archive already holds the stories that were just added
+    new_ids = {item['id'] for item in new_items}
+    previous = [item for item in previous if item.get('id') not in new_ids]
+    if complete:
+        previous = [
+            {key: value for key, value in item.items() if key != 'partial'} for item in previous
+        ]
+    merged = sorted(new_items + previous, key=lambda item: item['date'], reverse=True)
+    # Enough of the newest stories for every topic's ticker
+    return select_per_topic(merged, NEWS_TOPICS, NEWS_TICKER_SIZE)
+
+# RSS/Atom feeds polled instead of searching when NEWS_INGEST=feeds
+feed_poller = FeedPoller(
+    NEWS_FEEDS, timeout=NEWS_FEED_TIMEOUT, max_entries=NEWS_FEED_MAX_ENTRIES,
+    max_age=NEWS_FEED_MAX_AGE, max_workers=NEWS_FEED_MAX_CONCURRENT,
+) if NEWS_INGEST == 'feeds' else None
+if feed_poller is not None and not os.getenv('NEWS_FEEDS') and NEWS_TOPICS != ['AI']:
+    print(f"⚠️  The default feeds only carry AI news - set NEWS_FEEDS to feeds covering {', '.join(NEWS_TOPICS)}")
+
+# Feed entries polled but not yet formatted by a complete run
+feed_backlog = []
+
+# Background polling of each feed on its own interval; it starts with the
+# first refresh, and new entries trigger the next one. Publish rates also
+# count the archived headlines of each feed's source
+feed_scheduler = FeedScheduler(
+    feed_poller,
+    min_interval=NEWS_FEED_MIN_INTERVAL,
+    max_interval=NEWS_FEED_MAX_INTERVAL,
+    on_entries=lambda entries: news_cache.refresh_in_background(),
+    history=lambda source, since: headline_store.published_times(source, since),
+) if feed_poller is not None and NEWS_FEED_SCHEDULE == 'adaptive' else None
+
+# Searchable archive of past headlines
+headline_store = HeadlineStore(NEWS_ARCHIVE_PATH)
+
+# Fingerprints of recent stories, seeded from the archive so repeats are
+# recognised across restarts too
+story_index = SimHashIndex(max_distance=NEWS_DEDUP_DISTANCE, capacity=NEWS_DEDUP_CAPACITY)
+story_index.filter_new(headline_store.search(limit=min(NEWS_DEDUP_CAPACITY, 1000)))
+
+def take_feed_backlog(entries):
+    """New feed entries plus the backlog still recent enough to show, newest first"""
+    cutoff = datetime.now() - timedelta(seconds=NEWS_FEED_MAX_AGE)
+    waiting = [
+        entry for entry in feed_backlog
+        if entry['published'] is None or entry['published'] >= cutoff
+    ]
+    feed_backlog.clear()
+    return sorted(waiting + entries, key=lambda entry: entry['published'] or datetime.min, reverse=True)
+
+def adopt_shared_snapshot(items):
+    """Catch up with a snapshot another worker fetched and archived"""
+    headline_store.sync()
+    story_index.filter_new(items)
+
+# Headline snapshot served by /api/news, revalidated in the background
+shared_snapshots = (
+    SharedSnapshotStore(NEWS_SHARED_CACHE_PATH, lease_ttl=NEWS_REFRESH_LEASE_TTL)
+    if NEWS_SHARED_CACHE_PATH else None
+)
+
+# Per-client limits on the refresh button, and on the agent runs refreshes
+# start between them. Runs never overlap: the cache runs one refresh at a
+# time and every other request joins it.
+refresh_limiter = RateLimiter(rate=NEWS_REFRESH_RATE / 60, burst=NEWS_REFRESH_BURST)
+run_budget = RunBudget(
+    rate=NEWS_RUN_RATE / 3600, burst=NEWS_RUN_BURST, reserve=NEWS_RUN_RESERVE, priority=NEWS_REFRESH_PRIORITY,
+) if NEWS_RUN_RATE > 0 else None
+
+news_cache = NewsCache(
+    fetch_news, ttl=NEWS_CACHE_TTL, store=shared_snapshots, on_sync=adopt_shared_snapshot,
+    run_budget=run_budget,
+)
+
+# Each topic's ticker cut from the shared snapshot, with its serialised,
+# hashed and compressed form
+topic_views = TopicViews(NEWS_TOPICS, NEWS_TICKER_SIZE)
+
+def unknown_topic():
+    """404 response listing the configured topics"""
+    return jsonify({
+        'error': f"Unknown topic '{request.args.get('topic')}'",
+        'topics': NEWS_TOPICS,
+        'status': 'error',
+    }), 404
+
 @app.route('/api/news')
 def get_news():
-    """Get latest AI news"""
+    """
+    Get latest AI news.
+
+    With ?topic=<name>, the ticker of one of the configured topics is
+    returned (the first topic by default). With ?since=<cursor>, only
+    headlines archived after the cursor are returned, across all topics,
+    together with the cursor to use next time.
+    """
     try:
-        print("Getting news request...")  # Debug logging
-        print(f"Using {'MOCK' if not ADK_AVAILABLE else 'REAL'} data mode")  # Debug mode indicator
-        
-        # Get response from agent with a specific news request
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        agent_response = run_agent_sync(
-            "IMPORTANT: Find EXACTLY 5 AI news articles from today. " +
-            "Search multiple sources if needed - tech sites, company blogs, research sites, and business news. " +
-            "Keep searching different sources until you have exactly 5 articles. " +
-            f"All articles must be from {current_date}. " +
-            "Include exact publication times. Sort by newest first."
-        )
+        since = request.args.get('since')
+        if since is not None:
+            return get_news_delta(since)
         
-        print(f"Agent response received: {len(agent_response)} characters")  # Debug logging
-        
-        # Parse the news data into structured format
-        news_items = parse_news_data(agent_response)
-        
-        return jsonify(news_items)
+        topic = topic_views.resolve(request.args.get('topic'))
+        if topic is None:
+            return unknown_topic()
+        payload = topic_views.payload(news_cache.get(), topic)
+        response = conditional_response(payload, request, NEWS_COMPRESS_MIN_BYTES)
+        response.headers['X-News-Cursor'] = str(headline_store.last_id)
+        return response
         
+    except Saturated as e:
+        # Nothing cached yet and no agent run left to fetch it
+        return too_many_requests('saturated', e.retry_after)
     except Exception as e:
         print(f"Error in get_news: {str(e)}")  # Debug logging
         return jsonify({
@@ -261,10 +1049,235 @@ def get_news():
             'timestamp': str(datetime.now())
         }), 500
 
+def get_news_delta(since):
+    """Headlines added after a client's cursor"""
+    try:
+        cursor = int(since)
+        limit = min(max(int(request.args.get('limit', NEWS_DELTA_LIMIT)), 1), NEWS_DELTA_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers', 'status': 'error'}), 400
+    
+    # Keep the cache warm for clients that only ever ask for deltas
+    news_cache.get()
+    items = headline_store.since(cursor, limit)
+    next_cursor = items[-1]['id'] if items else max(cursor, 0)
+    return jsonify({
+        'items': items,
+        'cursor': next_cursor,
+        'has_more': next_cursor < headline_store.last_id,
+    })
+
+def format_sse(event, data):
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/news/stream')
+def stream_news():
+    """
+    Stream headlines to the browser as the agent produces them.
+
+    With several topics, ?topic=<name> picks the ticker whose snapshots are
+    sent; headlines are then only sent with the snapshot, once classified.
+    """
+    topic = topic_views.resolve(request.args.get('topic'))
+    if topic is None:
+        return unknown_topic()
+
+    def generate():
+        events = news_cache.subscribe()
+        try:
+            items = news_cache.peek()
+            if items is not None:
+                yield format_sse('snapshot', topic_views.view(items, topic))
+            if items is None or news_cache.is_stale():
+                news_cache.refresh_in_background()
+            
+            while True:
+                try:
+                    event, data = events.get(timeout=NEWS_STREAM_HEARTBEAT)
+                except queue.Empty:
+                    # Keep the connection alive and revalidate on the TTL
+                    yield ": keep-alive\n\n"
+                    if news_cache.is_stale():
+                        news_cache.refresh_in_background()
+                    continue
+                if event == 'item' and len(NEWS_TOPICS) > 1:
+                    continue
+                if event == 'snapshot':
+                    data = topic_views.view(data, topic)
+                yield format_sse(event, data)
+        finally:
+            news_cache.unsubscribe(events)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/search')
+def search_news():
+    """Full-text search over archived headlines"""
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 200)
+        started_at = time.perf_counter()
+        results = headline_store.search(
+            query=request.args.get('q'),
+            date_from=request.args.get('from'),
+            date_to=request.args.get('to'),
+            limit=limit,
+        )
+        return jsonify({
+            'results': results,
+            'count': len(results),
+            'took_ms': round((time.perf_counter() - started_at) * 1000, 2),
+        })
+        
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer', 'status': 'error'}), 400
+    except Exception as e:
+        print(f"Error in search_news: {str(e)}")  # Debug logging
+        return jsonify({
+            'error': str(e),
+            'status': 'error',
+            'timestamp': str(datetime.now())
+        }), 500
+
+@app.route('/api/stats')
+def get_stats():
+    """Session policy, prompt size, parse results, search budget, search cache, feed polls, topic labelling, run budget and per-agent profile"""
+    return jsonify({
+        'mode': 'loading' if not agent_ready.is_set() else 'real' if ADK_AVAILABLE else 'mock',
+        'cache_age': news_cache.age(),
+        'worker': os.getpid(),
+        'shared_cache': NEWS_SHARED_CACHE_PATH or None,
+        'session': news_sessions.stats() if news_sessions else None,
+        'parsing': parse_stats(),
+        'search_budget': last_search_budget or None,
+        'search_cache': search_cache.stats() if search_cache else None,
+        'feeds': feed_poller.stats() if feed_poller else None,
+        'topics': dict(topic_stats, topics=NEWS_TOPICS),
+        'run_budget': run_budget.stats() if run_budget else None,
+        'agents': {
+            'last_run': agent_profiler.last_run(),
+            'mean': agent_profiler.mean(),
+        } if agent_profiler else None,
+    })
+
+@app.route('/api/schedule')
+def get_schedule():
+    """Poll interval, learned publish rate and hit rate of each feed"""
+    return jsonify({
+        'ingest': NEWS_INGEST,
+        'schedule': NEWS_FEED_SCHEDULE if feed_poller else None,
+        'feeds': feed_scheduler.stats() if feed_scheduler else None,
+    })
+
+# Scrape-time metrics read from the caches and stats kept above
+metrics.counter(
+    'refreshes_total', 'Refreshes by how headlines were obtained (structured, text, failed)', ['path']
+).set_function(lambda: {(path,): news_parse_stats[path] for path in ('structured', 'text', 'failed')})
+metrics.counter(
+    'partial_refreshes_total', 'Refreshes cut off by the run deadline that served partial results'
+).set_function(lambda: news_parse_stats['partial'])
+metrics.counter(
+    'parse_schema_errors_total', 'Structured formatter outputs that failed validation'
+).set_function(lambda: news_parse_stats['schema_errors'])
+metrics.counter(
+    'snapshot_lookups_total', 'Headline snapshot reads by result (hit, stale, miss)', ['result']
+).set_function(lambda: {(result,): count for result, count in news_cache.lookups.items()})
+metrics.gauge(
+    'snapshot_age_seconds', 'Seconds since the headline snapshot was refreshed'
+).set_function(news_cache.age)
+metrics.counter(
+    'search_cache_lookups_total', 'Search cache lookups by result (hit, miss)', ['result']
+).set_function(lambda: {
+    ('hit',): search_cache.hits, ('miss',): search_cache.misses
+} if search_cache else {})
+metrics.counter(
+    'search_cache_evictions_total', 'Search answers dropped by TTL expiry or LRU eviction', ['reason']
+).set_function(lambda: {
+    ('expired',): search_cache.expired, ('evicted',): search_cache.evictions
+} if search_cache else {})
+
+metrics.counter(
+    'feed_polls_total', 'Feed requests by result (modified, not_modified, error)', ['result']
+).set_function(lambda: {
+    (result,): count for result, count in feed_poller.results.items()
+} if feed_poller else {})
+
+metrics.counter(
+    'topic_labels_total', 'New headlines labelled with topics by the classifier or by fallback', ['source']
+).set_function(lambda: {
+    ('classifier',): topic_stats['classified'], ('fallback',): topic_stats['fallback']
+})
+
+metrics.counter(
+    'run_budget_refusals_total', 'Refreshes refused an agent run by the run budget, by kind (scheduled, manual)', ['kind']
+).set_function(lambda: {(kind,): count for kind, count in run_budget.refused.items()} if run_budget else {})
+
+def feed_schedule_polls():
+    if feed_scheduler is None:
+        return {}
+    stats = feed_scheduler.stats()
+    return {('hit',): stats['hits'], ('miss',): stats['polls'] - stats['hits']}
+
+metrics.counter(
+    'feed_schedule_polls_total', 'Scheduled feed polls by whether they found new entries (hit, miss)', ['result']
+).set_function(feed_schedule_polls)
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus metrics for this worker process"""
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+def client_id():
+    """Address the rate limits are applied to"""
+    if NEWS_CLIENT_IP_HEADER:
+        forwarded = request.headers.get(NEWS_CLIENT_IP_HEADER, '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.remote_addr or 'unknown'
+
+def too_many_requests(reason, retry_after):
+    """429 response telling the client when to try again"""
+    admission_rejections.inc(reason=reason)
+    print(f"Refresh rejected ({reason}), retry after {retry_after}s")  # Debug logging
+    response = jsonify({
+        'error': 'Too many refreshes, please try again later',
+        'reason': reason,
+        'retry_after': retry_after,
+        'status': 'error',
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
 @app.route('/api/refresh', methods=['POST'])
 def refresh_news():
-    """Manually refresh news"""
-    return get_news()
+    """
+    Manually refresh news.
+
+    Each client gets a small burst of refreshes, then a steady rate, and is
+    answered 429 beyond it, as is a click when the run budget only has runs
+    left for scheduled refreshes. A click while a refresh is running joins
+    that run.
+    """
+    retry_after = refresh_limiter.acquire(client_id())
+    if retry_after:
+        return too_many_requests('rate_limited', retry_after)
+    try:
+        return jsonify(news_cache.refresh('manual'))
+
+    except Saturated as e:
+        return too_many_requests('saturated', e.retry_after)
+    except Exception as e:
+        print(f"Error in refresh_news: {str(e)}")  # Debug logging
+        return jsonify({
+            'error': str(e),
+            'status': 'error',
+            'timestamp': str(datetime.now())
+        }), 500
 
 if __name__ == '__main__':
     if ADK_AVAILABLE:
@@ -278,5 +1291,10 @@ if __name__ == '__main__':
         print("🎯 Demo mode will show sample news data")
     
     print("🌐 Visit http://localhost:5000 to access the news ticker")
-    print("🔄 Auto-refresh every 5 minutes")
+    print(f"🔄 Headlines cached for {NEWS_CACHE_TTL:.0f}s and refreshed in the background")
+
+    # Prefetch the first snapshot so the first page load doesn't wait on the agent.
+    # Only the reloader's child process serves requests, so only it prefetches.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        news_cache.refresh_in_background()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,1758 @@
+"""
+News Ticker Benchmarks
+
+Runs the ticker app in mock mode (no API key or network needed) and reports
+latency percentiles for the hot paths.
+
+Usage:
+    python benchmark.py cache --requests 50 --agent-latency 0.2
+    python benchmark.py coalesce --clients 20 --agent-latency 1.0
+    python benchmark.py overhead --requests 2000
+    python benchmark.py metrics --requests 2000
+    python benchmark.py admission --clients 8 --clicks 10
+    python benchmark.py parser --articles 20000 --fuzz-cases 2000
+    python benchmark.py wire
+    python benchmark.py archive --headlines 1000000
+    python benchmark.py dedup --stories 50000
+    python benchmark.py structured --runs 50 --drift 0.2
+    python benchmark.py fanout --runs 10 --model-latency 0.3
+    python benchmark.py budget --searches 12 --model-latency 0.1
+    python benchmark.py deadline --deadline 1.0
+    python benchmark.py topics --topics 10 --model-latency 0.1
+    python benchmark.py feeds --feed-latency 0.2 --model-latency 0.3
+    python benchmark.py schedule --hours 24 --max-concurrent 2
+    python benchmark.py search-cache --refreshes 5 --model-latency 0.3
+    python benchmark.py workers --workers 4 --agent-latency 1.0
+    python benchmark.py imports --save import_profile.json
+    python benchmark.py agents --agent ../10-sequential-agent/lead_qualification_agent --profile
+"""
+
+import argparse
+import asyncio
+import collections
+import gzip
+import importlib
+import inspect
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Force mock mode before the app is imported so no real agent runs happen
+os.environ["GOOGLE_API_KEY"] = ""
+# Keep benchmark headlines out of the real archive
+os.environ.setdefault("NEWS_ARCHIVE_PATH", ":memory:")
+# Every search really runs unless a benchmark sets up its own search cache
+os.environ.setdefault("SEARCH_CACHE_TTL", "0")
+
+import app as ticker  # noqa: E402
+from dedup import SimHashIndex  # noqa: E402
+from headline_store import HeadlineStore  # noqa: E402
+from feed_fixtures import feed_fixture, serve_feed_fixtures  # noqa: E402
+from news_parser import NewsStreamParser, parse_news_text, parse_structured_articles  # noqa: E402
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def report(label, samples):
+    """Print p50/p99 latency for a list of durations in seconds"""
+    print(
+        f"{label:<28} n={len(samples):<6} "
+        f"p50={percentile(samples, 50) * 1000:9.3f}ms "
+        f"p99={percentile(samples, 99) * 1000:9.3f}ms "
+        f"mean={statistics.mean(samples) * 1000:9.3f}ms"
+    )
+
+
+def with_agent_latency(seconds):
+    """Make the mock agent as slow as a real search/format run"""
+    original = ticker.run_agent_sync
+
+    def slow_run_agent_sync(user_message, on_text=None, on_articles=None, **options):
+        time.sleep(seconds)
+        return original(user_message, on_text, on_articles, **options)
+
+    ticker.run_agent_sync = slow_run_agent_sync
+
+
+def bench_cache(args):
+    """Compare an uncached agent run per request with the cached snapshot"""
+    with_agent_latency(args.agent_latency)
+    ticker.news_cache.ttl = args.ttl
+    client = ticker.app.test_client()
+
+    # Before: every request runs the agent and parses its output
+    before = []
+    with ticker.app.test_request_context():
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            ticker.jsonify(ticker.fetch_news())
+            before.append(time.perf_counter() - start)
+
+    # After: the first request fills the cache, the rest are served from it
+    client.get("/api/news")
+    after = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        response = client.get("/api/news")
+        after.append(time.perf_counter() - start)
+        assert response.status_code == 200
+
+    report("uncached (agent per request)", before)
+    report("cached snapshot", after)
+
+
+def bench_coalesce(args):
+    """Fire concurrent /api/news and /api/refresh calls at a slow agent"""
+    runs = []
+    original = ticker.run_agent_sync
+
+    def counting_run_agent_sync(user_message, on_text=None, on_articles=None, **options):
+        runs.append(user_message)
+        time.sleep(args.agent_latency)
+        return original(user_message, on_text, on_articles, **options)
+
+    ticker.run_agent_sync = counting_run_agent_sync
+    client = ticker.app.test_client()
+    barrier = threading.Barrier(args.clients)
+    results = [None] * args.clients
+
+    def worker(index):
+        barrier.wait()
+        if index % 2:
+            # Separate browsers, so the per-client refresh limit doesn't apply
+            response = client.post("/api/refresh", environ_overrides={"REMOTE_ADDR": f"10.0.0.{index}"})
+        else:
+            response = client.get("/api/news")
+        results[index] = (response.status_code, response.get_json())
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.clients} concurrent requests -> {len(runs)} agent run(s) in {elapsed:.2f}s")
+    assert all(status == 200 for status, _ in results), results
+    assert all(body == results[0][1] for _, body in results), "responses differ"
+    assert len(runs) == 1, f"expected exactly one agent run, got {len(runs)}"
+    print("OK: all requests shared a single agent run")
+
+
+def bench_admission(args):
+    """Per-client refresh limits and 429s under a refresh burst"""
+    # Every client hammers the refresh button at a slow agent
+    runs = []
+    original = ticker.run_agent_sync
+
+    def counting_run_agent_sync(user_message, on_text=None, on_articles=None, **options):
+        runs.append(user_message)
+        time.sleep(args.agent_latency)
+        return original(user_message, on_text, on_articles, **options)
+
+    ticker.run_agent_sync = counting_run_agent_sync
+    client = ticker.app.test_client()
+    client.get("/api/news")
+    runs.clear()
+    statuses = collections.Counter()
+    rejected_latency = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.clients)
+
+    def worker(index):
+        barrier.wait()
+        for _ in range(args.clicks):
+            start = time.perf_counter()
+            response = client.post("/api/refresh", environ_overrides={"REMOTE_ADDR": f"10.0.0.{index}"})
+            with lock:
+                statuses[response.status_code] += 1
+                if response.status_code == 429:
+                    rejected_latency.append(time.perf_counter() - start)
+                    assert int(response.headers["Retry-After"]) >= 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    ticker.run_agent_sync = original
+
+    print(f"{args.clients} clients x {args.clicks} clicks -> {len(runs)} agent run(s) in {elapsed:.2f}s, "
+          f"statuses {dict(statuses)}")
+    report("429 response", rejected_latency)
+    limit = ticker.NEWS_REFRESH_BURST
+    assert statuses[200] <= args.clients * limit, statuses
+    assert len(runs) <= statuses[200], runs
+    print("OK: bursts are cut off with fast 429s and the rest share agent runs")
+
+
+def bench_metrics(args):
+    """Cost of the /metrics collectors on the /api/news hot path and per scrape"""
+    app = ticker.app
+    client = app.test_client()
+    client.get("/api/news")  # fill the snapshot cache
+
+    def hot_requests(count):
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            client.get("/api/news")
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    hooks = (
+        (app.before_request_funcs[None], ticker.start_request_timer),
+        (app.after_request_funcs[None], ticker.record_request_metrics),
+    )
+    # Alternate short rounds so drift (GC, CPU frequency) hits both sides alike
+    without_metrics, with_metrics = [], []
+    per_round = max(1, args.requests // args.rounds)
+    for _ in range(args.rounds):
+        for funcs, hook in hooks:
+            funcs.remove(hook)
+        try:
+            without_metrics.append(hot_requests(per_round))
+        finally:
+            for funcs, hook in hooks:
+                funcs.append(hook)
+        with_metrics.append(hot_requests(per_round))
+    report("/api/news without metrics", [t for timings in without_metrics for t in timings])
+    report("/api/news with metrics", [t for timings in with_metrics for t in timings])
+    overhead = statistics.median(
+        statistics.median(on) - statistics.median(off) for on, off in zip(with_metrics, without_metrics)
+    )
+    print(f"  overhead per request: {overhead * 1e6:.1f}us (median of {args.rounds} rounds)")
+
+    scrapes = []
+    for _ in range(args.scrapes):
+        start = time.perf_counter()
+        body = client.get("/metrics").get_data(as_text=True)
+        scrapes.append(time.perf_counter() - start)
+    report("/metrics scrape", scrapes)
+    print(f"  {len(body)} bytes, {len(body.splitlines())} lines")
+
+
+def bench_overhead(args):
+    """Per-request cost of a fresh event loop versus the shared agent worker"""
+
+    async def stub_model(user_message):
+        # Stands in for a model call that yields to the loop once
+        await asyncio.sleep(0)
+        return user_message
+
+    # Before: create, install and close an event loop for every request
+    per_request_loop = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(stub_model("ping"))
+        loop.close()
+        per_request_loop.append(time.perf_counter() - start)
+    asyncio.set_event_loop(None)
+
+    # After: submit to the long-lived loop thread
+    ticker.agent_worker.run(stub_model("warm-up"))
+    shared_loop = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        ticker.agent_worker.run(stub_model("ping"))
+        shared_loop.append(time.perf_counter() - start)
+
+    report("new loop per request", per_request_loop)
+    report("shared worker loop", shared_loop)
+
+
+def legacy_parse_news_data(news_text):
+    """The original blank-line splitting parser, kept for comparison"""
+    news_items = []
+    current_item = {}
+    articles = [article.strip() for article in news_text.split('\n\n') if article.strip()]
+    for article in articles:
+        lines = [line.strip() for line in article.split('\n') if line.strip()]
+        if len(lines) >= 3:
+            for line in lines:
+                if line.startswith('Date:'):
+                    current_item['date'] = line.replace('Date:', '').strip()
+                elif line.startswith('Source:'):
+                    current_item['source'] = line.replace('Source:', '').strip()
+                elif line.startswith('Headline:'):
+                    current_item['headline'] = line.replace('Headline:', '').strip()
+            if all(key in current_item for key in ['date', 'source', 'headline']):
+                news_items.append(current_item.copy())
+                current_item = {}
+    return news_items
+
+
+def synthetic_agent_output(articles):
+    """Agent-style response with the given number of articles"""
+    blocks = [
+        f"Date: 2025-07-01 {index // 60 % 24:02d}:{index % 60:02d}\n"
+        f"Source: Source {index % 97}\n"
+        f"Headline: [Industry] Synthetic Story {index} - Something Important Happened"
+        for index in range(articles)
+    ]
+    return f"Found {articles} articles from today:\n\n" + "\n\n".join(blocks)
+
+
+# Formatting drift seen from the model, applied to the mock responses
+LABEL_STYLES = [
+    r"\1:",
+    r"**\1:**",
+    r"**\1**:",
+    r"- \1:",
+    r"* **\1:**",
+    r"### \1:",
+]
+
+LAYOUT_MUTATIONS = [
+    lambda text: text.replace("\n\n", "\n"),
+    lambda text: text.replace("\n\n", "\n\n\n\n"),
+    lambda text: text.replace("\n", "\n   "),
+    lambda text: text.replace("\n", "\r\n"),
+    lambda text: "Here are today's articles:\n\n" + text + "\n\nLet me know if you need more.",
+]
+
+
+def mutate_mock_response(text, rng):
+    """Rewrite labels in one Markdown style and apply random layout changes"""
+    style = rng.choice(LABEL_STYLES)
+    text = re.sub(r"^(Date|Source|Headline):", style, text, flags=re.MULTILINE)
+    if rng.random() < 0.3:
+        text = text.replace("Date", "date").replace("Headline", "HEADLINE")
+    for mutation in rng.sample(LAYOUT_MUTATIONS, rng.randint(0, len(LAYOUT_MUTATIONS))):
+        text = mutation(text)
+    return text
+
+
+def parse_in_fixed_chunks(text, size=64):
+    """Feed text to the streaming parser in fixed-size chunks"""
+    parser = NewsStreamParser()
+    items = []
+    for position in range(0, len(text), size):
+        items += parser.feed(text[position:position + size])
+    return items + parser.close()
+
+
+def parse_in_chunks(text, rng):
+    """Feed text to the streaming parser in random-sized chunks"""
+    parser = NewsStreamParser()
+    items = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 40)
+        items += parser.feed(text[position:position + size])
+        position += size
+    return items + parser.close()
+
+
+def bench_parser(args):
+    """Parser throughput on large outputs plus a fuzz run over mock responses"""
+    text = synthetic_agent_output(args.articles)
+    print(f"synthetic output: {args.articles} articles, {len(text) / 1e6:.1f} MB")
+
+    for label, parse in [("legacy split parser", legacy_parse_news_data),
+                         ("state machine (one chunk)", parse_news_text),
+                         ("state machine (64B chunks)", parse_in_fixed_chunks)]:
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            items = parse(text)
+            samples.append(time.perf_counter() - start)
+        assert len(items) == args.articles, (label, len(items))
+        report(label, samples)
+
+    # Fuzz: mutated mock responses, fed in random chunks, must parse like the original
+    rng = random.Random(args.seed)
+    mock_response = ticker.run_agent_sync(ticker.build_news_prompt())
+    expected = parse_news_text(mock_response)
+    legacy_dropped = dropped = 0
+    for _ in range(args.fuzz_cases):
+        mutated = mutate_mock_response(mock_response, rng)
+        items = parse_in_chunks(mutated, rng)
+        dropped += items != expected
+        legacy_dropped += legacy_parse_news_data(mutated) != expected
+
+    print(f"fuzz: {args.fuzz_cases} mutated mock responses")
+    print(f"  legacy parser mismatches:        {legacy_dropped}")
+    print(f"  state machine parser mismatches: {dropped}")
+    assert dropped == 0, "streaming parser dropped or changed items"
+
+
+def wire_bytes(response):
+    """Approximate bytes on the wire: status line, headers and body"""
+    head = f"HTTP/1.1 {response.status}\r\n" + "".join(
+        f"{name}: {value}\r\n" for name, value in response.headers.items()
+    ) + "\r\n"
+    return len(head.encode("latin-1")) + len(response.get_data())
+
+
+def bench_wire(args):
+    """Bytes per poll for full, compressed and conditional /api/news requests"""
+    client = ticker.app.test_client()
+    first = client.get("/api/news")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    last_modified = first.headers["Last-Modified"]
+
+    cases = [
+        ("full body", {}),
+        ("gzip", {"Accept-Encoding": "gzip"}),
+        ("deflate", {"Accept-Encoding": "deflate"}),
+        ("If-None-Match (unchanged)", {"If-None-Match": etag}),
+        ("If-Modified-Since (unchanged)", {"If-Modified-Since": last_modified}),
+        ("If-None-Match (stale etag)", {"If-None-Match": 'W/"outdated"'}),
+    ]
+    for label, headers in cases:
+        response = client.get("/api/news", headers=headers)
+        print(f"{label:<30} status={response.status_code} bytes={wire_bytes(response)}")
+
+    assert client.get("/api/news", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/news", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/api/news", headers={"If-None-Match": 'W/"outdated"'}).status_code == 200
+    gzipped = client.get("/api/news", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers.get("Content-Encoding") == "gzip"
+    assert gzip.decompress(gzipped.get_data()) == first.get_data()
+
+    # A refresh with the same headlines keeps the validators
+    ticker.news_cache.refresh()
+    assert client.get("/api/news", headers={"If-None-Match": etag}).status_code == 304
+    print("OK: unchanged snapshots are answered with 304")
+
+
+SYNTHETIC_WORDS = (
+    "OpenAI Google Meta Microsoft Nvidia Anthropic chip model robot policy law "
+    "ethics quantum startup funding agent vision speech research benchmark "
+    "datacenter safety regulation launch open-source healthcare climate"
+).split()
+SYNTHETIC_SOURCES = ["TechCrunch", "The Verge", "Wired", "VentureBeat", "ZDNet",
+                     "Reuters", "Bloomberg", "Nature", "ScienceDaily"]
+SYNTHETIC_CATEGORIES = ["Breakthrough", "Industry", "Policy", "Research", "Ethics", "Innovation"]
+
+
+def synthetic_headlines(count, seed=0):
+    """Yield random but plausible news items spread over a year"""
+    rng = random.Random(seed)
+    for index in range(count):
+        day = index * 365 // count
+        yield {
+            "date": f"2025-{1 + day // 31 % 12:02d}-{1 + day % 28:02d} "
+                    f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+            "source": rng.choice(SYNTHETIC_SOURCES),
+            "headline": f"[{rng.choice(SYNTHETIC_CATEGORIES)}] "
+                        + " ".join(rng.choice(SYNTHETIC_WORDS) for _ in range(9)),
+        }
+
+
+def bench_archive(args):
+    """Bulk-load synthetic headlines and time /api/search style queries"""
+    path = args.path
+    if os.path.exists(path):
+        os.remove(path)
+    store = HeadlineStore(path)
+
+    start = time.perf_counter()
+    loaded = store.bulk_load(synthetic_headlines(args.headlines), batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"bulk load: {loaded} headlines in {elapsed:.1f}s ({loaded / elapsed:,.0f}/s)")
+
+    queries = [
+        ("common term", {"query": "OpenAI"}),
+        ("two terms", {"query": "quantum chip"}),
+        ("prefix", {"query": "regul*"}),
+        ("source name", {"query": "Reuters policy"}),
+        ("term + month", {"query": "robot", "date_from": "2025-03-01", "date_to": "2025-03-31"}),
+        ("single day", {"date_from": "2025-06-10", "date_to": "2025-06-10"}),
+        ("latest", {}),
+    ]
+    for label, kwargs in queries:
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            store.search(limit=50, **kwargs)
+            samples.append(time.perf_counter() - start)
+        report(f"search: {label}", samples)
+
+    store.close()
+    if not args.keep:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+def reworded(headline, rng):
+    """The same story as another outlet might phrase it"""
+    words = headline.split()
+    variants = [
+        lambda: " ".join(words).lower(),
+        lambda: "[Industry] " + " ".join(words[1:]),
+        lambda: " ".join(words) + " - report",
+        lambda: " ".join(word + "s" if len(word) > 4 and rng.random() < 0.3 else word for word in words),
+        lambda: " ".join(words).replace(" - ", ", "),
+    ]
+    return rng.choice(variants)()
+
+
+def bench_dedup(args):
+    """Near-duplicate index throughput, recall on rewordings and false positives"""
+    rng = random.Random(args.seed)
+    vocabulary = [f"term{index}" for index in range(args.vocabulary)]
+    stories = [
+        f"[{rng.choice(SYNTHETIC_CATEGORIES)}] "
+        + " ".join(rng.choice(vocabulary) for _ in range(6))
+        + " - "
+        + " ".join(rng.choice(vocabulary) for _ in range(4))
+        for _ in range(args.stories)
+    ]
+
+    index = SimHashIndex(max_distance=args.distance, capacity=args.capacity)
+    start = time.perf_counter()
+    false_positives = sum(index.check_and_add(story) is not None for story in stories)
+    elapsed = time.perf_counter() - start
+    print(f"distinct stories: {len(stories) / elapsed:,.0f} headlines/s, "
+          f"{false_positives} false duplicates, index size {len(index)} (cap {args.capacity})")
+
+    # Re-check the most recent stories in another outlet's wording
+    recent = stories[-min(args.capacity, len(stories)):]
+    variants = [reworded(story, rng) for story in rng.sample(recent, min(5000, len(recent)))]
+    start = time.perf_counter()
+    caught = sum(index.check_and_add(variant) is not None for variant in variants)
+    elapsed = time.perf_counter() - start
+    print(f"reworded repeats: {len(variants) / elapsed:,.0f} headlines/s, "
+          f"{caught}/{len(variants)} collapsed ({caught / len(variants):.1%})")
+    assert len(index) <= args.capacity
+
+
+# Layouts the model drifts into that carry no Date/Source/Headline labels
+UNLABELED_LAYOUTS = [
+    lambda items: "\n".join(
+        f"{index}. **{item['source']}** ({item['date']}) - {item['headline']}"
+        for index, item in enumerate(items, 1)
+    ),
+    lambda items: "| Date | Source | Headline |\n|---|---|---|\n" + "\n".join(
+        f"| {item['date']} | {item['source']} | {item['headline']} |" for item in items
+    ),
+    lambda items: "\n\n".join(
+        f"{item['headline']}\n{item['source']}, published {item['date']}" for item in items
+    ),
+]
+
+
+def drifted_text_response(items, drift, rng):
+    """Formatter text for items, drifting out of the labelled format at rate drift"""
+    if rng.random() < drift:
+        return rng.choice(UNLABELED_LAYOUTS)(items)
+    text = "\n\n".join(
+        f"Date: {item['date']}\nSource: {item['source']}\nHeadline: {item['headline']}"
+        for item in items
+    )
+    return mutate_mock_response(text, rng)
+
+
+def bench_structured(args):
+    """Parse failures and run time: output_schema articles vs. parsed text"""
+    from fake_llm import install_fake_llm
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.adk.tools.agent_tool import AgentTool
+    from google.genai import types
+    from greeting_agent.agent import NEWS_ARTICLES_KEY, formatter_agent, root_agent
+
+    rng = random.Random(args.seed)
+    expected = parse_news_text(ticker.mock_news_response())
+    formatter_tool = next(
+        tool for tool in root_agent.tools
+        if isinstance(tool, AgentTool) and tool.agent is formatter_agent
+    )
+    schema = (formatter_agent.output_schema, formatter_agent.output_key, formatter_tool.skip_summarization)
+
+    def configure(path):
+        root_script = [
+            {"tool": "news_search_specialist", "args": {"request": "Find today's AI news"}},
+            {"tool": "news_formatter", "args": {"request": "Format these articles"}},
+        ]
+        if path == "structured":
+            formatted = lambda: json.dumps({"articles": expected})
+            formatter_agent.output_schema, formatter_agent.output_key, formatter_tool.skip_summarization = schema
+        else:
+            # The text pipeline: formatter writes text, the root agent repeats it
+            current = {}
+            formatted = lambda: current.setdefault("text", drifted_text_response(expected, args.drift, rng))
+            root_script.append(lambda: current.pop("text"))
+            formatter_agent.output_schema = formatter_agent.output_key = None
+            formatter_tool.skip_summarization = False
+        install_fake_llm(
+            root_agent,
+            scripts={
+                root_agent.name: root_script,
+                "news_search_specialist": [ticker.mock_news_response],
+                "news_formatter": [formatted],
+            },
+            latency=args.model_latency,
+        )
+
+    async def run_once(runner, session_service, index):
+        session = session_service.create_session(
+            app_name="benchmark", user_id="benchmark", session_id=f"run-{index}"
+        )
+        if inspect.isawaitable(session):
+            session = await session
+        message = types.Content(role="user", parts=[types.Part(text=ticker.build_news_prompt())])
+        text = None
+        articles = None
+        async for event in runner.run_async(user_id="benchmark", session_id=session.id, new_message=message):
+            if NEWS_ARTICLES_KEY in (event.actions.state_delta or {}):
+                articles = event.actions.state_delta[NEWS_ARTICLES_KEY]
+            if event.content and event.content.parts and event.content.parts[0].text:
+                text = event.content.parts[0].text
+        if articles is not None:
+            return parse_structured_articles(articles)
+        return parse_news_text(text or "")
+
+    results = {}
+    for path in ("text", "structured"):
+        configure(path)
+        session_service = InMemorySessionService()
+        runner = Runner(agent=root_agent, app_name="benchmark", session_service=session_service)
+        timings = []
+        dropped = failed = 0
+        for index in range(args.runs):
+            started = time.perf_counter()
+            items = asyncio.run(run_once(runner, session_service, index))
+            timings.append(time.perf_counter() - started)
+            dropped += len(expected) - len(items)
+            failed += not items
+        results[path] = (dropped, failed)
+        report(f"{path} path", timings)
+        print(f"  items dropped: {dropped / (args.runs * len(expected)):.1%}  "
+              f"runs with no items: {failed / args.runs:.1%}")
+
+    formatter_agent.output_schema, formatter_agent.output_key, formatter_tool.skip_summarization = schema
+    assert results["structured"] == (0, 0), results["structured"]
+    print("OK: structured output parsed every article")
+
+
+def bench_fanout(args):
+    """Refresh time: one search per source group in turn vs. all groups at once"""
+    from fake_llm import install_fake_llm
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+    from greeting_agent.agent import SOURCE_GROUPS, group_searchers, news_pipeline, root_agent
+
+    mock_articles = lambda: json.dumps({"articles": parse_news_text(ticker.mock_news_response())})
+    graphs = {
+        # The root agent works through the source groups one tool call at a time
+        "orchestrated": (root_agent, {
+            root_agent.name: [
+                {"tool": "news_search_specialist", "args": {"request": f"Search {label}"}}
+                for label, _ in SOURCE_GROUPS.values()
+            ] + [{"tool": "news_formatter", "args": {"request": "Format these articles"}}],
+            "news_search_specialist": [ticker.mock_news_response],
+            "news_formatter": [mock_articles],
+        }),
+        "parallel": (news_pipeline, {
+            **{searcher.name: [ticker.mock_news_response] for searcher in group_searchers},
+            "news_pipeline_formatter": [mock_articles],
+        }),
+    }
+
+    async def run_once(runner, session_service, index):
+        session = session_service.create_session(
+            app_name="benchmark", user_id="benchmark", session_id=f"run-{index}"
+        )
+        if inspect.isawaitable(session):
+            session = await session
+        message = types.Content(role="user", parts=[types.Part(text=ticker.build_news_prompt())])
+        async for _ in runner.run_async(user_id="benchmark", session_id=session.id, new_message=message):
+            pass
+
+    means = {}
+    for name, (agent, scripts) in graphs.items():
+        install_fake_llm(agent, scripts=scripts, latency=args.model_latency)
+        session_service = InMemorySessionService()
+        runner = Runner(agent=agent, app_name="benchmark", session_service=session_service)
+        timings = []
+        for index in range(args.runs):
+            started = time.perf_counter()
+            asyncio.run(run_once(runner, session_service, index))
+            timings.append(time.perf_counter() - started)
+        report(f"{name} refresh", timings)
+        means[name] = statistics.mean(timings)
+
+    print(f"parallel pipeline is {means['orchestrated'] / means['parallel']:.1f}x faster")
+    assert means["parallel"] < means["orchestrated"] / 2, means
+    print("OK: refresh time is set by the slowest group, not the sum of groups")
+
+
+def bench_budget(args):
+    """Searches run by a "keep searching" loop with and without the budget controller"""
+    from fake_llm import install_fake_llm
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+    from greeting_agent.agent import root_agent, search_budget
+    from greeting_agent.search_budget import SEARCH_BUDGET_KEY
+
+    searches = []
+
+    def one_new_article():
+        # Each search turns up a single new story, so the loop keeps going
+        searches.append(1)
+        return (f"Date: 2025-07-01 12:{len(searches):02d}\nSource: Source {len(searches)}\n"
+                f"Headline: [Research] Story number {len(searches)} - Something Happened")
+
+    install_fake_llm(
+        root_agent,
+        scripts={
+            root_agent.name: [
+                {"tool": "news_search_specialist", "args": {"request": "Search again"}}
+            ] * args.searches + [{"tool": "news_formatter", "args": {"request": "Format"}}],
+            "news_search_specialist": [one_new_article],
+            "news_formatter": [lambda: json.dumps({"articles": []})],
+        },
+        latency=args.model_latency,
+    )
+    callbacks = {
+        name: getattr(root_agent, name)
+        for name in ("before_tool_callback", "after_tool_callback")
+    }
+
+    async def run_once():
+        session_service = InMemorySessionService()
+        runner = Runner(agent=root_agent, app_name="benchmark", session_service=session_service)
+        session = session_service.create_session(app_name="benchmark", user_id="benchmark")
+        if inspect.isawaitable(session):
+            session = await session
+        message = types.Content(role="user", parts=[types.Part(text=ticker.build_news_prompt())])
+        summary = None
+        async for event in runner.run_async(user_id="benchmark", session_id=session.id, new_message=message):
+            summary = event.actions.state_delta.get(SEARCH_BUDGET_KEY, summary)
+        return summary
+
+    cases = [
+        ("no controller", {}, False),
+        ("target of 5 articles", {}, True),
+        (f"limit of {args.max_searches} searches", {"max_searches": args.max_searches,
+                                                    "target_articles": 100}, True),
+        (f"limit of {args.max_seconds}s", {"max_seconds": args.max_seconds,
+                                           "target_articles": 100}, True),
+    ]
+    defaults = {key: getattr(search_budget, key)
+                for key in ("max_searches", "max_seconds", "target_articles")}
+    results = {}
+    for label, limits, enabled in cases:
+        for name, callback in callbacks.items():
+            setattr(root_agent, name, callback if enabled else None)
+        for key, value in dict(defaults, **limits).items():
+            setattr(search_budget, key, value)
+        searches.clear()
+        started = time.perf_counter()
+        summary = asyncio.run(run_once())
+        elapsed = time.perf_counter() - started
+        results[label] = len(searches)
+        print(f"{label:<24} searches={len(searches):<3} time={elapsed * 1000:8.1f}ms  "
+              f"stopped={summary and summary['stopped']}")
+
+    for name, callback in callbacks.items():
+        setattr(root_agent, name, callback)
+    for key, value in defaults.items():
+        setattr(search_budget, key, value)
+    assert results["no controller"] == args.searches, results
+    assert results["target of 5 articles"] == 5, results
+    assert results[f"limit of {args.max_searches} searches"] == args.max_searches, results
+    print("OK: searching stops at the target or the first limit reached")
+
+
+def bench_deadline(args):
+    """Refreshes cut off by the run deadline serve partial headlines instead of hanging"""
+    from fake_llm import install_fake_llm
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from greeting_agent.agent import group_searchers, news_pipeline, pipeline_formatter, search_budget
+    from news_session import NewsSessionManager
+
+    fast, slow = args.model_latency, args.deadline * 3
+    cases = [
+        # label, searcher latencies, formatter latency, search budget reserve
+        ("complete", [fast] * len(group_searchers), fast, 0),
+        ("slow formatter", [fast] * len(group_searchers), slow, 0),
+        ("one slow searcher", [fast] + [slow] * (len(group_searchers) - 1), fast, 0),
+        ("every searcher slow", [slow] * len(group_searchers), fast, 0),
+        # A reserve longer than the run is capped, so the searches still run
+        ("reserve over the run", [fast] * len(group_searchers), fast, args.deadline * 10),
+        ("complete again", [fast] * len(group_searchers), fast, 0),
+    ]
+
+    def headlines(case, group):
+        # Unique per case and group, so the story index never drops them
+        return lambda: "\n\n".join(
+            f"Date: 2025-07-01 {10 + case}:{index:02d}\nSource: {group}\n"
+            f"Headline: [Research] Case {case} story {index} from {group} - Findings Published"
+            for index in range(2)
+        )
+
+    saved = {name: getattr(ticker, name) for name in
+             ("ADK_AVAILABLE", "runner", "news_sessions", "NEWS_RUN_DEADLINE")}
+    saved_reserve = search_budget.deadline_reserve
+    session_service = InMemorySessionService()
+    ticker.runner = Runner(agent=news_pipeline, app_name="benchmark", session_service=session_service)
+    ticker.news_sessions = NewsSessionManager(
+        session_service, app_name="benchmark", user_id=ticker.GLOBAL_USER_ID
+    )
+    ticker.ADK_AVAILABLE = True
+    ticker.NEWS_RUN_DEADLINE = args.deadline
+
+    async def leftover_tasks():
+        return len(asyncio.all_tasks()) - 1
+
+    results = {}
+    try:
+        for case, (label, searcher_latencies, formatter_latency, reserve) in enumerate(cases):
+            for searcher, latency in zip(group_searchers, searcher_latencies):
+                install_fake_llm(searcher, scripts={searcher.name: [headlines(case, searcher.name)]},
+                                 latency=latency)
+            install_fake_llm(pipeline_formatter, scripts={pipeline_formatter.name: [
+                lambda case=case: json.dumps({"articles": parse_news_text(headlines(case, "formatter")())})
+            ]}, latency=formatter_latency)
+            search_budget.deadline_reserve = reserve
+            client = ticker.app.test_client()
+            started = time.perf_counter()
+            response = client.post("/api/refresh", environ_base={"REMOTE_ADDR": f"10.1.0.{case}"})
+            elapsed = time.perf_counter() - started
+            items = response.get_json()
+            fresh = [item for item in items if f"Case {case} " in item["headline"]]
+            results[label] = {
+                "status": response.status_code,
+                "seconds": elapsed,
+                "new": len(fresh),
+                "partial": sum(1 for item in fresh if item.get("partial")),
+                "ticker_partial": sum(1 for item in items if item.get("partial")),
+                "leftover_tasks": ticker.agent_worker.run(leftover_tasks()),
+                "skipped": ticker.last_search_budget.get("skipped"),
+                # Agent spans a cut-off run left behind in the profiler
+                "open_spans": len(ticker.agent_profiler._open),
+            }
+            result = results[label]
+            print(f"{label:<24} status={result['status']} time={elapsed * 1000:7.0f}ms "
+                  f"new={result['new']} partial={result['partial']} "
+                  f"skipped searches={result['skipped']} tasks left={result['leftover_tasks']} "
+                  f"open spans={result['open_spans']}")
+    finally:
+        for name, value in saved.items():
+            setattr(ticker, name, value)
+        search_budget.deadline_reserve = saved_reserve
+
+    limit = args.deadline + 0.5
+    assert all(result["status"] == 200 and result["leftover_tasks"] == 0 and result["open_spans"] == 0
+               for result in results.values()), results
+    assert results["complete"]["new"] > 0 and results["complete"]["partial"] == 0, results
+    for label in ("slow formatter", "one slow searcher", "every searcher slow"):
+        assert results[label]["seconds"] < limit, results
+        assert results[label]["partial"] == results[label]["new"], results
+    # Only the searchers that answered in time contribute headlines
+    assert results["slow formatter"]["new"] > 2 and results["one slow searcher"]["new"] == 2, results
+    assert results["every searcher slow"]["new"] == 0, results
+    assert results["reserve over the run"]["skipped"] == 0 and results["reserve over the run"]["new"] > 0, results
+    assert results["complete again"]["ticker_partial"] == 0, results
+    print(f"OK: refreshes end by the {args.deadline:g}s deadline with the headlines found so far")
+
+
+def bench_topics(args):
+    """Several topic tickers from one shared fetch and one classification call vs. a fetch per topic"""
+    from fake_llm import install_fake_llm
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from greeting_agent.agent import (
+        group_searchers, news_pipeline, pipeline_formatter, search_budget, topic_classifier, TARGET_ARTICLES
+    )
+    from news_session import NewsSessionManager
+    from topics import TopicViews
+
+    all_topics = ["AI", "Robotics", "Chips", "Quantum", "Climate", "Space",
+                  "Biotech", "Security", "Crypto", "Energy", "Fintech", "Mobility"]
+    topics = all_topics[:args.topics]
+
+    rng = random.Random(3)
+
+    def articles(run, wanted):
+        # Five stories per topic, spread over the source groups; the random
+        # words keep the story index from taking one run's stories for another's
+        return [
+            {"date": f"2025-07-{1 + run:02d} {10 + index}:{number:02d}", "source": f"Source {number % 7}",
+             "headline": f"[Industry] {topic} story {index} of run {run} - " + " ".join(
+                 "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=7)) for _ in range(4)
+             )}
+            for number, topic in enumerate(wanted) for index in range(5)
+        ]
+
+    def install(run, wanted):
+        found = articles(run, wanted)
+        for position, searcher in enumerate(group_searchers):
+            text = "\n\n".join(
+                f"Date: {article['date']}\nSource: {article['source']}\nHeadline: {article['headline']}"
+                for article in found[position::len(group_searchers)]
+            )
+            install_fake_llm(searcher, scripts={searcher.name: [lambda text=text: text]},
+                             latency=args.model_latency)
+        install_fake_llm(pipeline_formatter, scripts={pipeline_formatter.name: [
+            lambda: json.dumps({"articles": found})
+        ]}, latency=args.model_latency)
+
+    saved = {name: getattr(ticker, name) for name in
+             ("ADK_AVAILABLE", "runner", "classifier_runner", "news_sessions", "NEWS_TOPICS", "topic_views")}
+    saved_target = search_budget.target_articles
+    session_service = InMemorySessionService()
+    ticker.runner = Runner(agent=news_pipeline, app_name="benchmark", session_service=session_service)
+    ticker.classifier_runner = Runner(agent=topic_classifier, app_name="benchmark", session_service=session_service)
+    ticker.news_sessions = NewsSessionManager(
+        session_service, app_name="benchmark", user_id=ticker.GLOBAL_USER_ID
+    )
+    ticker.ADK_AVAILABLE = True
+    install_fake_llm(topic_classifier, responder=lambda llm_request, step: ticker.fake_topic_assignments(
+        ticker.request_text(llm_request)
+    ), latency=args.model_latency)
+    client = ticker.app.test_client()
+    run_counter = itertools.count()
+
+    def refresh(run_topics):
+        """One refresh serving run_topics; returns its cost from the agent profiles"""
+        run = next(run_counter)
+        install(run, run_topics)
+        ticker.NEWS_TOPICS = list(run_topics)
+        ticker.topic_views = TopicViews(run_topics, ticker.NEWS_TICKER_SIZE)
+        search_budget.target_articles = TARGET_ARTICLES * len(run_topics)
+        profiled = len(ticker.agent_profiler.runs())
+        started = time.perf_counter()
+        response = client.post("/api/refresh", environ_base={"REMOTE_ADDR": f"10.3.{run // 250}.{run % 250}"})
+        elapsed = time.perf_counter() - started
+        assert response.status_code == 200, response.get_json()
+        profiles = ticker.agent_profiler.runs()[profiled:]
+        return run, {
+            "seconds": elapsed,
+            "runs": len(profiles),
+            "model_calls": sum(profile["model_calls"] for profile in profiles),
+            "tokens": sum(profile["input_tokens"] + profile["output_tokens"] for profile in profiles),
+        }
+
+    def report(label, cost):
+        print(f"{label:<34} time={cost['seconds'] * 1000:7.0f}ms agent runs={cost['runs']:<3} "
+              f"model calls={cost['model_calls']:<4} tokens={cost['tokens']}")
+
+    try:
+        separate = {"seconds": 0.0, "runs": 0, "model_calls": 0, "tokens": 0}
+        for topic in topics:
+            _, cost = refresh([topic])
+            for key in separate:
+                separate[key] += cost[key]
+        report(f"{len(topics)} tickers, a fetch per topic", separate)
+
+        run, shared = refresh(topics)
+        report(f"{len(topics)} tickers, one shared fetch", shared)
+
+        # Every topic is served from the shared snapshot without another run
+        profiled = len(ticker.agent_profiler.runs())
+        tickers = {}
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            for topic in topics:
+                tickers[topic] = client.get("/api/news", query_string={"topic": topic.lower()}).get_json()
+        elapsed = time.perf_counter() - started
+        served_runs = len(ticker.agent_profiler.runs()) - profiled
+        print(f"{args.requests * len(topics)} topic requests in {elapsed * 1000:.0f}ms "
+              f"({elapsed / (args.requests * len(topics)) * 1e6:.0f}us each), {served_runs} agent runs")
+        for topic in topics:
+            headlines = [item["headline"] for item in tickers[topic]]
+            print(f"  {topic:<9} {len(headlines)} headlines, e.g. {headlines[0] if headlines else '-'}")
+        unknown = client.get("/api/news", query_string={"topic": "gardening"})
+        print(f"  unknown topic -> {unknown.status_code}")
+    finally:
+        for name, value in saved.items():
+            setattr(ticker, name, value)
+        search_budget.target_articles = saved_target
+
+    assert shared["runs"] == 2 and shared["model_calls"] == len(group_searchers) + 2, shared
+    assert shared["model_calls"] < separate["model_calls"] / len(topics) * 2, (shared, separate)
+    assert served_runs == 0 and unknown.status_code == 404
+    for topic in topics:
+        assert len(tickers[topic]) == ticker.NEWS_TICKER_SIZE, (topic, tickers[topic])
+        assert all(f"{topic} story" in item["headline"] and f"run {run} " in item["headline"]
+                   for item in tickers[topic]), (topic, tickers[topic])
+    print(f"OK: {len(topics)} topics cost one fetch and one classification call "
+          f"({shared['model_calls']} vs. {separate['model_calls']} model calls)")
+
+
+def bench_feeds(args):
+    """Feed ingestion: concurrent conditional polling, streaming parse, one formatting call"""
+    from datetime import datetime, timedelta, timezone
+    import urllib.request
+    from fake_llm import install_fake_llm
+    from feeds import FeedPoller, parse_feed
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from greeting_agent.agent import feed_formatter, group_searchers, news_pipeline, pipeline_formatter
+    from news_session import NewsSessionManager
+
+    now = datetime.now(timezone.utc)
+    sources = [("techcrunch.xml", "TechCrunch"), ("theverge.atom", "The Verge"),
+               ("openai.xml", "OpenAI News"), ("google.atom", "Google AI Blog")]
+
+    def entries(source, count):
+        # Newest first, plus two entries from last week that are too old to pass on
+        return [(f"{source} AI story {index}", now - timedelta(minutes=7 * index))
+                for index in range(count)] + [
+            (f"{source} old story {index}", now - timedelta(days=7, minutes=index)) for index in range(2)
+        ]
+
+    def write(name, source, items):
+        path = os.path.join(directory, name)
+        with open(path, "w") as f:
+            f.write(feed_fixture("atom" if name.endswith(".atom") else "rss", source, items))
+        # Last-Modified has one-second resolution, so make every rewrite visibly newer
+        stamp = time.time() + next(mtime_offsets)
+        os.utime(path, (stamp, stamp))
+
+    directory = tempfile.mkdtemp(prefix="ticker-feeds-")
+    mtime_offsets = iter(range(0, 10 ** 6, 2))
+    server = serve_feed_fixtures(directory, args.feed_latency)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        for name, source in sources:
+            write(name, source, entries(source, args.entries))
+        urls = [f"{base}/{name}" for name, _ in sources]
+        poller = FeedPoller(urls, timeout=10)
+
+        def timed_poll(label):
+            before = dict(poller.results)
+            started = time.perf_counter()
+            new_entries = poller.poll()
+            elapsed = time.perf_counter() - started
+            results = {key: poller.results[key] - before[key] for key in before}
+            print(f"{label:<28} new entries={len(new_entries):<3} time={elapsed * 1000:7.1f}ms  {results}")
+            return new_entries, elapsed, results
+
+        cold, cold_time, cold_results = timed_poll("first poll")
+        unchanged, _, unchanged_results = timed_poll("unchanged feeds")
+        for (name, source), added in zip(sources, (2, 1)):
+            breaking = [(f"{source} breaking story {index}", now) for index in range(added)]
+            write(name, source, breaking + entries(source, args.entries))
+        updated, _, updated_results = timed_poll("two feeds updated")
+        assert len(cold) == args.entries * len(sources) and cold_results["modified"] == len(sources), cold_results
+        # One feed's latency, not the sum of all of them
+        assert cold_time < args.feed_latency * 2 + 0.5, cold_time
+        assert not unchanged and unchanged_results["not_modified"] == len(sources), unchanged_results
+        assert len(updated) == 3 and updated_results["modified"] == 2, updated_results
+        assert all("breaking" in entry["title"] for entry in updated), [entry["title"] for entry in updated]
+        print(f"  ETag (.atom) and Last-Modified (.xml) both answered with 304 when unchanged")
+
+        # Streaming: reading stops after max_entries, however large the feed
+        big = os.path.join(directory, "big.xml")
+        with open(big, "w") as f:
+            f.write(feed_fixture("rss", "Big", entries("Big", args.big_feed)))
+        size = os.path.getsize(big)
+        for label, limit in (("first 50 entries", 50), ("whole feed", args.big_feed + 2)):
+            started = time.perf_counter()
+            with urllib.request.urlopen(f"{base}/big.xml") as response:
+                count = sum(1 for _ in parse_feed(response, max_entries=limit))
+            print(f"  {size / 1e6:.1f}MB feed, {label:<18} {count:>6} entries in "
+                  f"{(time.perf_counter() - started) * 1000:7.1f}ms")
+
+        # End to end: search refresh vs. feed refresh through the app
+        mock_articles = lambda: json.dumps({"articles": parse_news_text(ticker.mock_news_response())})
+        install_fake_llm(news_pipeline, scripts={
+            **{searcher.name: [ticker.mock_news_response] for searcher in group_searchers},
+            pipeline_formatter.name: [mock_articles],
+        }, latency=args.model_latency)
+        install_fake_llm(feed_formatter, responder=lambda llm_request, step: json.dumps(
+            {"articles": parse_news_text(ticker.request_text(llm_request))[:5]}
+        ), latency=args.model_latency)
+        saved = {name: getattr(ticker, name) for name in
+                 ("ADK_AVAILABLE", "runner", "feed_runner", "news_sessions", "feed_poller")}
+        session_service = InMemorySessionService()
+        ticker.runner = Runner(agent=news_pipeline, app_name="benchmark", session_service=session_service)
+        ticker.feed_runner = Runner(agent=feed_formatter, app_name="benchmark", session_service=session_service)
+        ticker.news_sessions = NewsSessionManager(
+            session_service, app_name="benchmark", user_id=ticker.GLOBAL_USER_ID
+        )
+        ticker.ADK_AVAILABLE = True
+        try:
+            runs = {}
+            modes = [("search", None), ("feeds", FeedPoller(urls)), ("feeds, nothing new", "same")]
+            for case, (label, poller_for_mode) in enumerate(modes):
+                if poller_for_mode != "same":
+                    ticker.feed_poller = poller_for_mode
+                profiled = len(ticker.agent_profiler.runs())
+                started = time.perf_counter()
+                response = ticker.app.test_client().post(
+                    "/api/refresh", environ_base={"REMOTE_ADDR": f"10.2.0.{case}"}
+                )
+                elapsed = time.perf_counter() - started
+                profile = ticker.agent_profiler.last_run() if len(ticker.agent_profiler.runs()) > profiled else None
+                runs[label] = {
+                    "status": response.status_code,
+                    "seconds": elapsed,
+                    "model_calls": profile["model_calls"] if profile else 0,
+                    "tokens": profile["input_tokens"] + profile["output_tokens"] if profile else 0,
+                    "sources": sorted({item["source"] for item in response.get_json()}),
+                }
+                print(f"{label + ' refresh':<28} time={elapsed * 1000:7.1f}ms model calls={runs[label]['model_calls']:<2} "
+                      f"tokens={runs[label]['tokens']:<6} sources={runs[label]['sources']}")
+        finally:
+            for name, value in saved.items():
+                setattr(ticker, name, value)
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    assert all(run["status"] == 200 for run in runs.values()), runs
+    assert runs["feeds"]["model_calls"] == 1 and runs["search"]["model_calls"] > 1, runs
+    assert runs["feeds, nothing new"]["model_calls"] == 0, runs
+    # The ticker keeps the earlier search headlines next to the feed ones
+    assert {source for _, source in sources} & set(runs["feeds"]["sources"]), runs
+    print("OK: feed refreshes take one formatting call, and none when the feeds are unchanged")
+
+
+def bench_schedule(args):
+    """Adaptive per-feed poll intervals vs. a fixed cadence over a simulated day"""
+    from datetime import datetime
+    from feed_scheduler import FeedScheduler
+    from feeds import FeedPoller
+
+    rng = random.Random(args.seed)
+    random.seed(args.seed)  # the scheduler's jitter
+    # (file, source, mean seconds between posts)
+    sources = [("wire.atom", "Newswire", 180), ("techblog.atom", "Tech Blog", 1800),
+               ("lab.atom", "Research Lab", 4 * 3600), ("journal.atom", "Journal", 12 * 3600)]
+    end = time.time()
+    start = end - args.hours * 3600
+    # A day of history before the simulation, then the simulated hours
+    published = {}
+    for name, source, mean_gap in sources:
+        stamps, stamp = [], start - 24 * 3600
+        while True:
+            stamp += mean_gap * rng.uniform(0.5, 1.5)
+            if stamp > end:
+                break
+            stamps.append(stamp)
+        published[name] = stamps
+
+    directory = tempfile.mkdtemp(prefix="ticker-schedule-")
+    server = serve_feed_fixtures(directory, 0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    clock = {"now": start}
+    written = {}
+
+    def write_feeds():
+        # Rewrite a feed only when it has a new post, so unchanged feeds answer 304
+        for name, source, _ in sources:
+            count = sum(1 for stamp in published[name] if stamp <= clock["now"])
+            if written.get(name) == count:
+                continue
+            written[name] = count
+            entries = [(f"{source} story {index}", datetime.fromtimestamp(published[name][index]).astimezone())
+                       for index in range(count - 1, max(-1, count - 31), -1)]
+            with open(os.path.join(directory, name), "w") as f:
+                f.write(feed_fixture("atom", source, entries))
+
+    def simulate(label, **options):
+        written.clear()
+        clock["now"] = start
+        write_feeds()
+        poller = FeedPoller([f"{base}/{name}" for name, _, _ in sources] + [f"{base}/missing.atom"],
+                            max_age=3 * 86400, max_workers=args.max_concurrent)
+        delays = collections.defaultdict(list)
+
+        def on_entries(entries):
+            for entry in entries:
+                stamp = entry["published"].timestamp()
+                if stamp > start:
+                    delays[entry["source"]].append(clock["now"] - stamp)
+
+        scheduler = FeedScheduler(poller, on_entries=on_entries, clock=lambda: clock["now"], **options)
+        started = time.perf_counter()
+        while scheduler.next_due() <= end:
+            clock["now"] = max(clock["now"], scheduler.next_due())
+            write_feeds()
+            scheduler.poll_due()
+        stats = scheduler.stats()
+        print(f"{label:<10} polls={stats['polls']:<5} hits={stats['hits']:<4} hit rate={stats['hit_rate']:.1%}  "
+              f"({(time.perf_counter() - started) * 1000:.0f}ms for {args.hours}h)")
+        for (name, source, _), feed in zip(sources, stats["feeds"]):
+            found = delays[source]
+            posted = sum(1 for stamp in published[name] if start < stamp <= end)
+            print(f"  {source:<13} polls={feed['polls']:<4} hit rate={feed['hit_rate']:6.1%} "
+                  f"interval={feed['interval']:6.0f}s found={len(found)}/{posted} "
+                  f"mean delay={statistics.mean(found) if found else 0:6.0f}s")
+        broken = stats["feeds"][-1]
+        print(f"  {'(404 feed)':<13} polls={broken['polls']:<4} errors={broken['errors']} interval={broken['interval']:.0f}s")
+        return stats, delays
+
+    try:
+        fixed, fixed_delays = simulate("fixed", min_interval=300, max_interval=300, jitter=0)
+        adaptive, adaptive_delays = simulate("adaptive", min_interval=args.min_interval,
+                                             max_interval=args.max_interval)
+
+        # Global cap on feed requests in flight, with slow responses
+        server.peak_requests = 0
+        latency_server = serve_feed_fixtures(directory, 0.1)
+        latency_base = f"http://127.0.0.1:{latency_server.server_address[1]}"
+        started = time.perf_counter()
+        FeedPoller([f"{latency_base}/{name}" for name, _, _ in sources],
+                   max_workers=args.max_concurrent).poll()
+        elapsed = time.perf_counter() - started
+        peak = latency_server.peak_requests
+        latency_server.shutdown()
+        latency_server.server_close()
+        print(f"{len(sources)} feeds, cap {args.max_concurrent}: peak {peak} requests at once, {elapsed * 1000:.0f}ms")
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    fast, slow = sources[0][1], sources[-1][1]
+    assert adaptive["polls"] < fixed["polls"] and adaptive["hit_rate"] > fixed["hit_rate"], (fixed, adaptive)
+    assert statistics.mean(adaptive_delays[fast]) < statistics.mean(fixed_delays[fast])
+    assert adaptive["feeds"][-2]["polls"] < fixed["feeds"][-2]["polls"] / 4, adaptive["feeds"][-2]
+    assert adaptive["feeds"][-1]["polls"] < fixed["feeds"][-1]["polls"] / 4, adaptive["feeds"][-1]
+    assert peak <= args.max_concurrent, peak
+    print(f"OK: fewer polls with a higher hit rate, {fast} is found sooner, {slow} and the broken feed are polled less")
+
+
+def bench_search_cache(args):
+    """Refresh time and hit rate with the search cache, across a restart, TTL and LRU"""
+    from fake_llm import install_fake_llm
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+    from greeting_agent import agent as news_agent
+    from greeting_agent.search_cache import SearchCache
+
+    directory = tempfile.mkdtemp(prefix="search-cache-")
+    path = os.path.join(directory, "search_cache.db")
+    original_cache = news_agent.search_cache
+    install_fake_llm(
+        news_agent.news_pipeline,
+        scripts={
+            **{searcher.name: [ticker.mock_news_response] for searcher in news_agent.group_searchers},
+            "news_pipeline_formatter": [lambda: json.dumps({"articles": []})],
+        },
+        latency=args.model_latency,
+    )
+
+    async def refresh():
+        session_service = InMemorySessionService()
+        runner = Runner(agent=news_agent.news_pipeline, app_name="benchmark", session_service=session_service)
+        session = session_service.create_session(app_name="benchmark", user_id="benchmark")
+        if inspect.isawaitable(session):
+            session = await session
+        message = types.Content(role="user", parts=[types.Part(text=ticker.build_news_prompt())])
+        async for _ in runner.run_async(user_id="benchmark", session_id=session.id, new_message=message):
+            pass
+
+    def timed_refreshes(label, count):
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            asyncio.run(refresh())
+            timings.append(time.perf_counter() - started)
+        report(label, timings)
+
+    try:
+        news_agent.search_cache = SearchCache(path, ttl=args.ttl, max_entries=args.max_entries)
+        timed_refreshes("cold cache", 1)
+        cold = news_agent.search_cache.stats()
+        timed_refreshes("warm cache", args.refreshes)
+        warm = news_agent.search_cache.stats()
+        print(f"  {warm}")
+        # At the default article target, a cached answer must not stop the other groups
+        groups = len(news_agent.group_searchers)
+        assert cold["misses"] == groups, cold
+        assert warm["hits"] == groups * args.refreshes and warm["misses"] == groups, warm
+
+        # A new process opening the same file starts warm
+        news_agent.search_cache = SearchCache(path, ttl=args.ttl, max_entries=args.max_entries)
+        timed_refreshes("after restart", args.refreshes)
+        restarted = news_agent.search_cache.stats()
+        print(f"  {restarted}")
+        assert restarted["misses"] == 0, restarted
+
+        news_agent.search_cache.ttl = 0.01
+        time.sleep(0.02)
+        timed_refreshes("expired entries", 1)
+        expired = news_agent.search_cache.stats()
+        assert expired["expired"] == len(news_agent.group_searchers), expired
+
+        small = SearchCache(path, ttl=args.ttl, max_entries=2, namespace="lru")
+        for index in range(5):
+            small.put("agent", f"query {index}", "{}")
+        small.get("agent", "query 3")
+        small.put("agent", "query 5", "{}")
+        assert small.get("agent", "query 3") is not None and small.get("agent", "query 4") is None
+        assert small.stats()["entries"] == 2 and small.stats()["evictions"] == 4, small.stats()
+        print(f"  LRU with 2 entries: {small.stats()}")
+    finally:
+        news_agent.search_cache = original_cache
+        shutil.rmtree(directory, ignore_errors=True)
+    print("OK: repeated searches are answered from the cache, also after a restart")
+
+
+def worker_process(agent_latency, reads, barrier, results):
+    """One simulated server worker: cold start, refresh burst, then hot reads"""
+    runs = []
+    original = ticker.run_agent_sync
+
+    def counting_run_agent_sync(user_message, on_text=None, on_articles=None, **options):
+        runs.append(user_message)
+        time.sleep(agent_latency)
+        return original(user_message, on_text, on_articles, **options)
+
+    ticker.run_agent_sync = counting_run_agent_sync
+    client = ticker.app.test_client()
+
+    barrier.wait()
+    started = time.perf_counter()
+    cold = client.get("/api/news")
+    cold_latency = time.perf_counter() - started
+
+    barrier.wait()
+    refreshed = client.post("/api/refresh")
+
+    barrier.wait()
+    started = time.perf_counter()
+    for _ in range(reads):
+        client.get("/api/news")
+    read_time = time.perf_counter() - started
+
+    results.put({
+        "runs": len(runs),
+        "cold_latency": cold_latency,
+        "read_time": read_time,
+        "ok": cold.status_code == 200 and refreshed.status_code == 200,
+        "ids": [item["id"] for item in refreshed.get_json()],
+    })
+
+
+def run_workers(count, shared, args):
+    """Start count worker processes against fresh archive/cache files"""
+    directory = tempfile.mkdtemp(prefix="ticker-workers-")
+    env = {
+        "NEWS_ARCHIVE_PATH": os.path.join(directory, "archive.db"),
+        "NEWS_SHARED_CACHE_PATH": os.path.join(directory, "cache.db") if shared else "",
+    }
+    previous = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    # Fresh interpreters, so each worker imports the app with this config
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(count)
+    results = context.Queue()
+    try:
+        processes = [
+            context.Process(target=worker_process,
+                            args=(args.agent_latency, args.reads, barrier, results))
+            for _ in range(count)
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get(timeout=600) for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(directory, ignore_errors=True)
+    return collected
+
+
+def bench_workers(args):
+    """Compare agent runs and read throughput for 1 and N worker processes"""
+    modes = [
+        ("1 worker", 1, False),
+        (f"{args.workers} workers, per-process cache", args.workers, False),
+        (f"{args.workers} workers, shared cache", args.workers, True),
+    ]
+    summary = {}
+    for label, count, shared in modes:
+        collected = run_workers(count, shared, args)
+        assert all(result["ok"] for result in collected), collected
+        runs = sum(result["runs"] for result in collected)
+        reads = args.reads * count
+        read_time = max(result["read_time"] for result in collected)
+        print(f"{label:<36} agent runs={runs:<3} "
+              f"cold p50={statistics.median(r['cold_latency'] for r in collected) * 1000:8.1f}ms  "
+              f"hot reads={reads / read_time:8.0f} req/s")
+        summary[shared] = collected, runs
+
+    collected, runs = summary[True]
+    # Cold start and the refresh burst each need exactly one run across all workers
+    assert runs == 2, f"expected 2 agent runs across shared workers, got {runs}"
+    assert all(result["ids"] == collected[0]["ids"] for result in collected), "workers disagree"
+    print("OK: one refresh served every worker")
+
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# Time from the start of "import app" to the first / response and to the
+# agents being ready, printed as JSON by a fresh interpreter
+STARTUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import app
+app.app.test_client().get("/")
+first_page = time.perf_counter() - started
+app.agent_ready.wait()
+print(json.dumps({"first_page": first_page, "agent_ready": time.perf_counter() - started}))
+"""
+
+
+def app_subprocess(args, **env):
+    """Run python with args in a fresh interpreter in mock mode, return stdout and stderr"""
+    result = subprocess.run(
+        [sys.executable, *args],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout, result.stderr
+
+
+def import_profile():
+    """Cumulative import time in seconds per module and self time per package for "import app" """
+    _, stderr = app_subprocess(["-X", "importtime", "-c", "import app"], NEWS_STARTUP="eager")
+    modules = {}
+    packages = collections.Counter()
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        modules[name] = int(cumulative_us) / 1e6
+        # google is a namespace package, so group by google.adk, google.genai, ...
+        parts = name.split(".")
+        packages[".".join(parts[:2] if parts[0] == "google" and len(parts) > 1 else parts[:1])] += (
+            int(self_us) / 1e6
+        )
+    return modules, packages
+
+
+def bench_imports(args):
+    """Import-time profile of the app and time to first page in eager and background startup"""
+    modules, packages = import_profile()
+    total = modules.get("app", sum(packages.values()))
+    print(f"import app: {total * 1000:.0f}ms, {len(modules)} modules")
+    print(f"  {'package (self time of all its modules)':<48} {'ms':>8} {'share':>6}")
+    for name, seconds in packages.most_common(args.top):
+        print(f"  {name:<48} {seconds * 1000:>8.1f} {seconds / total:>6.1%}")
+    print(f"  {'module (cumulative)':<48} {'ms':>8} {'share':>6}")
+    for name, seconds in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<48} {seconds * 1000:>8.1f} {seconds / total:>6.1%}")
+
+    startup = {}
+    for mode in ("eager", "background"):
+        samples = [
+            json.loads(app_subprocess(["-c", STARTUP_SCRIPT], NEWS_STARTUP=mode)[0].splitlines()[-1])
+            for _ in range(args.repeat)
+        ]
+        startup[mode] = {key: statistics.median(sample[key] for sample in samples)
+                         for key in ("first_page", "agent_ready")}
+        print(f"NEWS_STARTUP={mode:<11} first / after {startup[mode]['first_page'] * 1000:7.0f}ms, "
+              f"agents ready after {startup[mode]['agent_ready'] * 1000:7.0f}ms (median of {args.repeat})")
+
+    profile = {
+        "import_seconds": round(total, 4),
+        "packages": {name: round(seconds, 4) for name, seconds in packages.most_common()},
+        "modules": {name: round(seconds, 4) for name, seconds in modules.items()},
+        "startup": {mode: {key: round(value, 4) for key, value in timings.items()}
+                    for mode, timings in startup.items()},
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(profile, f, indent=2)
+        print(f"Saved import profile to {args.save}")
+
+    assert startup["background"]["first_page"] < startup["eager"]["first_page"], startup
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = []
+        checks = [("import app", baseline["import_seconds"], profile["import_seconds"])] + [
+            (name, baseline["packages"][name], seconds)
+            for name, seconds in profile["packages"].items() if name in baseline["packages"]
+        ]
+        print(f"compared with {args.baseline}:")
+        for name, before, after in checks:
+            change = (after - before) / before if before else math.inf
+            # A few milliseconds either way is noise, even for small packages
+            slower = after - before > max(args.min_seconds, before * args.tolerance)
+            flag = "  REGRESSION" if slower else ""
+            if flag or name == "import app":
+                print(f"  {name:<48} {before * 1000:>8.1f} -> {after * 1000:>8.1f}ms {change:+7.1%}{flag}")
+            if flag:
+                regressions.append(name)
+        assert not regressions, f"import time regressed beyond {args.tolerance:.0%}: {regressions}"
+    print("OK: background startup serves / before the agents are imported")
+
+
+def load_root_agent(path):
+    """Import root_agent from an agent package directory"""
+    path = os.path.abspath(path)
+    sys.path.insert(0, os.path.dirname(path))
+    module = importlib.import_module(f"{os.path.basename(path)}.agent")
+    return module.root_agent
+
+
+def bench_agents(args):
+    """End-to-end runs of any agent graph against the fake LLM"""
+    from agent_profiler import AgentProfiler, format_run
+    from fake_llm import install_fake_llm
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    root_agent = load_root_agent(args.agent)
+    fakes = install_fake_llm(
+        root_agent, latency=args.model_latency, chunk_delay=args.chunk_delay
+    )
+    print(f"{root_agent.name}: {len(fakes)} LLM agent(s) -> {', '.join(fakes)}")
+    profiler = AgentProfiler() if args.profile else None
+    if profiler is not None:
+        profiler.instrument(root_agent)
+
+    session_service = InMemorySessionService()
+    runner = Runner(agent=root_agent, app_name="benchmark", session_service=session_service)
+    run_config = RunConfig(
+        streaming_mode=StreamingMode.SSE if args.stream else StreamingMode.NONE
+    )
+
+    async def run_once(index):
+        session = session_service.create_session(
+            app_name="benchmark", user_id="benchmark", session_id=f"run-{index}"
+        )
+        if inspect.isawaitable(session):  # async in newer ADK releases
+            session = await session
+        message = types.Content(role="user", parts=[types.Part(text=args.message)])
+        started = time.perf_counter()
+        first_text = None
+        events = prompt_tokens = 0
+        async for event in runner.run_async(
+            user_id="benchmark", session_id=session.id, new_message=message, run_config=run_config
+        ):
+            events += 1
+            if first_text is None and event.content and any(p.text for p in event.content.parts or []):
+                first_text = time.perf_counter() - started
+            if event.usage_metadata and not event.partial:
+                prompt_tokens += event.usage_metadata.prompt_token_count or 0
+        return time.perf_counter() - started, first_text or 0.0, events, prompt_tokens
+
+    async def run_all():
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def limited(index):
+            async with semaphore:
+                return await run_once(index)
+
+        return await asyncio.gather(*(limited(index) for index in range(args.runs)))
+
+    started = time.perf_counter()
+    results = asyncio.run(run_all())
+    wall = time.perf_counter() - started
+
+    report("end-to-end run", [result[0] for result in results])
+    report("time to first text", [result[1] for result in results])
+    print(f"events per run: {statistics.mean(result[2] for result in results):.1f}, "
+          f"prompt tokens per run: {statistics.mean(result[3] for result in results):.0f}")
+    print(f"{args.runs} runs in {wall:.2f}s ({args.runs / wall:.1f} runs/s at concurrency {args.concurrency})")
+    if profiler is not None:
+        print(f"per agent, mean of {args.runs} runs:")
+        print(format_run(profiler.mean()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    cache = subparsers.add_parser("cache", help="/api/news latency before and after caching")
+    cache.add_argument("--requests", type=int, default=50)
+    cache.add_argument("--agent-latency", type=float, default=0.2,
+                       help="seconds added to each mock agent run")
+    cache.add_argument("--ttl", type=float, default=300,
+                       help="cache TTL in seconds (lower it to exercise revalidation)")
+    cache.set_defaults(func=bench_cache)
+
+    coalesce = subparsers.add_parser("coalesce", help="concurrent refreshes share one agent run")
+    coalesce.add_argument("--clients", type=int, default=20)
+    coalesce.add_argument("--agent-latency", type=float, default=1.0,
+                          help="seconds each mock agent run takes")
+    coalesce.set_defaults(func=bench_coalesce)
+
+    overhead = subparsers.add_parser("overhead", help="per-request event loop overhead")
+    overhead.add_argument("--requests", type=int, default=2000)
+    overhead.set_defaults(func=bench_overhead)
+
+    admission = subparsers.add_parser("admission", help="refresh rate limits and 429s under a refresh burst")
+    admission.add_argument("--clients", type=int, default=8)
+    admission.add_argument("--clicks", type=int, default=10, help="refresh clicks per client")
+    admission.add_argument("--agent-latency", type=float, default=0.5,
+                           help="seconds each mock agent run takes")
+    admission.set_defaults(func=bench_admission)
+
+    metrics_bench = subparsers.add_parser("metrics", help="/metrics collector cost on the hot path")
+    metrics_bench.add_argument("--requests", type=int, default=2000)
+    metrics_bench.add_argument("--rounds", type=int, default=10)
+    metrics_bench.add_argument("--scrapes", type=int, default=200)
+    metrics_bench.set_defaults(func=bench_metrics)
+
+    parser_bench = subparsers.add_parser("parser", help="headline parser throughput and fuzzing")
+    parser_bench.add_argument("--articles", type=int, default=20000)
+    parser_bench.add_argument("--repeat", type=int, default=5)
+    parser_bench.add_argument("--fuzz-cases", type=int, default=2000)
+    parser_bench.add_argument("--seed", type=int, default=0)
+    parser_bench.set_defaults(func=bench_parser)
+
+    wire = subparsers.add_parser("wire", help="conditional GET and compression on /api/news")
+    wire.set_defaults(func=bench_wire)
+
+    archive = subparsers.add_parser("archive", help="headline archive bulk load and search")
+    archive.add_argument("--headlines", type=int, default=1000000)
+    archive.add_argument("--batch-size", type=int, default=50000)
+    archive.add_argument("--repeat", type=int, default=50)
+    archive.add_argument("--path", default="benchmark_archive.db")
+    archive.add_argument("--keep", action="store_true", help="keep the database file afterwards")
+    archive.set_defaults(func=bench_archive)
+
+    dedup = subparsers.add_parser("dedup", help="SimHash near-duplicate index")
+    dedup.add_argument("--stories", type=int, default=50000)
+    dedup.add_argument("--vocabulary", type=int, default=20000)
+    dedup.add_argument("--distance", type=int, default=6)
+    dedup.add_argument("--capacity", type=int, default=10000)
+    dedup.add_argument("--seed", type=int, default=0)
+    dedup.set_defaults(func=bench_dedup)
+
+    structured = subparsers.add_parser("structured", help="output_schema articles vs. text parsing")
+    structured.add_argument("--runs", type=int, default=50)
+    structured.add_argument("--drift", type=float, default=0.2,
+                            help="share of text responses that drop the labelled format")
+    structured.add_argument("--model-latency", type=float, default=0.05,
+                            help="seconds before each fake model call answers")
+    structured.add_argument("--seed", type=int, default=0)
+    structured.set_defaults(func=bench_structured)
+
+    fanout = subparsers.add_parser("fanout", help="parallel source-group search vs. orchestrated")
+    fanout.add_argument("--runs", type=int, default=10)
+    fanout.add_argument("--model-latency", type=float, default=0.3,
+                        help="seconds before each fake model call answers")
+    fanout.set_defaults(func=bench_fanout)
+
+    budget = subparsers.add_parser("budget", help="search budget controller on a runaway search loop")
+    budget.add_argument("--searches", type=int, default=12,
+                        help="search calls the root agent attempts before formatting")
+    budget.add_argument("--max-searches", type=int, default=3)
+    budget.add_argument("--max-seconds", type=float, default=0.5)
+    budget.add_argument("--model-latency", type=float, default=0.1,
+                        help="seconds before each fake model call answers")
+    budget.set_defaults(func=bench_budget)
+
+    deadline = subparsers.add_parser("deadline", help="run deadline with partial results")
+    deadline.add_argument("--deadline", type=float, default=1.0, help="seconds per agent run")
+    deadline.add_argument("--model-latency", type=float, default=0.1,
+                          help="seconds before each fast fake model call answers")
+    deadline.set_defaults(func=bench_deadline)
+
+    topics = subparsers.add_parser("topics", help="topic tickers from one shared fetch vs. a fetch per topic")
+    topics.add_argument("--topics", type=int, default=10, help="number of topic tickers (up to 12)")
+    topics.add_argument("--requests", type=int, default=100, help="requests per topic after the refresh")
+    topics.add_argument("--model-latency", type=float, default=0.1,
+                        help="seconds before each fake model call answers")
+    topics.set_defaults(func=bench_topics)
+
+    feeds = subparsers.add_parser("feeds", help="RSS/Atom ingestion instead of search")
+    feeds.add_argument("--entries", type=int, default=6, help="recent entries per fixture feed")
+    feeds.add_argument("--feed-latency", type=float, default=0.2,
+                       help="seconds the fixture server waits before each response")
+    feeds.add_argument("--big-feed", type=int, default=20000,
+                       help="entries in the feed used for the streaming parse")
+    feeds.add_argument("--model-latency", type=float, default=0.3,
+                       help="seconds before each fake model call answers")
+    feeds.set_defaults(func=bench_feeds)
+
+    schedule = subparsers.add_parser("schedule", help="adaptive per-feed polling vs. a fixed cadence")
+    schedule.add_argument("--hours", type=float, default=24, help="simulated hours")
+    schedule.add_argument("--min-interval", type=float, default=60)
+    schedule.add_argument("--max-interval", type=float, default=3600)
+    schedule.add_argument("--max-concurrent", type=int, default=2, help="feed requests allowed at once")
+    schedule.add_argument("--seed", type=int, default=7)
+    schedule.set_defaults(func=bench_schedule)
+
+    search_cache = subparsers.add_parser("search-cache", help="TTL + LRU cache of search answers")
+    search_cache.add_argument("--refreshes", type=int, default=5)
+    search_cache.add_argument("--ttl", type=float, default=600)
+    search_cache.add_argument("--max-entries", type=int, default=500)
+    search_cache.add_argument("--model-latency", type=float, default=0.3,
+                              help="seconds before each fake model call answers")
+    search_cache.set_defaults(func=bench_search_cache)
+
+    workers = subparsers.add_parser("workers", help="1 vs N worker processes sharing a cache")
+    workers.add_argument("--workers", type=int, default=4)
+    workers.add_argument("--agent-latency", type=float, default=1.0,
+                         help="seconds each mock agent run takes")
+    workers.add_argument("--reads", type=int, default=2000,
+                         help="hot /api/news reads per worker")
+    workers.set_defaults(func=bench_workers)
+
+    imports = subparsers.add_parser("imports", help="import-time profile and cold start time")
+    imports.add_argument("--top", type=int, default=15, help="packages and modules listed")
+    imports.add_argument("--repeat", type=int, default=3, help="cold starts timed per startup mode")
+    imports.add_argument("--save", help="write the profile as JSON, e.g. as a baseline")
+    imports.add_argument("--baseline", help="profile JSON to compare against")
+    imports.add_argument("--tolerance", type=float, default=0.2,
+                         help="allowed slowdown per package before it counts as a regression")
+    imports.add_argument("--min-seconds", type=float, default=0.02,
+                         help="slowdown in seconds always tolerated, however small the package")
+    imports.set_defaults(func=bench_imports)
+
+    agents = subparsers.add_parser("agents", help="run any agent graph against the fake LLM")
+    agents.add_argument("--agent", default=os.path.join(os.path.dirname(__file__), "greeting_agent"),
+                        help="agent package directory exporting root_agent")
+    agents.add_argument("--message", default="Hello, what can you do?")
+    agents.add_argument("--runs", type=int, default=20)
+    agents.add_argument("--concurrency", type=int, default=4)
+    agents.add_argument("--model-latency", type=float, default=0.1,
+                        help="seconds before each fake model call answers")
+    agents.add_argument("--chunk-delay", type=float, default=0.0,
+                        help="seconds between streamed chunks")
+    agents.add_argument("--stream", action="store_true", help="use SSE streaming mode")
+    agents.add_argument("--profile", action="store_true",
+                        help="break time and tokens down per agent")
+    agents.set_defaults(func=bench_agents)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
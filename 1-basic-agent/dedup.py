@@ -0,0 +1,150 @@
+"""
+Near-Duplicate Headline Detection
+
+Fingerprints headlines with a 64-bit SimHash over normalised word
+shingles and keeps recent fingerprints in a bounded in-memory index, so
+the same story is recognised when it comes back on the next refresh or
+from another source with slightly different wording.
+
+Lookups use the pigeonhole trick: the fingerprint is split into
+max_distance + 1 bands, and any fingerprint within max_distance bits must
+match at least one band exactly, so only a few candidates are compared.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from itertools import chain
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its new now of on "
+    "or over says the to up with will".split()
+)
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+CATEGORY_PATTERN = re.compile(r"^\s*\[[^\]]*\]\s*")
+SUFFIXES = ("ing", "ed", "es", "s", "ly")
+
+# Bits of every byte value, least significant first
+BYTE_BITS = [tuple(byte >> bit & 1 for bit in range(8)) for byte in range(256)]
+
+# int.bit_count() is Python 3.10+
+_popcount = getattr(int, "bit_count", None) or (lambda value: bin(value).count("1"))
+
+# Bit vectors of recently seen features, so common words are hashed once
+_feature_bits = {}
+FEATURE_CACHE_SIZE = 200000
+
+
+def _stem(token):
+    """Crude suffix stripping so "launches" and "launch" hash alike"""
+    if len(token) > 4:
+        for suffix in SUFFIXES:
+            if token.endswith(suffix):
+                return token[:-len(suffix)]
+    return token
+
+
+def normalize(headline):
+    """Stemmed, lowercased content words of a headline without its [Category] tag"""
+    text = CATEGORY_PATTERN.sub("", headline).lower()
+    return [_stem(token) for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+
+def _bits(feature):
+    bits = _feature_bits.get(feature)
+    if bits is None:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        bits = tuple(chain.from_iterable(map(BYTE_BITS.__getitem__, digest)))
+        if len(_feature_bits) >= FEATURE_CACHE_SIZE:
+            _feature_bits.clear()
+        _feature_bits[feature] = bits
+    return bits
+
+
+def simhash(headline):
+    """64-bit SimHash of a headline's unigrams and word bigrams"""
+    tokens = normalize(headline)
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+
+    # Column sums give, per bit, how many features have it set
+    counts = map(sum, zip(*map(_bits, features)))
+    threshold = len(features) / 2
+    fingerprint = 0
+    for bit, count in enumerate(counts):
+        if count > threshold:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class SimHashIndex:
+    """Bounded LRU index of headline fingerprints for near-duplicate lookups"""
+
+    def __init__(self, max_distance=6, capacity=10000):
+        """
+        Args:
+            max_distance: Largest Hamming distance still treated as the same story
+            capacity: Fingerprints kept before the least recently seen is evicted
+        """
+        self.max_distance = max_distance
+        self.capacity = capacity
+        self._bands = max_distance + 1
+        self._band_bits = 64 // self._bands
+        self._band_mask = (1 << self._band_bits) - 1
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._tables = [{} for _ in range(self._bands)]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def check_and_add(self, headline, value=None):
+        """
+        Look up a headline and remember it.
+
+        Returns:
+            The value stored for the matching earlier story, or None if the
+            headline is new (it is then added to the index with value)
+        """
+        fingerprint = simhash(headline)
+        with self._lock:
+            match = self._find(fingerprint)
+            if match is not None:
+                # Seen again - keep the original story from being evicted
+                self._entries.move_to_end(match)
+                return self._entries[match]
+
+            self._entries[fingerprint] = value if value is not None else headline
+            for band, table in enumerate(self._tables):
+                table.setdefault(self._band_key(fingerprint, band), set()).add(fingerprint)
+            if len(self._entries) > self.capacity:
+                self._evict()
+            return None
+
+    def filter_new(self, items, key="headline"):
+        """Return the items whose headlines are not near-duplicates of earlier ones"""
+        return [item for item in items if self.check_and_add(item[key], item) is None]
+
+    def _band_key(self, fingerprint, band):
+        return fingerprint >> (band * self._band_bits) & self._band_mask
+
+    def _find(self, fingerprint):
+        if fingerprint in self._entries:
+            return fingerprint
+        for band, table in enumerate(self._tables):
+            for candidate in table.get(self._band_key(fingerprint, band), ()):
+                if _popcount(candidate ^ fingerprint) <= self.max_distance:
+                    return candidate
+        return None
+
+    def _evict(self):
+        fingerprint, _ = self._entries.popitem(last=False)
+        for band, table in enumerate(self._tables):
+            key = self._band_key(fingerprint, band)
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del table[key]
@@ -0,0 +1,176 @@
+"""
+Scripted Fake LLM
+
+A drop-in model for Agent(model=...) that answers from a script instead of
+calling Gemini. It goes through the real Runner, sessions, AgentTool and
+workflow-agent machinery, so any agent graph in this repo can be run and
+benchmarked end to end on a machine without network access.
+
+Each agent gets its own script: a list of steps, one per model call within
+an invocation. A step is plain text (the agent's reply), a callable
+returning that text, or a tool call written as {"tool": name, "args": {...}}. Latency before the first
+token, delay between streamed chunks and token counts are simulated.
+
+Usage:
+    from fake_llm import install_fake_llm
+    install_fake_llm(root_agent, scripts={"greeting_agent": [...]}, latency=0.5)
+"""
+
+import asyncio
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Union
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from agent_utils import iter_agents
+
+Step = Union[str, Callable[[], str], Dict[str, Any]]
+
+# Roughly four characters per token for English text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Approximate token count of a piece of text"""
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def _content_text(content):
+    parts = getattr(content, "parts", None) or []
+    return "".join(
+        part.text if part.text else str(part.function_call or part.function_response or "")
+        for part in parts
+    )
+
+
+def _invocation_step(llm_request):
+    """Number of model turns since the last user text message"""
+    step = 0
+    for content in reversed(llm_request.contents or []):
+        if content.role == "model":
+            step += 1
+        elif content.role == "user" and any(part.text for part in content.parts or []):
+            break
+    return step
+
+
+class FakeLlm(BaseLlm):
+    """Model that replays a script with simulated latency and token usage"""
+
+    # A gemini- prefix keeps built-in tools such as google_search from
+    # rejecting the model; the fake never calls them anyway.
+    model: str = "gemini-2.0-fake"
+    script: List[Step] = []
+    responder: Optional[Callable[[LlmRequest, int], Step]] = None
+    latency: float = 0.0
+    chunk_delay: float = 0.0
+    chunk_size: int = 40
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"gemini-.*-fake"]
+
+    def next_step(self, llm_request):
+        """Pick the step for this call from the responder or the script"""
+        step = _invocation_step(llm_request)
+        if self.responder is not None:
+            return self.responder(llm_request, step)
+        if not self.script:
+            return "This is a fake response."
+        return self.script[min(step, len(self.script) - 1)]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        step = self.next_step(llm_request)
+
+        prompt = "".join(_content_text(content) for content in llm_request.contents or [])
+        config = llm_request.config
+        if config is not None and config.system_instruction:
+            prompt += str(config.system_instruction)
+        prompt_tokens = estimate_tokens(prompt)
+
+        await asyncio.sleep(self.latency)
+
+        if isinstance(step, dict):
+            part = types.Part(
+                function_call=types.FunctionCall(name=step["tool"], args=step.get("args", {}))
+            )
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[part]),
+                usage_metadata=self._usage(prompt_tokens, estimate_tokens(str(step))),
+            )
+            return
+
+        text = str(step() if callable(step) else step)
+        if stream:
+            for start in range(0, len(text), self.chunk_size):
+                yield LlmResponse(
+                    content=types.Content(
+                        role="model", parts=[types.Part(text=text[start:start + self.chunk_size])]
+                    ),
+                    partial=True,
+                )
+                await asyncio.sleep(self.chunk_delay)
+
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=self._usage(prompt_tokens, estimate_tokens(text)),
+        )
+
+    @staticmethod
+    def _usage(prompt_tokens, output_tokens):
+        return types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        )
+
+
+def placeholder_output(agent):
+    """JSON reply matching an agent's output_schema, or None if it has none"""
+    schema = getattr(agent, "output_schema", None)
+    if schema is None:
+        return None
+    values = {}
+    for name, field in schema.model_fields.items():
+        annotation = getattr(field.annotation, "__origin__", field.annotation)
+        if annotation in (int, float):
+            values[name] = 0
+        elif annotation is bool:
+            values[name] = False
+        elif annotation in (list, List):
+            values[name] = []
+        elif annotation in (dict, Dict):
+            values[name] = {}
+        else:
+            values[name] = f"fake {name}"
+    return schema(**values).model_dump_json()
+
+
+def install_fake_llm(agent, scripts=None, **options):
+    """
+    Swap a FakeLlm into every LLM agent of a graph.
+
+    Args:
+        agent: Root of the agent graph
+        scripts: Optional dict of agent name -> list of steps; agents without
+            a script reply with a placeholder text (or JSON for output_schema)
+        **options: FakeLlm settings such as latency, chunk_delay, chunk_size
+
+    Returns:
+        Dict of agent name -> the FakeLlm installed for it
+    """
+    scripts = scripts or {}
+    installed = {}
+    for current in iter_agents(agent):
+        if not hasattr(current, "model") or not hasattr(current, "instruction"):
+            continue  # workflow agents have no model of their own
+        script = scripts.get(current.name)
+        if script is None:
+            script = [placeholder_output(current) or f"Fake response from {current.name}."]
+        current.model = FakeLlm(script=script, **options)
+        installed[current.name] = current.model
+    return installed
@@ -0,0 +1,98 @@
+"""
+Feed Fixtures
+
+RSS 2.0 and Atom documents written from (title, published) pairs, and a
+local HTTP server for them that answers conditional requests like a real
+feed host. Used by the feed benchmarks and tests, so feed ingestion can be
+exercised without network access.
+
+Usage:
+    from feed_fixtures import feed_fixture, serve_feed_fixtures
+    path.write_text(feed_fixture("atom", "Wire", [("Story", datetime.now(timezone.utc))]))
+    server = serve_feed_fixtures(str(path.parent), latency=0.2)
+"""
+
+import functools
+import http.server
+import os
+import re
+import threading
+import time
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+
+def feed_fixture(kind, source, entries):
+    """RSS 2.0 or Atom XML for (title, published datetime) entries"""
+    def slug(title):
+        # Ids follow the title, so an entry keeps its id when newer ones are added in front
+        return re.sub(r"\W+", "-", title.lower()).strip("-")
+
+    if kind == "rss":
+        items = "".join(
+            f"<item><title>{escape(title)}</title><link>https://example.com/{slug(title)}</link>"
+            f"<guid>{slug(title)}</guid><pubDate>{format_datetime(published)}</pubDate>"
+            f"<description>&lt;p&gt;What happened in {escape(title)}.&lt;/p&gt;</description></item>"
+            for title, published in entries
+        )
+        return (f'<?xml version="1.0"?><rss version="2.0"><channel><title>{escape(source)}</title>'
+                f"{items}</channel></rss>")
+    items = "".join(
+        f"<entry><title>{escape(title)}</title><id>urn:{slug(title)}</id>"
+        f'<link rel="alternate" href="https://example.com/{slug(title)}"/>'
+        f"<updated>{published.isoformat()}</updated><summary>What happened in {escape(title)}.</summary></entry>"
+        for title, published in entries
+    )
+    return (f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<title>{escape(source)}</title>{items}</feed>")
+
+
+def serve_feed_fixtures(directory, latency):
+    """
+    HTTP server for the fixture files, with Last-Modified for all and an ETag
+    for .atom files. server.peak_requests is the most requests handled at once.
+    """
+    active = [0]
+    lock = threading.Lock()
+
+    class FeedFixtureHandler(http.server.SimpleHTTPRequestHandler):
+        etag = None
+
+        def handle_one_request(self):
+            with lock:
+                active[0] += 1
+                server.peak_requests = max(server.peak_requests, active[0])
+            try:
+                super().handle_one_request()
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        def send_head(self):
+            time.sleep(latency)
+            path = self.translate_path(self.path)
+            if path.endswith(".atom") and os.path.isfile(path):
+                stat = os.stat(path)
+                self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+                if self.headers.get("If-None-Match") == self.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return None
+            return super().send_head()
+
+        def end_headers(self):
+            if self.etag:
+                self.send_header("ETag", self.etag)
+            super().end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(FeedFixtureHandler, directory=directory)
+    )
+    server.peak_requests = 0
+    # A streaming reader hangs up once it has enough entries; that is not an error here
+    server.handle_error = lambda request, client_address: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,241 @@
+"""
+Adaptive Feed Scheduler
+
+Polls each feed on its own interval instead of every feed on every refresh,
+so a source that publishes twice a day is not asked every five minutes and a
+busy one is not left waiting.
+
+- The publish rate of each feed is learned from the publish times of the
+  entries it last returned, so it is known after the first poll and slows
+  down by itself while a feed stays quiet. With a history function (e.g.
+  the headline archive), the entries a feed no longer lists are counted
+  too, so a feed that only shows its last few entries, or a restart, does
+  not make the rate jump.
+- The interval aims for target_entries new entries per poll, within
+  [min_interval, max_interval], and is spread by a random jitter so feeds
+  do not line up.
+- Failed polls back off exponentially, up to max_interval; a feed that has
+  never been read backs off from min_interval.
+- Due feeds are polled one batch at a time through the FeedPoller, whose
+  max_workers is the cap on concurrent feed requests.
+
+New entries are collected until take() is called, and on_entries is called
+after each poll that found some, e.g. to start a ticker refresh.
+
+Usage:
+    scheduler = FeedScheduler(FeedPoller(urls), on_entries=lambda entries: print(len(entries)))
+    scheduler.start()
+    ...
+    print(scheduler.stats())
+"""
+
+import random
+import threading
+import time
+from datetime import datetime
+
+
+class FeedScheduler:
+    """Per-feed poll intervals learned from each feed's publish rate"""
+
+    def __init__(self, poller, min_interval=60.0, max_interval=3600.0, target_entries=1.0,
+                 rate_window=24 * 3600, jitter=0.1, on_entries=None, history=None, clock=time.time):
+        """
+        Args:
+            poller: feeds.FeedPoller with the feeds to schedule
+            min_interval: Shortest time between two polls of a feed, in seconds
+            max_interval: Longest time between two polls of a feed, also the
+                limit of the error backoff
+            target_entries: New entries a poll should find on average
+            rate_window: Seconds of publish history the rate is learned from
+            jitter: Fraction by which each interval is randomly lengthened or
+                shortened
+            on_entries: Optional function called with the new entries of a poll
+            history: Optional function(source, since) returning the publish
+                times (epoch seconds) of a source's entries seen before
+            clock: Function returning the current time in epoch seconds
+        """
+        self.poller = poller
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_entries = target_entries
+        self.rate_window = rate_window
+        self.jitter = jitter
+        self.on_entries = on_entries
+        self.history = history
+        self.clock = clock
+        # Every feed is due straight away
+        self.feeds = {
+            url: {
+                "source": None,
+                "rate": None,
+                "interval": None,
+                "next_poll": 0.0,
+                "polls": 0,
+                "hits": 0,
+                "new_entries": 0,
+                "errors": 0,
+                "consecutive_errors": 0,
+            }
+            for url in poller.urls
+        }
+        self._pending = []
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def due(self, now=None):
+        """URLs of the feeds whose next poll is due"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            return [url for url, feed in self.feeds.items() if feed["next_poll"] <= now]
+
+    def next_due(self):
+        """Time of the next poll of any feed, or None without feeds"""
+        with self._lock:
+            return min((feed["next_poll"] for feed in self.feeds.values()), default=None)
+
+    def poll_due(self):
+        """
+        Poll the feeds that are due, in one batch, and reschedule them.
+
+        Only one batch runs at a time, so a feed is never polled twice at once.
+
+        Returns:
+            The new entries found, newest first
+        """
+        with self._poll_lock:
+            urls = self.due()
+            if not urls:
+                return []
+            entries = self.poller.poll(urls)
+            now = self.clock()
+            found = {}
+            for entry in entries:
+                found.setdefault(entry["feed"], []).append(entry)
+            with self._lock:
+                for url in urls:
+                    self._reschedule(url, found.get(url, []), now)
+                self._pending.extend(entries)
+        if entries and self.on_entries is not None:
+            self.on_entries(entries)
+        return entries
+
+    def take(self):
+        """Entries found since the last call, newest first"""
+        with self._lock:
+            entries, self._pending = self._pending, []
+        entries.sort(key=lambda entry: entry["published"] or datetime.min, reverse=True)
+        return entries
+
+    def publish_rate(self, url, now=None):
+        """
+        New entries per second, from the publish times in the window.
+
+        The span runs up to now, so the rate of a feed that has gone quiet
+        keeps dropping until it publishes again. Entries older than the
+        feed's last response are taken from the history.
+        """
+        now = self.clock() if now is None else now
+        published = [stamp for stamp in self.poller.published(url) if stamp <= now]
+        source = self.feeds[url]["source"]
+        if self.history is not None and source is not None:
+            # History dates are to the minute, so the oldest listed entry's own
+            # copy falls within a minute of it and is not counted twice
+            oldest = min(published, default=now + 60)
+            try:
+                published += [stamp for stamp in self.history(source, now - self.rate_window)
+                              if stamp < oldest - 60]
+            except Exception as e:
+                print(f"Error reading the publish history of {source}: {str(e)}")  # Debug logging
+        if not published:
+            return 0.0
+        span = max(1.0, min(self.rate_window, now - min(published)))
+        return sum(1 for stamp in published if now - stamp <= span) / span
+
+    def _reschedule(self, url, entries, now):
+        feed = self.feeds[url]
+        feed["polls"] += 1
+        if entries:
+            feed["hits"] += 1
+            feed["new_entries"] += len(entries)
+            feed["source"] = entries[0]["source"]
+        last = self.poller.feeds[url]["last"]
+        if last is not None and last["result"] == "error":
+            feed["errors"] += 1
+            feed["consecutive_errors"] += 1
+        else:
+            feed["consecutive_errors"] = 0
+            feed["rate"] = self.publish_rate(url, now)
+
+        if feed["rate"] is None:
+            # Never read successfully: back off from the shortest interval
+            interval = self.min_interval
+        elif feed["rate"] > 0:
+            interval = min(self.max_interval, max(self.min_interval, self.target_entries / feed["rate"]))
+        else:
+            interval = self.max_interval
+        if feed["consecutive_errors"]:
+            interval = min(self.max_interval, interval * 2 ** feed["consecutive_errors"])
+        feed["interval"] = interval
+        feed["next_poll"] = now + interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def start(self):
+        """Poll due feeds in a background thread until stop() is called"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="feed-scheduler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.poll_due()
+            except Exception as e:
+                print(f"Error polling feeds: {str(e)}")  # Debug logging
+            next_due = self.next_due()
+            wait = self.max_interval if next_due is None else next_due - self.clock()
+            self._stopped.wait(min(self.max_interval, max(1.0, wait)))
+
+    def stats(self):
+        """Schedule and hit rate of every feed, plus the totals"""
+        now = self.clock()
+        with self._lock:
+            feeds = [
+                {
+                    "url": url,
+                    "source": feed["source"],
+                    "entries_per_hour": round(feed["rate"] * 3600, 2) if feed["rate"] is not None else None,
+                    "interval": round(feed["interval"], 1) if feed["interval"] is not None else None,
+                    "next_poll_in": round(max(0.0, feed["next_poll"] - now), 1),
+                    "polls": feed["polls"],
+                    "hits": feed["hits"],
+                    "hit_rate": round(feed["hits"] / feed["polls"], 4) if feed["polls"] else None,
+                    "new_entries": feed["new_entries"],
+                    "errors": feed["errors"],
+                    "consecutive_errors": feed["consecutive_errors"],
+                }
+                for url, feed in self.feeds.items()
+            ]
+            pending = len(self._pending)
+        polls = sum(feed["polls"] for feed in feeds)
+        hits = sum(feed["hits"] for feed in feeds)
+        return {
+            "polls": polls,
+            "hits": hits,
+            "hit_rate": round(hits / polls, 4) if polls else None,
+            "new_entries": sum(feed["new_entries"] for feed in feeds),
+            "pending": pending,
+            "max_concurrent": self.poller.max_workers,
+            "min_interval": self.min_interval,
+            "max_interval": self.max_interval,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "feeds": feeds,
+        }
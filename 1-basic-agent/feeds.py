@@ -0,0 +1,269 @@
+"""
+RSS/Atom Feed Ingestion
+
+Polls the feeds of known news sources so their articles don't have to be
+found through LLM search round trips.
+
+- Feeds are polled concurrently with conditional GETs (ETag and
+  Last-Modified), so an unchanged feed costs one 304 response.
+- Entries are parsed while the response is read, with iterparse, and reading
+  stops after max_entries, so a large feed never sits in memory at once.
+- Only entries not returned by an earlier poll are passed on, so a refresh
+  can hand just the new articles to a single formatting call.
+
+Both RSS 2.0 (<item>) and Atom (<entry>) feeds are understood.
+
+Usage:
+    poller = FeedPoller(["https://techcrunch.com/category/artificial-intelligence/feed/"])
+    for entry in poller.poll():
+        print(entry["published"], entry["source"], entry["title"])
+"""
+
+import hashlib
+import html
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+
+# AI feeds of the sources the search specialist is told to look at; other
+# ticker topics need their own feeds in NEWS_FEEDS
+DEFAULT_FEEDS = (
+    "https://techcrunch.com/category/artificial-intelligence/feed/",
+    "https://www.theverge.com/rss/ai-artificial-intelligence/index.xml",
+    "https://www.wired.com/feed/tag/ai/latest/rss",
+    "https://venturebeat.com/category/ai/feed/",
+    "https://www.zdnet.com/topic/artificial-intelligence/rss.xml",
+    "https://openai.com/news/rss.xml",
+    "https://blog.google/technology/ai/rss/",
+)
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+USER_AGENT = "ai-news-ticker/1.0 (+feed poller)"
+TAG_PATTERN = re.compile(r"<[^>]+>")
+SPACE_PATTERN = re.compile(r"\s+")
+
+
+def _local(tag):
+    """Tag name without its namespace"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _text(element, *names):
+    """Stripped text of the first child with one of the given local names"""
+    for child in element:
+        if _local(child.tag) in names and (child.text or "").strip():
+            return child.text.strip()
+    return None
+
+
+def _atom_link(entry):
+    for child in entry:
+        if _local(child.tag) == "link" and child.get("rel", "alternate") == "alternate":
+            return child.get("href")
+    return None
+
+
+def parse_date(value):
+    """Local naive datetime of an RFC 822 (RSS) or ISO 8601 (Atom) date, or None"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def clean_summary(value, limit=300):
+    """Plain text of an HTML summary, cut to roughly limit characters"""
+    # Unescape before stripping tags, so escaped markup is stripped too
+    # instead of turning into live tags
+    text = SPACE_PATTERN.sub(" ", TAG_PATTERN.sub(" ", html.unescape(value or ""))).strip()
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + "..."
+
+
+def parse_feed(stream, source=None, max_entries=50):
+    """
+    Yield the entries of an RSS or Atom feed while it is being read.
+
+    Args:
+        stream: Binary file-like object with the feed XML
+        source: Source name; defaults to the feed's own title
+        max_entries: Entries read before the rest of the feed is skipped
+
+    Yields:
+        Dicts with id, title, link, source, published (datetime or None)
+        and summary
+    """
+    feed_title = None
+    path = []
+    count = 0
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        name = _local(element.tag)
+        if event == "start":
+            path.append(name)
+            continue
+        path.pop()
+        # <rss><channel><title> or <feed><title>
+        if name == "title" and feed_title is None and path and path[-1] in ("channel", "feed"):
+            feed_title = (element.text or "").strip() or None
+        if name not in ("item", "entry"):
+            continue
+        if element.tag.startswith(ATOM):
+            link = _atom_link(element)
+            published = _text(element, "published", "updated")
+            summary = _text(element, "summary", "content")
+        else:
+            link = _text(element, "link")
+            published = _text(element, "pubDate", "date")
+            summary = _text(element, "description", "encoded")
+        title = _text(element, "title")
+        entry_id = _text(element, "guid", "id") or link or title
+        element.clear()  # entries already yielded are not kept in the tree
+        if not title:
+            continue
+        yield {
+            "id": entry_id,
+            "title": clean_summary(title, limit=500),
+            "link": link,
+            "source": source or feed_title or "Unknown source",
+            "published": parse_date(published),
+            "summary": clean_summary(summary),
+        }
+        count += 1
+        if count >= max_entries:
+            return
+
+
+class FeedPoller:
+    """Concurrent conditional polling of feeds, passing on only unseen entries"""
+
+    def __init__(self, urls, timeout=10.0, max_entries=50, max_age=24 * 3600,
+                 max_workers=8, seen_capacity=10000):
+        """
+        Args:
+            urls: Feed URLs (http, https or file)
+            timeout: Seconds allowed per feed request
+            max_entries: Entries read per feed and poll
+            max_age: Seconds after which an entry is too old to pass on
+            max_workers: Feeds fetched at the same time
+            seen_capacity: Entry ids remembered to tell new entries apart
+        """
+        self.urls = list(urls)
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.max_workers = max_workers
+        self.seen_capacity = seen_capacity
+        self.results = {"modified": 0, "not_modified": 0, "error": 0}
+        self.feeds = {
+            url: {"etag": None, "last_modified": None, "last": None, "published": []}
+            for url in self.urls
+        }
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def poll(self, urls=None):
+        """
+        Fetch every feed (or just the given ones) and return the entries not
+        seen before, newest first. Each entry also carries its feed URL as feed.
+
+        Feeds that fail are skipped; all_failed() tells whether every one did.
+        """
+        urls = self.urls if urls is None else list(urls)
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            per_feed = list(executor.map(self._fetch, urls))
+
+        cutoff = datetime.now() - timedelta(seconds=self.max_age)
+        new_entries = []
+        with self._lock:
+            for entries in per_feed:
+                for entry in entries:
+                    if entry["published"] is not None and entry["published"] < cutoff:
+                        continue
+                    key = hashlib.sha1(f"{entry['source']}\n{entry['id']}".encode()).hexdigest()
+                    if key in self._seen:
+                        continue
+                    self._seen[key] = True
+                    new_entries.append(entry)
+            while len(self._seen) > self.seen_capacity:
+                self._seen.popitem(last=False)
+        new_entries.sort(key=lambda entry: entry["published"] or datetime.min, reverse=True)
+        return new_entries
+
+    def all_failed(self):
+        """Check whether the last poll of every feed failed"""
+        return bool(self.urls) and all(
+            feed["last"] is not None and feed["last"]["result"] == "error"
+            for feed in self.feeds.values()
+        )
+
+    def published(self, url):
+        """Publish times (epoch seconds) of the entries in a feed's last full response"""
+        with self._lock:
+            return list(self.feeds[url]["published"])
+
+    def _fetch(self, url):
+        """Entries of one feed, or [] if it is unchanged or failed"""
+        feed = self.feeds[url]
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        if feed["etag"]:
+            request.add_header("If-None-Match", feed["etag"])
+        if feed["last_modified"]:
+            request.add_header("If-Modified-Since", feed["last_modified"])
+
+        started = time.perf_counter()
+        entries = []
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                entries = list(parse_feed(response, max_entries=self.max_entries))
+                for entry in entries:
+                    entry["feed"] = url
+                headers = response.headers
+                feed["etag"] = headers.get("ETag") or feed["etag"]
+                feed["last_modified"] = headers.get("Last-Modified") or feed["last_modified"]
+            result = "modified"
+        except urllib.error.HTTPError as e:
+            result = "not_modified" if e.code == 304 else "error"
+            if result == "error":
+                print(f"Feed {url} answered {e.code}")  # Debug logging
+        except Exception as e:
+            result = "error"
+            print(f"Error polling feed {url}: {str(e)}")  # Debug logging
+
+        with self._lock:
+            self.results[result] += 1
+            if result == "modified":
+                feed["published"] = [
+                    entry["published"].timestamp() for entry in entries if entry["published"] is not None
+                ]
+            feed["last"] = {
+                "result": result,
+                "entries": len(entries),
+                "seconds": round(time.perf_counter() - started, 3),
+                "polled_at": time.time(),
+            }
+        return entries
+
+    def stats(self):
+        """Poll results so far and the last poll of each feed"""
+        with self._lock:
+            return {
+                "results": dict(self.results),
+                "seen": len(self._seen),
+                "feeds": {url: feed["last"] for url, feed in self.feeds.items()},
+            }
@@ -1,18 +1,110 @@
-from google.adk.agents import Agent
+from google.adk.agents import Agent, ParallelAgent, SequentialAgent
 from google.adk.tools.agent_tool import AgentTool
 from datetime import datetime
 import os
 from typing import List, Dict, Any
+from pydantic import BaseModel, Field
  
 # First define the search specialist agent with google_search
 from google.adk.tools import google_search
+
+from .search_budget import SearchBudgetController
+from .search_cache import SearchCache, default_path
+
+# Ticker topics, as the app reads them; the searchers look for the news of
+# each of them and the formatters pick articles about any of them
+NEWS_TOPICS = [topic.strip() for topic in os.getenv("NEWS_TOPICS", "AI").split(",") if topic.strip()] or ["AI"]
+TOPICS_LABEL = ", ".join(NEWS_TOPICS[:-1]) + " and " + NEWS_TOPICS[-1] if len(NEWS_TOPICS) > 1 else NEWS_TOPICS[0]
+
+# Topics the AI-specific queries below don't cover
+OTHER_TOPICS = [topic for topic in NEWS_TOPICS if topic.lower() not in ("ai", "artificial intelligence")]
+
+# The same kinds of searches as the source groups' AI queries below, for any other topic
+TOPIC_QUERIES = {
+    "tech": [
+        "{topic} news site:techcrunch.com when:1d",
+        "{topic} site:theverge.com when:1d",
+        "{topic} development site:wired.com when:1d",
+    ],
+    "business": [
+        "{topic} news site:bloomberg.com when:1d",
+        "{topic} site:reuters.com when:1d",
+        "{topic} research site:nature.com when:1d",
+    ],
+    "company": [
+        "{topic} company announcement when:1d",
+        "{topic} press release when:1d",
+    ],
+    "general": [
+        "{topic} news when:1d",
+        "{topic} breakthrough announcement when:1d",
+        "major {topic} development when:1d",
+    ],
+}
+
+
+def other_topic_queries(groups):
+    """Search query lines for the topics other than AI, from the given source groups"""
+    return "".join(
+        f'    - "{query.format(topic=topic)}"\n'
+        for topic in OTHER_TOPICS
+        for group in groups
+        for query in TOPIC_QUERIES[group]
+    )
+
+
+def topic_queries(group, queries):
+    """A source group's search queries for every ticker topic"""
+    ai_queries = queries.rstrip().lstrip("\n") + "\n" if len(OTHER_TOPICS) < len(NEWS_TOPICS) else ""
+    return ai_queries + other_topic_queries([group])
+
+
+# Unique articles a refresh needs per ticker topic; the app multiplies it by
+# its number of topics
+TARGET_ARTICLES = int(os.getenv("NEWS_SEARCH_TARGET_ARTICLES", "5"))
+
+# Per-refresh limits on searching; searches stop early once enough unique
+# articles have been found, and a spent budget yields partial results
+search_budget = SearchBudgetController(
+    max_searches=int(os.getenv("NEWS_SEARCH_MAX_CALLS", "8")),
+    max_tokens=int(os.getenv("NEWS_SEARCH_MAX_TOKENS", "200000")),
+    max_seconds=float(os.getenv("NEWS_SEARCH_MAX_SECONDS", "90")),
+    target_articles=TARGET_ARTICLES,
+    search_tools=["news_search_specialist"],
+    deadline_reserve=float(os.getenv("NEWS_SEARCH_DEADLINE_RESERVE", "20")),
+)
+
+# Answers to repeated searches are reused for SEARCH_CACHE_TTL seconds,
+# also across restarts, from this example's own cache file
+search_cache = SearchCache(
+    os.getenv("SEARCH_CACHE_PATH", default_path("1-basic-agent")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "600")),
+    max_entries=int(os.getenv("SEARCH_CACHE_SIZE", "500")),
+)
+
+
+def before_search_model_callback(callback_context, llm_request):
+    """Answer repeated searches from the cache, then check the search budget"""
+    response = search_cache.before_model_callback(callback_context, llm_request)
+    if response is not None:
+        # Cached answers cost no search, so they neither use up the budget nor
+        # count towards its article target (which would stop the other groups)
+        search_budget.record_cached_answer(callback_context)
+        return response
+    return search_budget.before_search_model_callback(callback_context, llm_request)
+
+
+def after_search_model_callback(callback_context, llm_response):
+    """Count the search against the budget and cache its answer"""
+    search_budget.after_search_model_callback(callback_context, llm_response)
+    return search_cache.after_model_callback(callback_context, llm_response)
  
 # Create a search specialist agent that uses the built-in google_search tool
 search_specialist = Agent(
     name="news_search_specialist",
     model="gemini-2.5-flash-preview-05-20",
     description="Specialized agent for searching news using Google Search",
-    instruction="""
+    instruction=("""
     You are a search specialist that uses Google Search to find information.
     When asked to search for news, you will search Google for recent articles.
     Use specific search terms that include relevant keywords and date ranges if provided.
@@ -53,6 +145,11 @@ search_specialist = Agent(
     2. The publication source name
     3. The EXACT publication date AND TIME of each article (must be from TODAY only)
    
+    Report each article as:
+    Date: YYYY-MM-DD HH:MM
+    Source: Source name
+    Headline: Article headline
+   
     Look for articles with headlines that:
     - Announce major developments or breakthroughs
     - Indicate significant industry changes
@@ -61,23 +158,45 @@ search_specialist = Agent(
    
     Do NOT return articles from previous days. Only return articles published TODAY.
     Always include the EXACT publication time (HH:MM) for each article.
-    """,
-    tools=[google_search]
+    """ + ("""
+    The ticker also covers """ + ", ".join(OTHER_TOPICS) + """: when the request
+    names these topics, run the same kind of searches for each of them, e.g.:
+""" + other_topic_queries(TOPIC_QUERIES) if OTHER_TOPICS else "")),
+    tools=[google_search],
+    before_model_callback=before_search_model_callback,
+    after_model_callback=after_search_model_callback,
 )
  
-# Create a formatter agent to process and format the search results
-formatter_agent = Agent(
-    name="news_formatter",
-    model="gemini-2.5-flash-preview-05-20",
-    description="Specialized in formatting news content into a readable structure",
-    instruction="""
-    You are an expert at crafting impactful, informative AI news headlines that immediately convey significance.
+# --- Define Output Schema ---
+class NewsArticle(BaseModel):
+    date: str = Field(
+        description="Exact publication date and time in YYYY-MM-DD HH:MM format"
+    )
+    source: str = Field(
+        description="Specific publication name, e.g. TechCrunch"
+    )
+    headline: str = Field(
+        description="Headline in the form [Category] Key Development - Impactful Description"
+    )
+
+
+class NewsArticles(BaseModel):
+    articles: List[NewsArticle] = Field(
+        description="Exactly 5 articles from today per topic asked for, newest first"
+    )
+
+
+# State key the formatted articles are saved under for the app to read
+NEWS_ARTICLES_KEY = "news_articles"
+ 
+FORMATTER_INSTRUCTION = """
+    You are an expert at crafting impactful, informative """ + TOPICS_LABEL + """ news headlines that immediately convey significance.
    
-    Given raw information about news articles, format them in this exact structure:
+    Given raw information about news articles, format each one with these fields:
    
-    Date: YYYY-MM-DD
-    Source: Source name
-    Headline: [Category] Key Development - Impactful Description
+    date: YYYY-MM-DD HH:MM
+    source: Source name
+    headline: [Category] Key Development - Impactful Description
    
     Categories to use:
     - [Breakthrough] - For major scientific or technical achievements
@@ -103,9 +222,8 @@ formatter_agent = Agent(
     Formatting Requirements:
     1. Dates: ALWAYS include EXACT publication time in HH:MM format
     2. Sources: Use specific publication names
-    3. Separation: Use blank lines between articles
-    4. Order: Return exactly 5 articles in chronological order (newest first)
-    5. Age: Only return articles published TODAY
+    3. Order: Return exactly 5 articles in chronological order (newest first)
+    4. Age: Only return articles published TODAY
    
     Each headline must:
     - Immediately convey what happened
@@ -113,7 +231,26 @@ formatter_agent = Agent(
     - Be engaging but factual
     - Avoid clickbait or sensationalism
     - Give enough context to understand the development
+   
+    IMPORTANT: Your response MUST be valid JSON matching this structure:
+    {
+        "articles": [
+            {"date": "YYYY-MM-DD HH:MM", "source": "Source name", "headline": "[Category] ..."}
+        ]
+    }
+   
+    DO NOT include any explanations or additional text outside the JSON response.
     """
+
+# Create a formatter agent to process and format the search results
+formatter_agent = Agent(
+    name="news_formatter",
+    model="gemini-2.5-flash-preview-05-20",
+    description="Specialized in formatting news content into a readable structure",
+    instruction=FORMATTER_INSTRUCTION,
+    output_schema=NewsArticles,
+    output_key=NEWS_ARTICLES_KEY,
+    after_model_callback=search_budget.after_model_callback,
 )
  
 # Create the root agent that uses both specialized agents as tools
@@ -131,7 +268,8 @@ root_agent = Agent(
        - Tell the search_specialist to try different sources
        - Specifically request more articles
        - Keep trying until you have exactly 5 articles
-    3. Use the formatter_agent to format each article properly
+    3. Use the formatter_agent to format each article properly - its output is
+       the final answer, so only call it once you have all 5 articles
    
     Format each news item exactly as:
     Date: YYYY-MM-DD HH:MM
@@ -164,9 +302,200 @@ root_agent = Agent(
     3. Try research publications
     4. Try business news sources
     Keep trying until you have 5 articles!
-    """,
+   
+    If the search tool answers that no more searches will run, stop searching
+    and format the articles you already have, even if there are fewer than 5.
+    """ + ("""
+    The ticker covers these topics: """ + TOPICS_LABEL + """. Find and format
+    5 articles for each of them, asking the search_specialist about each topic.
+    """ if NEWS_TOPICS != ["AI"] else ""),
     tools=[
         AgentTool(search_specialist),
-        AgentTool(formatter_agent)
-    ]
-)
\ No newline at end of file
+        # The app reads the formatted articles from state, so the formatter's
+        # JSON ends the run instead of being rewritten as text
+        AgentTool(formatter_agent, skip_summarization=True)
+    ],
+    before_tool_callback=search_budget.before_tool_callback,
+    after_tool_callback=search_budget.after_tool_callback,
+    after_model_callback=search_budget.after_model_callback,
+)
+ 
+# --- Parallel news pipeline ---
+# Searching one source group after another costs a round trip per group.
+# The pipeline searches every group at the same time and formats the merged
+# results, so a refresh takes as long as the slowest group.
+SOURCE_GROUPS = {
+    "tech": (
+        "major tech sites",
+        """
+    - "artificial intelligence site:techcrunch.com when:1d"
+    - "AI news site:theverge.com when:1d"
+    - "AI development site:wired.com when:1d"
+    - "artificial intelligence site:venturebeat.com when:1d"
+    - "AI news site:zdnet.com when:1d"
+    """,
+    ),
+    "business": (
+        "business and research sources",
+        """
+    - "AI news site:bloomberg.com when:1d"
+    - "artificial intelligence site:reuters.com when:1d"
+    - "AI research site:nature.com when:1d"
+    - "AI breakthrough site:sciencedaily.com when:1d"
+    """,
+    ),
+    "company": (
+        "company blogs and announcements",
+        """
+    - "artificial intelligence site:blogs.microsoft.com when:1d"
+    - "AI update site:ai.googleblog.com when:1d"
+    - "AI development site:ai.meta.com when:1d"
+    - "AI news site:aws.amazon.com when:1d"
+    """,
+    ),
+    "general": (
+        "general news searches",
+        """
+    - "artificial intelligence news when:1d"
+    - "AI breakthrough announcement when:1d"
+    - "major AI development when:1d"
+    """,
+    ),
+}
+
+
+def create_group_searcher(group, label, queries):
+    """Search specialist limited to one source group, saving its findings to state"""
+    return Agent(
+        name=f"{group}_news_searcher",
+        model="gemini-2.5-flash-preview-05-20",
+        description=f"Searches {label} for today's {TOPICS_LABEL} news",
+        instruction=f"""
+    You are a search specialist that uses Google Search to find today's {TOPICS_LABEL} news from {label}.
+   
+    Run these searches:
+    {topic_queries(group, queries).strip()}
+   
+    If they don't yield results, try similar queries for the same kind of source.
+   
+    For every article you find, report:
+    1. The complete article headline
+    2. The publication source name
+    3. The EXACT publication date AND TIME (HH:MM) - articles must be from TODAY only
+   
+    Report each article as:
+    Date: YYYY-MM-DD HH:MM
+    Source: Source name
+    Headline: Article headline
+   
+    Return up to 5 of the most significant articles per topic. If you find none, say so.
+    """,
+        tools=[google_search],
+        output_key=f"{group}_news",
+        before_model_callback=before_search_model_callback,
+        after_model_callback=after_search_model_callback,
+    )
+
+
+group_searchers = [
+    create_group_searcher(group, label, queries)
+    for group, (label, queries) in SOURCE_GROUPS.items()
+]
+
+# --- 1. Search every source group concurrently ---
+news_gatherer = ParallelAgent(
+    name="news_gatherer",
+    sub_agents=group_searchers,
+)
+
+# --- 2. Merge and format the results (an agent can only have one parent,
+# so the pipeline gets its own formatter instance) ---
+pipeline_formatter = Agent(
+    name="news_pipeline_formatter",
+    model="gemini-2.5-flash-preview-05-20",
+    description="Merges the source group results and formats the 5 best articles",
+    instruction="""
+    Search results from each source group:
+   
+""" + "\n".join(f"    {label.capitalize()}: {{{group}_news}}" for group, (label, _) in SOURCE_GROUPS.items()) + """
+   
+    Merge these results, drop duplicates (the same story from several sources
+    counts once) and pick the 5 most significant articles from today about
+    each of these topics: """ + TOPICS_LABEL + """.
+    """ + FORMATTER_INSTRUCTION,
+    output_schema=NewsArticles,
+    output_key=NEWS_ARTICLES_KEY,
+    after_model_callback=search_budget.after_model_callback,
+)
+
+# --- 3. Gather in parallel, then format ---
+news_pipeline = SequentialAgent(
+    name="news_pipeline",
+    sub_agents=[news_gatherer, pipeline_formatter],
+)
+
+# --- Feed pipeline ---
+# Sources with RSS/Atom feeds don't need a search round trip: the app polls
+# their feeds and passes only the entries it has not seen before, so a
+# refresh costs a single formatting call. (Its own formatter instance, with
+# instructions for feed entries instead of search results.)
+feed_formatter = Agent(
+    name="news_feed_formatter",
+    model="gemini-2.5-flash-preview-05-20",
+    description=f"Formats new entries from {TOPICS_LABEL} news sources' RSS/Atom feeds",
+    instruction=f"""
+    The user message lists new entries from news sources' RSS/Atom feeds,
+    each with its publication date, source, title and a short summary.
+   
+    Pick the 5 most significant articles from today about each of these
+    topics: {TOPICS_LABEL} (all of them if there are fewer than 5), skip
+    entries about none of these topics, and keep each article's date and
+    source exactly as given.
+    """ + FORMATTER_INSTRUCTION,
+    output_schema=NewsArticles,
+    output_key=NEWS_ARTICLES_KEY,
+    after_model_callback=search_budget.after_model_callback,
+)
+
+# --- Topic classifier ---
+# With several ticker topics, one refresh fetches the news of every topic and
+# this agent labels the whole batch of new headlines with their topics in a
+# single call, instead of a search and format run per topic.
+class TopicAssignment(BaseModel):
+    index: int = Field(description="Number of the headline in the request")
+    topics: List[str] = Field(
+        description="Names of the listed topics the headline belongs to, empty if none"
+    )
+
+
+class TopicAssignments(BaseModel):
+    assignments: List[TopicAssignment] = Field(
+        description="One assignment per numbered headline"
+    )
+
+
+# State key the topic assignments are saved under for the app to read
+TOPIC_ASSIGNMENTS_KEY = "topic_assignments"
+
+topic_classifier = Agent(
+    name="news_topic_classifier",
+    model="gemini-2.5-flash-preview-05-20",
+    description="Sorts a batch of news headlines into the ticker's topics",
+    instruction="""
+    The user message lists the ticker's topics and a numbered list of news
+    headlines with their sources.
+
+    For every headline, name each listed topic it is about, using the topic
+    names exactly as listed. A headline can belong to several topics, or to
+    none if it fits none of them. Do not invent topics.
+
+    Your response MUST be valid JSON matching this structure:
+    {
+        "assignments": [
+            {"index": 1, "topics": ["Topic name"]}
+        ]
+    }
+    """,
+    output_schema=TopicAssignments,
+    output_key=TOPIC_ASSIGNMENTS_KEY,
+)
@@ -0,0 +1,233 @@
+"""
+Search Budget Controller
+
+Callbacks that stop the "keep searching until you have 5 articles" loop from
+running away. Each refresh gets a budget that counts search calls, model
+tokens, wall time and the unique headlines found so far. Once the target
+number of articles is found, or any limit is hit, further searches are
+skipped and the agent is told to format what it already has. When the caller
+sets a run deadline, searching also stops shortly before it, so the
+formatter still has time to answer.
+
+google_search runs inside the model call, so searches are gated in two
+places: the root agent's search tool calls (before/after_tool_callback) and
+each search agent's model call (before/after_model_callback).
+"""
+
+import contextvars
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+# State key the budget summary is written to after every search
+SEARCH_BUDGET_KEY = "search_budget"
+
+HEADLINE_PATTERN = re.compile(r"^\W*(?:headline|title)\W*:\W*(.+?)\W*$", re.IGNORECASE | re.MULTILINE)
+WORD_PATTERN = re.compile(r"\w+")
+
+# Budget of the refresh whose agent tool call is running. AgentTool runs the
+# wrapped agent as a separate invocation, so its callbacks find the budget here.
+_active_budget = contextvars.ContextVar("search_budget", default=None)
+
+# Monotonic time by which the current run must finish, set by the caller of
+# the runner. AgentTool runs and parallel sub-agents inherit it.
+run_deadline = contextvars.ContextVar("run_deadline", default=None)
+
+
+class SearchBudget:
+    """Searches, tokens, time and articles used by one refresh"""
+
+    def __init__(self, max_searches, max_tokens, max_seconds, target_articles,
+                 deadline=None, deadline_reserve=0):
+        self.max_searches = max_searches
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.target_articles = target_articles
+        self.started = time.monotonic()
+        self.deadline = deadline
+        # A short run keeps at most a quarter of its time for formatting, so
+        # a reserve longer than the run doesn't skip every search
+        if deadline is not None:
+            deadline_reserve = min(deadline_reserve, max(deadline - self.started, 0) / 4)
+        self.deadline_reserve = deadline_reserve
+        self.searches = 0
+        self.skipped = 0
+        self.cached = 0
+        self.tokens = 0
+        self.headlines = set()
+
+    def add_articles(self, text):
+        """Count the unique headlines in a search agent's findings"""
+        for headline in HEADLINE_PATTERN.findall(text or ""):
+            key = " ".join(WORD_PATTERN.findall(headline.lower()))
+            if key:
+                self.headlines.add(key)
+
+    def stop_reason(self):
+        """Why no more searches should run, or None while there is budget left"""
+        if len(self.headlines) >= self.target_articles:
+            return f"found {len(self.headlines)} articles"
+        if self.searches >= self.max_searches:
+            return f"search limit of {self.max_searches} calls reached"
+        if self.tokens >= self.max_tokens:
+            return f"token limit of {self.max_tokens} reached"
+        now = time.monotonic()
+        if now - self.started >= self.max_seconds:
+            return f"time limit of {self.max_seconds:g}s reached"
+        if self.deadline is not None and self.deadline - now <= self.deadline_reserve:
+            return f"run deadline is {max(self.deadline - now, 0):.0f}s away"
+        return None
+
+    def summary(self):
+        return {
+            "searches": self.searches,
+            "skipped": self.skipped,
+            "cached": self.cached,
+            "tokens": self.tokens,
+            "articles": len(self.headlines),
+            "seconds": round(time.monotonic() - self.started, 3),
+            "stopped": self.stop_reason(),
+        }
+
+
+class SearchBudgetController:
+    """Per-refresh search budgets applied through agent callbacks"""
+
+    def __init__(self, max_searches=8, max_tokens=200000, max_seconds=90,
+                 target_articles=5, search_tools=(), history=64, deadline_reserve=20):
+        """
+        Args:
+            max_searches: Search calls allowed per refresh
+            max_tokens: Model tokens (input + output) allowed per refresh
+            max_seconds: Wall time after which no new searches start
+            target_articles: Unique headlines after which searching stops
+            search_tools: Names of tools that run a search (e.g. AgentTools)
+            history: Number of recent refresh budgets kept
+            deadline_reserve: Seconds before the run deadline (if one is set)
+                after which no new searches start, leaving time to format;
+                at most a quarter of the time the run has
+        """
+        self.max_searches = max_searches
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.target_articles = target_articles
+        self.search_tools = set(search_tools)
+        self.history = history
+        self.deadline_reserve = deadline_reserve
+        self._budgets = OrderedDict()
+
+    def budget_for(self, context):
+        """Budget of the refresh a callback belongs to, created on first use"""
+        active = _active_budget.get()
+        if active is not None:
+            return active
+        key = context.invocation_id
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = self._budgets[key] = SearchBudget(
+                self.max_searches, self.max_tokens, self.max_seconds, self.target_articles,
+                deadline=run_deadline.get(), deadline_reserve=self.deadline_reserve,
+            )
+            while len(self._budgets) > self.history:
+                self._budgets.popitem(last=False)
+        return budget
+
+    def _record(self, context, budget):
+        context.state[SEARCH_BUDGET_KEY] = budget.summary()
+
+    # --- Root agent: search tool calls ---
+
+    def before_tool_callback(
+        self, tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
+    ) -> Optional[Dict]:
+        """Skip the search tool once the budget is spent"""
+        budget = self.budget_for(tool_context)
+        reason = budget.stop_reason() if tool.name in self.search_tools else None
+        if reason:
+            budget.skipped += 1
+            print(f"[Search budget] Skipping {tool.name}: {reason}")
+            self._record(tool_context, budget)
+            return {
+                "result": f"No more searches: {reason}. "
+                f"Format the {len(budget.headlines)} articles found so far now."
+            }
+        _active_budget.set(budget)
+        return None
+
+    def after_tool_callback(
+        self, tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Any
+    ) -> Optional[Dict]:
+        """Count the articles a search returned"""
+        budget = self.budget_for(tool_context)
+        _active_budget.set(None)
+        if tool.name not in self.search_tools:
+            return None
+        budget.add_articles(tool_response if isinstance(tool_response, str) else str(tool_response))
+        self._record(tool_context, budget)
+        return None
+
+    # --- Search agents: the model calls that run google_search ---
+
+    def before_search_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        """Answer without searching once the budget is spent"""
+        budget = self.budget_for(callback_context)
+        reason = budget.stop_reason()
+        if reason is None:
+            return None
+        budget.skipped += 1
+        print(f"[Search budget] Skipping search by {callback_context.agent_name}: {reason}")
+        return LlmResponse(
+            content=types.Content(
+                role="model", parts=[types.Part(text=f"No search was run: {reason}.")]
+            )
+        )
+
+    def after_search_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        """Count tokens, search queries and headlines found"""
+        if llm_response.partial:
+            return None
+        budget = self.budget_for(callback_context)
+        self._add_tokens(budget, llm_response)
+        grounding = llm_response.grounding_metadata
+        queries = (grounding.web_search_queries or []) if grounding else []
+        # Searches are counted per model call unless the model reports its queries
+        budget.searches += len(queries) or 1
+        if llm_response.content and llm_response.content.parts:
+            budget.add_articles("".join(part.text or "" for part in llm_response.content.parts))
+        self._record(callback_context, budget)
+        return None
+
+    def record_cached_answer(self, callback_context: CallbackContext):
+        """Count an answer served from a cache without running a search"""
+        budget = self.budget_for(callback_context)
+        budget.cached += 1
+        self._record(callback_context, budget)
+
+    # --- Every other agent in the refresh ---
+
+    def after_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        """Count the tokens of non-search model calls"""
+        if not llm_response.partial:
+            budget = self.budget_for(callback_context)
+            self._add_tokens(budget, llm_response)
+            self._record(callback_context, budget)
+        return None
+
+    @staticmethod
+    def _add_tokens(budget, llm_response):
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            budget.tokens += (usage.prompt_token_count or 0) + (usage.candidates_token_count or 0)
@@ -0,0 +1,215 @@
+"""
+Search Result Cache
+
+Model callbacks that cache the answers of agents using google_search. The
+search runs inside the model call, so a cache hit answers the model request
+directly and skips both the model and the search.
+
+Answers are keyed by agent and by the normalized text of the user messages
+in the request, and kept in a local SQLite file so they survive restarts.
+Entries expire after a TTL and the least recently used ones are evicted
+beyond a maximum size.
+
+Each example that caches searches keeps its own file, default_path(app), so
+one app's answers never evict another's. Set SEARCH_CACHE_PATH to move the
+file, e.g. to share it between the workers of several machines. With a TTL
+of 0 the cache is off and nothing is written to disk.
+
+The examples are run one at a time from their own folders (adk web, or
+python app.py) and share no package, so this module is copied into each of
+them (1-basic-agent, 2-tool-agent, 7-multi-agent). Keep the copies identical.
+
+Usage:
+    search_cache = SearchCache(default_path("2-tool-agent"), ttl=600)
+    agent = Agent(..., tools=[google_search],
+                  before_model_callback=search_cache.before_model_callback,
+                  after_model_callback=search_cache.after_model_callback)
+"""
+
+import contextvars
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    query TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_search_cache_accessed ON search_cache (accessed_at);
+"""
+
+# Directory holding the cache file of each example
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "adk-crash-course")
+
+# Keeps search operators such as site:techcrunch.com and when:1d intact
+TOKEN_PATTERN = re.compile(r"[\w:./-]+")
+
+# Cache key of the model call in progress, from before_ to after_model_callback
+_pending_key = contextvars.ContextVar("search_cache_key", default=None)
+
+
+def normalize_query(text):
+    """Lowercase a query and drop punctuation and extra whitespace"""
+    return " ".join(TOKEN_PATTERN.findall(text.lower()))
+
+
+def default_path(app):
+    """Cache file of one example app, e.g. default_path("1-basic-agent")"""
+    return os.path.join(CACHE_DIR, app, "search_cache.db")
+
+
+def request_query(llm_request):
+    """Normalized text of every user message in a model request"""
+    texts = [
+        part.text
+        for content in llm_request.contents or []
+        if content.role == "user"
+        for part in content.parts or []
+        if part.text
+    ]
+    return normalize_query("\n".join(texts))
+
+
+class SearchCache:
+    """TTL + LRU cache of search agent answers in a SQLite file"""
+
+    def __init__(self, path, ttl=600, max_entries=500, namespace="google_search"):
+        """
+        Args:
+            path: Database file (its directory is created if needed), or
+                ":memory:" for a per-process cache
+            ttl: Seconds an answer is reused before the search runs again;
+                0 turns the cache off and keeps it in memory instead of path
+            max_entries: Entries kept in this namespace before the least recently used are evicted
+            namespace: Partition of the file; apps that should not share
+                answers use different ones
+        """
+        if ttl <= 0:
+            path = ":memory:"
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def _key(self, agent, query):
+        return hashlib.sha256(f"{self.namespace}\n{agent}\n{query}".encode()).hexdigest()
+
+    def get(self, agent, query):
+        """Cached answer JSON of an agent for a normalized query, or None"""
+        key = self._key(agent, query)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[1] >= self.ttl:
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE search_cache SET accessed_at = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+            self.hits += 1
+            return row[0]
+
+    def put(self, agent, query, response):
+        """Store an answer JSON and evict the least recently used beyond max_entries"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache "
+                "(key, namespace, agent, query, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._key(agent, query), self.namespace, agent, query, response, now, now),
+            )
+            evicted = self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN ("
+                "SELECT key FROM search_cache WHERE namespace = ? "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.max_entries),
+            ).rowcount
+            self.evictions += max(evicted, 0)
+
+    def clear(self):
+        """Drop every entry in this cache's namespace"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM search_cache WHERE namespace = ?", (self.namespace,))
+
+    def stats(self):
+        """Hit/miss counters for this process and the entries stored in this namespace"""
+        with self._lock:
+            size = self._conn.execute(
+                "SELECT COUNT(*) FROM search_cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": size,
+        }
+
+    def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        """Answer from the cache, skipping the model call and its search"""
+        query = request_query(llm_request)
+        if not query or self.ttl <= 0:
+            _pending_key.set(None)
+            return None
+        cached = self.get(callback_context.agent_name, query)
+        if cached is not None:
+            _pending_key.set(None)
+            print(f"[Search cache] Hit for {callback_context.agent_name}: {query[:60]}")
+            return LlmResponse.model_validate_json(cached)
+        _pending_key.set(query)
+        return None
+
+    def after_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        """Store a complete text answer for the query that missed"""
+        query = _pending_key.get()
+        if query is None or llm_response.partial or llm_response.error_code:
+            return None
+        content = llm_response.content
+        if not content or not content.parts or not all(part.text for part in content.parts):
+            return None  # only plain answers, not tool calls
+        _pending_key.set(None)
+        self.put(callback_context.agent_name, query, LlmResponse(
+            content=content, grounding_metadata=llm_response.grounding_metadata
+        ).model_dump_json(exclude_none=True))
+        return None
@@ -0,0 +1,243 @@
+"""
+Headline Archive
+
+Persists every parsed headline to a local SQLite database with an FTS5
+index on headline and source text, plus B-tree indexes on date and
+category, so past news can be searched in milliseconds.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS headlines (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    source TEXT NOT NULL,
+    headline TEXT NOT NULL,
+    category TEXT,
+    archived_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_headlines_date ON headlines (date);
+CREATE INDEX IF NOT EXISTS idx_headlines_category ON headlines (category, date);
+CREATE VIRTUAL TABLE IF NOT EXISTS headlines_fts USING fts5 (
+    headline, source, content='headlines', content_rowid='id'
+);
+"""
+
+CATEGORY_PATTERN = re.compile(r"^\s*\[([^\]]+)\]")
+TOKEN_PATTERN = re.compile(r"(\w+)(\*?)", re.UNICODE)
+
+
+def extract_category(headline):
+    """Return the [Category] tag at the start of a headline, if any"""
+    match = CATEGORY_PATTERN.match(headline)
+    return match.group(1).strip() if match else None
+
+
+def build_match_query(text):
+    """
+    Turn free text into a safe FTS5 query.
+
+    Every word must match; a trailing * makes a word a prefix search.
+    Any other FTS5 syntax in the input is ignored.
+    """
+    terms = [f'"{word}"{star}' for word, star in TOKEN_PATTERN.findall(text)]
+    return " ".join(terms) or None
+
+
+class HeadlineStore:
+    """SQLite archive of news items with full-text search"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Database file, or ":memory:" for a throwaway archive
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._last_id = self._conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM headlines"
+        ).fetchone()[0]
+
+    @property
+    def last_id(self):
+        """Id of the newest archived headline - the current delta cursor"""
+        return self._last_id
+
+    def sync(self):
+        """Re-read the newest id after another process has written to the archive"""
+        with self._lock:
+            self._last_id = self._conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM headlines"
+            ).fetchone()[0]
+        return self._last_id
+
+    def add_items(self, items):
+        """
+        Archive news items in a single transaction.
+
+        Returns:
+            List of the ids assigned to the items, in order
+        """
+        now = time.time()
+        rows = [
+            (
+                item["date"],
+                item["source"],
+                item["headline"],
+                item.get("category") or extract_category(item["headline"]),
+                now,
+            )
+            for item in items
+        ]
+        if not rows:
+            return []
+
+        with self._lock, self._conn:
+            # Take the write lock before reading the newest id, so no other
+            # process can insert in between and the batch gets consecutive ids
+            self._conn.execute("BEGIN IMMEDIATE")
+            last_id = self._conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM headlines"
+            ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT INTO headlines (date, source, headline, category, archived_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            # Index the whole batch with one statement instead of a trigger per row
+            self._conn.execute(
+                "INSERT INTO headlines_fts (rowid, headline, source) "
+                "SELECT id, headline, source FROM headlines WHERE id > ?",
+                (last_id,),
+            )
+            self._last_id = last_id + len(rows)
+        return list(range(last_id + 1, last_id + 1 + len(rows)))
+
+    def bulk_load(self, items, batch_size=50000):
+        """Archive a large iterable of items in batches, returning the count"""
+        count = 0
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                count += len(self.add_items(batch))
+                batch = []
+        if batch:
+            count += len(self.add_items(batch))
+        return count
+
+    def search(self, query=None, date_from=None, date_to=None, limit=50):
+        """
+        Search the archive, newest first.
+
+        Args:
+            query: Free text matched against headline and source
+            date_from: Earliest date, "YYYY-MM-DD" or "YYYY-MM-DD HH:MM"
+            date_to: Latest date (a bare day includes the whole day)
+            limit: Maximum number of results
+        """
+        clauses = []
+        params = []
+        if date_from:
+            clauses.append("h.date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("h.date <= ?")
+            # A bare day sorts before its own timestamps, so pad it to the end of the day
+            params.append(date_to + " 99:99" if len(date_to) == 10 else date_to)
+
+        match = build_match_query(query) if query else None
+        if match:
+            if clauses:
+                # Narrow the full-text scan to the ids archived within the date range
+                with self._lock:
+                    low, high = self._conn.execute(
+                        "SELECT MIN(id), MAX(id) FROM headlines h WHERE " + " AND ".join(clauses),
+                        params,
+                    ).fetchone()
+                if low is None:
+                    return []
+                clauses.append("f.rowid BETWEEN ? AND ?")
+                params += [low, high]
+            sql = (
+                "SELECT h.* FROM headlines_fts f JOIN headlines h ON h.id = f.rowid "
+                "WHERE headlines_fts MATCH ?"
+                + "".join(f" AND {clause}" for clause in clauses)
+                + " ORDER BY f.rowid DESC LIMIT ?"
+            )
+            params = [match] + params
+        else:
+            sql = (
+                "SELECT h.* FROM headlines h"
+                + (" WHERE " + " AND ".join(clauses) if clauses else "")
+                + " ORDER BY h.date DESC, h.id DESC LIMIT ?"
+            )
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_item(row) for row in rows]
+
+    def since(self, cursor, limit=100):
+        """
+        Headlines archived after cursor, oldest first.
+
+        Ids only ever grow, so a client that remembers the last id it saw
+        can ask for exactly what it hasn't received yet.
+        """
+        if cursor >= self._last_id:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM headlines WHERE id > ? ORDER BY id LIMIT ?",
+                (cursor, limit),
+            ).fetchall()
+        return [self._row_to_item(row) for row in rows]
+
+    def published_times(self, source, since):
+        """
+        Dates of a source's archived headlines from since on, in epoch seconds.
+
+        Dates are local time to the minute; ones that don't parse are skipped.
+        """
+        start = datetime.fromtimestamp(since).strftime("%Y-%m-%d %H:%M")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date FROM headlines WHERE source = ? AND date >= ?", (source, start)
+            ).fetchall()
+        times = []
+        for (date,) in rows:
+            try:
+                times.append(datetime.strptime(date, "%Y-%m-%d %H:%M").timestamp())
+            except ValueError:
+                continue
+        return times
+
+    def count(self):
+        """Number of archived headlines"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM headlines").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row_to_item(row):
+        return {
+            "id": row["id"],
+            "date": row["date"],
+            "source": row["source"],
+            "headline": row["headline"],
+            "category": row["category"],
+        }
@@ -0,0 +1,102 @@
+"""
+HTTP Caching for the Ticker API
+
+Serialises a headline snapshot once, derives a content-hash ETag from it
+and answers conditional requests with 304 Not Modified. Larger bodies are
+gzip/deflate compressed once per snapshot and reused for every client.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+import zlib
+
+from flask import Response
+
+
+class EncodedPayload:
+    """JSON body of one snapshot plus its validators and compressed variants"""
+
+    def __init__(self, data, last_modified=None):
+        self.body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.last_modified = last_modified or time.time()
+        self._lock = threading.Lock()
+        self._encoded = {"identity": self.body}
+
+    def encoded(self, encoding):
+        """Body compressed with the given content coding, computed once"""
+        with self._lock:
+            body = self._encoded.get(encoding)
+            if body is None:
+                if encoding == "gzip":
+                    body = gzip.compress(self.body, compresslevel=6, mtime=0)
+                elif encoding == "deflate":
+                    body = zlib.compress(self.body, 6)
+                else:
+                    raise ValueError(f"Unsupported content coding: {encoding}")
+                self._encoded[encoding] = body
+            return body
+
+
+class PayloadCache:
+    """Remembers the encoded payload of the snapshot currently being served"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+        self._payload = None
+
+    def get(self, data):
+        """Return the payload for data, re-encoding only when the snapshot changes"""
+        with self._lock:
+            if data is self._data and self._payload is not None:
+                return self._payload
+
+        payload = EncodedPayload(data)
+        with self._lock:
+            # Same content from a new refresh keeps its original Last-Modified
+            if self._payload is not None and self._payload.etag == payload.etag:
+                payload.last_modified = self._payload.last_modified
+            self._data = data
+            self._payload = payload
+        return payload
+
+
+def conditional_response(payload, request, compress_min_bytes=500):
+    """
+    Build a JSON response for payload honouring the request's validators.
+
+    Answers If-None-Match / If-Modified-Since with an empty 304 and picks
+    gzip or deflate when the client accepts it and the body is large enough.
+    """
+    response = Response(mimetype="application/json")
+    response.set_etag(payload.etag, weak=True)
+    response.last_modified = payload.last_modified
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(payload.etag)
+    elif request.if_modified_since:
+        not_modified = int(payload.last_modified) <= request.if_modified_since.timestamp()
+    else:
+        not_modified = False
+
+    if not_modified:
+        response.status_code = 304
+        return response
+
+    encoding = "identity"
+    if len(payload.body) >= compress_min_bytes:
+        for candidate in ("gzip", "deflate"):
+            if request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+
+    response.set_data(payload.encoded(encoding))
+    if encoding != "identity":
+        response.headers["Content-Encoding"] = encoding
+    return response
@@ -0,0 +1,262 @@
+"""
+News Ticker Load Test
+
+Drives /api/news and /api/refresh at a configurable concurrency and reports
+throughput, p50/p95/p99 latency and error rates per scenario. Results are
+written to JSON so runs can be compared over time.
+
+The app runs in-process through Flask's test client by default:
+    --backend mock   the built-in mock mode (ADK_AVAILABLE = False)
+    --backend stub   mock headlines behind a stub agent with --stub-latency
+    --backend fake   the real ADK pipeline on fake models (--stub-latency per model call)
+
+Pass --url to load an already running server over HTTP instead.
+
+Usage:
+    python loadtest.py --scenario all --concurrency 16 --duration 10
+    python loadtest.py --backend stub --stub-latency 2.0 --scenario refresh-burst
+    python loadtest.py --url http://localhost:5000 --scenario news-hot
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import datetime
+
+# Weighted (method, path) mixes; "conditional" requests send the last ETag
+SCENARIOS = {
+    "news-hot": {
+        "description": "GET /api/news against a warm cache",
+        "ops": [(1, "GET", "/api/news")],
+    },
+    "news-conditional": {
+        "description": "GET /api/news revalidating with If-None-Match",
+        "ops": [(1, "GET", "/api/news", "conditional")],
+    },
+    "news-stale": {
+        "description": "GET /api/news with a zero TTL so every request revalidates",
+        "ops": [(1, "GET", "/api/news")],
+        "ttl": 0,
+    },
+    "refresh-burst": {
+        "description": "POST /api/refresh from every client at once",
+        "ops": [(1, "POST", "/api/refresh")],
+    },
+    "mixed": {
+        "description": "90% news reads, 5% deltas, 5% manual refreshes",
+        "ops": [(90, "GET", "/api/news"), (5, "GET", "/api/news?since=0"), (5, "POST", "/api/refresh")],
+    },
+}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+class HttpTarget:
+    """Sends requests to a running server"""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+
+    def set_ttl(self, ttl):
+        return False
+
+    def request(self, method, path, headers):
+        req = urllib.request.Request(self.url + path, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=300) as response:
+                return response.status, response.headers.get("ETag"), len(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get("ETag"), len(e.read())
+
+
+class InProcessTarget:
+    """Sends requests to the app through Flask's test client"""
+
+    def __init__(self, backend, stub_latency):
+        # Mock mode must be chosen before the app is imported
+        os.environ["GOOGLE_API_KEY"] = ""
+        os.environ.setdefault("NEWS_ARCHIVE_PATH", ":memory:")
+        if backend == "fake":
+            os.environ["NEWS_FAKE_LLM"] = "1"
+            os.environ["NEWS_FAKE_LLM_LATENCY"] = str(stub_latency)
+        import app as ticker
+
+        self.ticker = ticker
+        self._local = threading.local()
+        self._client_numbers = itertools.count(1)
+        if backend == "stub":
+            original = ticker.run_agent_sync
+
+            def stub_run_agent_sync(user_message, on_text=None, on_articles=None, **options):
+                time.sleep(stub_latency)
+                return original(user_message, on_text, on_articles, **options)
+
+            ticker.run_agent_sync = stub_run_agent_sync
+
+    def set_ttl(self, ttl):
+        self.ticker.news_cache.ttl = ttl
+        return True
+
+    def request(self, method, path, headers):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            # One address per load-test thread, so per-client rate limits apply
+            # the way they would to separate browsers
+            client = self._local.client = self.ticker.app.test_client()
+            number = next(self._client_numbers)
+            client.environ_base["REMOTE_ADDR"] = f"10.0.{number // 256}.{number % 256}"
+        response = client.open(path, method=method, headers=headers)
+        return response.status_code, response.headers.get("ETag"), len(response.get_data())
+
+
+def run_scenario(target, name, args):
+    """Run one scenario and return its summary"""
+    scenario = SCENARIOS[name]
+    default_ttl = None
+    if "ttl" in scenario and isinstance(target, InProcessTarget):
+        default_ttl = target.ticker.news_cache.ttl
+        target.set_ttl(scenario["ttl"])
+
+    # Warm up so the first agent run isn't counted against the scenario
+    status, etag, _ = target.request("GET", "/api/news", {})
+
+    weights = [op[0] for op in scenario["ops"]]
+    lock = threading.Lock()
+    latencies = []
+    statuses = Counter()
+    errors = Counter()
+    total_bytes = 0
+    deadline = time.monotonic() + args.duration
+    barrier = threading.Barrier(args.concurrency)
+
+    def worker(seed):
+        nonlocal total_bytes
+        rng = random.Random(seed)
+        last_etag = etag
+        barrier.wait()
+        sent = 0
+        while time.monotonic() < deadline and (not args.requests or sent < args.requests):
+            op = rng.choices(scenario["ops"], weights)[0]
+            headers = {}
+            if len(op) > 3 and op[3] == "conditional" and last_etag:
+                headers["If-None-Match"] = last_etag
+            started = time.perf_counter()
+            try:
+                status, response_etag, size = target.request(op[1], op[2], headers)
+                last_etag = response_etag or last_etag
+            except Exception as e:
+                status, size = None, 0
+                with lock:
+                    errors[type(e).__name__] += 1
+            elapsed = time.perf_counter() - started
+            sent += 1
+            with lock:
+                latencies.append(elapsed)
+                statuses[str(status)] += 1
+                total_bytes += size
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    if default_ttl is not None:
+        target.set_ttl(default_ttl)
+
+    # 429s are deliberate load shedding by admission control, not failures
+    rejected = statuses.get("429", 0)
+    failed = sum(count for status, count in statuses.items()
+                 if status == "None" or (int(status) >= 400 and status != "429"))
+    return {
+        "scenario": name,
+        "description": scenario["description"],
+        "requests": len(latencies),
+        "duration_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else None,
+        "latency_ms": {
+            key: round(percentile(latencies, pct) * 1000, 3) if latencies else None
+            for key, pct in (("p50", 50), ("p95", 95), ("p99", 99))
+        },
+        "error_rate": round(failed / len(latencies), 4) if latencies else None,
+        "rejected_rate": round(rejected / len(latencies), 4) if latencies else None,
+        "status_counts": dict(statuses),
+        "exceptions": dict(errors),
+        "bytes_received": total_bytes,
+    }
+
+
+def print_result(result):
+    latency = result["latency_ms"]
+    print(
+        f"{result['scenario']:<18} {result['requests']:>7} req  "
+        f"{result['throughput_rps']:>9} req/s  "
+        f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms  "
+        f"errors={result['error_rate']:.2%} rejected={result['rejected_rate']:.2%}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", action="append",
+                        help=f"scenario to run, repeatable: {', '.join(SCENARIOS)} or all")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per scenario")
+    parser.add_argument("--requests", type=int, default=0,
+                        help="stop each client after this many requests (0 = duration only)")
+    parser.add_argument("--backend", choices=["mock", "stub", "fake"], default="mock")
+    parser.add_argument("--stub-latency", type=float, default=1.0,
+                        help="seconds per agent run with --backend stub, per model call with fake")
+    parser.add_argument("--url", help="load a running server instead of the in-process app")
+    parser.add_argument("--output", default="loadtest_results.json")
+    args = parser.parse_args()
+
+    names = args.scenario or ["all"]
+    if "all" in names:
+        names = list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    target = HttpTarget(args.url) if args.url else InProcessTarget(args.backend, args.stub_latency)
+    results = []
+    for name in names:
+        result = run_scenario(target, name, args)
+        print_result(result)
+        results.append(result)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "target": args.url or f"in-process ({args.backend})",
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "requests_per_client": args.requests or None,
+            "stub_latency_s": args.stub_latency if args.backend != "mock" and not args.url else None,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
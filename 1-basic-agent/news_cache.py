@@ -0,0 +1,290 @@
+"""
+Stale-While-Revalidate News Cache
+
+Keeps the last parsed headline snapshot in memory so the ticker API can
+answer immediately, and refreshes it in a background thread once it is
+older than the configured TTL. Streaming clients can subscribe to receive
+each headline as a refresh produces it.
+
+With a SharedSnapshotStore, several worker processes serve the same snapshot
+and only the worker holding the refresh lease runs the fetch.
+
+Refreshes are "manual" (refresh()) or "scheduled" (the first fill and
+background revalidation). With a RunBudget, a refresh that would start a
+fetch takes a run from it first, and raises Saturated when its kind may not
+have one; joining a refresh already running is always free.
+"""
+
+import queue
+import threading
+import time
+
+from admission import Saturated
+from singleflight import SingleFlight
+
+
+class NewsCache:
+    """In-memory headline snapshot with background revalidation"""
+
+    def __init__(self, fetch, ttl=300, retry_interval=30, store=None,
+                 sync_interval=1.0, on_sync=None, run_budget=None):
+        """
+        Args:
+            fetch: Callable returning a list of parsed news items. It is
+                passed an on_item callback to report items as they are parsed.
+            ttl: Seconds a snapshot is served before it is revalidated
+            retry_interval: Seconds to wait before retrying a failed refresh
+            store: Optional SharedSnapshotStore to share snapshots and
+                refreshes with other processes
+            sync_interval: Seconds between checks of the store for snapshots
+                written by other processes
+            on_sync: Called with the items whenever a snapshot written by
+                another process is picked up
+            run_budget: Optional RunBudget every fetch this process starts
+                takes a run from
+        """
+        self._fetch = fetch
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._items = None
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._failed_at = None
+        self._refresh_thread = None
+        self._flight = SingleFlight()
+        self._subscribers = set()
+        self._store = store
+        self.sync_interval = sync_interval
+        self._on_sync = on_sync
+        self._version = 0
+        self._synced_at = 0.0
+        self.run_budget = run_budget
+        # How get() was answered: fresh snapshot, stale snapshot, or a wait
+        self.lookups = {"hit": 0, "stale": 0, "miss": 0}
+
+    def get(self):
+        """
+        Return the cached snapshot, revalidating it in the background if stale.
+
+        Only the first call waits for a run. If that run fails, calls return
+        an empty list until a background retry produces a snapshot.
+        """
+        self._sync()
+        with self._lock:
+            items = self._items
+            failed_at = self._failed_at
+            if items is None:
+                self.lookups["miss"] += 1
+
+        if items is None:
+            if failed_at is None:
+                # Nothing to serve yet - the first caller has to wait for a run
+                return self.refresh("scheduled")
+            # The last run failed: serve nothing rather than a run per request,
+            # and retry in the background once retry_interval has passed
+            if time.monotonic() - failed_at >= self.retry_interval:
+                self.refresh_in_background()
+            return []
+
+        stale = self.is_stale()
+        with self._lock:
+            self.lookups["stale" if stale else "hit"] += 1
+        if stale:
+            self.refresh_in_background()
+        return items
+
+    def peek(self):
+        """Return the cached snapshot (or None) without triggering a refresh"""
+        self._sync()
+        with self._lock:
+            return self._items
+
+    def is_stale(self):
+        """Check whether the snapshot is older than the TTL"""
+        self._sync()
+        now = time.monotonic()
+        with self._lock:
+            if now - self._fetched_at < self.ttl:
+                return False
+            # Don't hammer the agent while it keeps failing
+            return now - self._last_attempt >= self.retry_interval
+
+    def age(self):
+        """Seconds since the snapshot was last refreshed, or None if empty"""
+        with self._lock:
+            if self._items is None:
+                return None
+            return time.monotonic() - self._fetched_at
+
+    def refresh(self, kind="manual"):
+        """
+        Run the fetch now and return the (possibly unchanged) snapshot.
+
+        Callers arriving while a refresh is already running wait for that
+        run instead of starting another one.
+
+        Raises:
+            Saturated: if the run budget has no run for this kind of refresh
+        """
+        items, _ = self._flight.do("refresh", lambda: self._refresh(kind))
+        return items
+
+    def _sync(self, force=False):
+        """Pick up a newer snapshot written by another process"""
+        if self._store is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = now
+        snapshot = self._store.load()
+        if snapshot is not None:
+            self._adopt(*snapshot)
+
+    def _adopt(self, version, fetched_at, items):
+        """Swap in a stored snapshot if it is newer than the local one"""
+        with self._lock:
+            if version <= self._version:
+                return False
+            self._version = version
+            self._items = items
+            # Stored times are wall clock; convert to this process's clock
+            self._fetched_at = time.monotonic() - max(0.0, time.time() - fetched_at)
+        if self._on_sync is not None:
+            self._on_sync(items)
+        return True
+
+    def _refresh(self, kind):
+        """Fetch new items and swap them into the snapshot"""
+        with self._lock:
+            self._last_attempt = time.monotonic()
+
+        if self._store is not None:
+            return self._refresh_shared(kind)
+        self._admit(kind)
+        snapshot, _ = self._run_fetch()
+        return snapshot
+
+    def _admit(self, kind):
+        """Take a run from the budget for a fetch about to start"""
+        if self.run_budget is None:
+            return
+        retry_after = self.run_budget.acquire(kind)
+        if retry_after:
+            print(f"No agent run left for a {kind} refresh, retry in {retry_after}s")  # Debug logging
+            raise Saturated(retry_after)
+
+    def _refresh_shared(self, kind):
+        """Refresh through the store so one fetch serves every process"""
+        requested_at = time.time()
+        version = self._store.version()
+        if not self._store.acquire("refresh"):
+            # Another worker is fetching - wait for its snapshot
+            snapshot = self._store.wait_for_update("refresh", version)
+            if snapshot is not None:
+                self._adopt(*snapshot)
+            return self._publish_snapshot()
+
+        try:
+            snapshot = self._store.load()
+            if snapshot is not None and snapshot[1] >= requested_at:
+                # Another worker finished a refresh since this one was requested
+                self._adopt(*snapshot)
+                return self._publish_snapshot()
+
+            self._admit(kind)
+            # The run can outlast lease_ttl (deadline, classifier, feed polls),
+            # so keep the lease until it is done
+            with self._store.keep_alive("refresh"):
+                snapshot, fetched = self._run_fetch()
+            if fetched:
+                version = self._store.save(snapshot)
+                with self._lock:
+                    self._version = max(self._version, version)
+            return snapshot
+        finally:
+            self._store.release("refresh")
+
+    def _publish_snapshot(self):
+        with self._lock:
+            snapshot = self._items if self._items is not None else []
+        self._publish("snapshot", snapshot)
+        return snapshot
+
+    def _run_fetch(self):
+        """
+        Run the fetch in this process and publish its progress.
+
+        Returns:
+            (snapshot, fetched) where fetched is False if the run failed or
+            produced nothing and the previous snapshot was kept
+        """
+        self._publish("refresh", None)
+        try:
+            items = self._fetch(on_item=lambda item: self._publish("item", item))
+        except Exception as e:
+            print(f"Error refreshing news cache: {str(e)}")  # Debug logging
+            items = None
+
+        with self._lock:
+            # Keep serving the previous snapshot if the run produced nothing
+            if items:
+                self._items = items
+                self._fetched_at = time.monotonic()
+                self._failed_at = None
+            else:
+                self._failed_at = time.monotonic()
+            snapshot = self._items if self._items is not None else []
+
+        self._publish("snapshot", snapshot)
+        return snapshot, bool(items)
+
+    def subscribe(self, maxsize=100):
+        """
+        Register for refresh events.
+
+        Returns:
+            Queue receiving (event, data) tuples: ("refresh", None) when a run
+            starts, ("item", item) per parsed headline and ("snapshot", items)
+            when the run finishes
+        """
+        events = queue.Queue(maxsize=maxsize)
+        with self._lock:
+            self._subscribers.add(events)
+        return events
+
+    def unsubscribe(self, events):
+        """Stop delivering refresh events to a queue from subscribe()"""
+        with self._lock:
+            self._subscribers.discard(events)
+
+    def _publish(self, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for events in subscribers:
+            try:
+                events.put_nowait((event, data))
+            except queue.Full:
+                # Drop events for slow consumers rather than block the refresh
+                pass
+
+    def refresh_in_background(self):
+        """Start a background refresh unless one is already running"""
+        if self._flight.in_flight("refresh"):
+            return False
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return False
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_background, name="news-cache-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+            return True
+
+    def _refresh_background(self):
+        try:
+            self.refresh("scheduled")
+        except Exception as e:
+            # E.g. the shared store is unavailable; retried after retry_interval
+            print(f"Background refresh failed: {str(e)}")  # Debug logging
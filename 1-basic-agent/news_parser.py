@@ -0,0 +1,205 @@
+"""
+Incremental News Parser
+
+Turns the agent's text into news items while it is still being generated.
+Text arrives in arbitrary chunks and is scanned once, line by line, by a
+small state machine; an item is emitted as soon as its Date/Source/Headline
+triple is complete. A blank line or a horizontal rule ends an article, so the
+fields of an incomplete article are dropped instead of being completed by
+the next one.
+
+Besides the plain "Label: value" format the formatter is asked for, the
+parser accepts the usual model drift: Markdown bold or heading labels,
+list bullets, numbering, different label casing, CRLF line endings and
+articles that are not separated by blank lines.
+
+When the formatter returns structured output instead, parse_structured_articles
+turns its {"articles": [...]} object into the same news items, and
+ArticleObjectStream picks each finished article object out of that JSON
+while it is still being streamed.
+"""
+
+import json
+import re
+
+# Label aliases the model uses for each field
+FIELDS = {
+    "date": "date",
+    "published": "date",
+    "source": "source",
+    "publication": "source",
+    "headline": "headline",
+    "title": "headline",
+}
+
+LINE_PATTERN = re.compile(
+    r"""^\s*
+    (?:[-*+•]\s+|\d+[.)]\s+|\#{1,6}\s+|>\s*)?    # bullet, number, heading or quote
+    (?:\*\*|__|\*|_)?                                 # opening emphasis
+    (?P<label>date|published|source|publication|headline|title)
+    \s*(?:\*\*|__|\*|_)?\s*:\s*(?:\*\*|__|\*|_)?       # colon, inside or outside the emphasis
+    \s*(?P<value>.*?)
+    \s*(?:\*\*|__)?\s*$""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+# Markdown horizontal rule between articles
+SEPARATOR_PATTERN = re.compile(r"^(?:-{3,}|\*{3,}|_{3,})$")
+
+
+class NewsStreamParser:
+    """Single-pass state machine that yields complete news items from text chunks"""
+
+    def __init__(self):
+        self._pending = []
+        self._item = {}
+
+    def feed(self, text):
+        """Consume a chunk of text and return the items it completed"""
+        if "\n" not in text:
+            # Still inside the same line - just remember the fragment
+            if text:
+                self._pending.append(text)
+            return []
+
+        lines = text.split("\n")
+        if self._pending:
+            self._pending.append(lines[0])
+            lines[0] = "".join(self._pending)
+        tail = lines.pop()
+        self._pending = [tail] if tail else []
+
+        items = []
+        for line in lines:
+            item = self._parse_line(line)
+            if item is not None:
+                items.append(item)
+        return items
+
+    def close(self):
+        """Flush the trailing partial line and return any item it completed"""
+        line = "".join(self._pending)
+        self._pending = []
+        item = self._parse_line(line)
+        self._item = {}
+        return [item] if item is not None else []
+
+    def _parse_line(self, line):
+        label, colon, value = line.partition(":")
+        if not colon:
+            stripped = line.strip()
+            if not stripped or SEPARATOR_PATTERN.match(stripped):
+                # Article boundary: fields so far can't belong to the next article
+                self._item = {}
+            return None
+
+        # Fast path for the plain "Label: value" format
+        key = FIELDS.get(label.strip().lower())
+        if key is not None:
+            value = value.strip().strip("*").strip()
+        else:
+            match = LINE_PATTERN.match(line)
+            if match is None:
+                return None
+            key = FIELDS[match.group("label").lower()]
+            value = match.group("value")
+        if not value:
+            return None
+
+        if key in self._item:
+            # A repeated field means the previous article was incomplete
+            self._item = {}
+        self._item[key] = value
+
+        if len(self._item) == 3:
+            item, self._item = self._item, {}
+            return {"date": item["date"], "source": item["source"], "headline": item["headline"]}
+        return None
+
+
+class ArticleObjectStream:
+    """
+    Finds the finished article objects in streamed {"articles": [...]} JSON.
+
+    The text is scanned once, tracking strings and nesting depth, and every
+    object nested directly in the articles list is returned as soon as its
+    closing brace arrives. Anything outside the top-level object (such as a
+    Markdown code fence) is skipped.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._object = None
+        # Article objects finished so far, valid or not
+        self.objects = 0
+
+    def feed(self, text):
+        """Consume a chunk of JSON text and return the articles it completed"""
+        articles = []
+        for char in text:
+            if self._object is not None:
+                self._object.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = self._depth > 0
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 3 and char == "{":
+                    self._object = [char]
+            elif char in "}]" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 2 and self._object is not None:
+                    self.objects += 1
+                    articles.extend(self._decode("".join(self._object)))
+                    self._object = None
+        return articles
+
+    @staticmethod
+    def _decode(text):
+        try:
+            return parse_structured_articles({"articles": [json.loads(text)]})
+        except ValueError:
+            return []
+
+
+def parse_news_text(news_text):
+    """Parse a complete agent response in one pass"""
+    parser = NewsStreamParser()
+    return parser.feed(news_text) + parser.close()
+
+
+def parse_structured_articles(value):
+    """
+    Turn the formatter's structured output into news items.
+
+    Args:
+        value: {"articles": [...]} as a dict or JSON string
+
+    Returns:
+        Items with date, source and headline; articles missing a field are skipped
+
+    Raises:
+        ValueError: If value is not an articles object
+    """
+    if isinstance(value, (str, bytes)):
+        value = json.loads(value)
+    articles = value.get("articles") if isinstance(value, dict) else None
+    if not isinstance(articles, list):
+        raise ValueError("expected an object with an 'articles' list")
+
+    items = []
+    for article in articles:
+        if not isinstance(article, dict):
+            continue
+        item = {field: str(article.get(field) or "").strip() for field in ("date", "source", "headline")}
+        if all(item.values()):
+            items.append(item)
+    return items
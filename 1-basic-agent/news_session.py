@@ -0,0 +1,147 @@
+"""
+Bounded Sessions for the News Ticker
+
+The ticker used to reuse one session forever, so every refresh sent the
+model a longer history than the last. NewsSessionManager rotates sessions
+on a policy and records how large each run's prompt was so the effect on
+latency and token cost can be measured.
+
+Policies:
+    refresh - a fresh session for every refresh cycle (default)
+    window  - reuse a session for at most max_turns refreshes, then rotate
+"""
+
+import asyncio
+import inspect
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+POLICIES = ("refresh", "window")
+
+
+async def _resolve(result):
+    """Await session service results from both sync and async ADK versions"""
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+class NewsSessionManager:
+    """Hands out ticker sessions according to a rotation policy"""
+
+    def __init__(self, session_service, app_name, user_id, policy="refresh",
+                 max_turns=3, history=50):
+        """
+        Args:
+            session_service: ADK session service holding the sessions
+            app_name: App name the runner was created with
+            user_id: User the ticker sessions belong to
+            policy: "refresh" or "window"
+            max_turns: Refreshes per session under the window policy
+            history: Number of recent run records to keep
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown session policy '{policy}', expected one of {POLICIES}")
+        self.session_service = session_service
+        self.app_name = app_name
+        self.user_id = user_id
+        self.policy = policy
+        self.max_turns = max(1, max_turns)
+        self.runs = deque(maxlen=history)
+        self._lock = None
+        self._session_id = None
+        self._turns = 0
+
+    async def acquire(self):
+        """
+        Return the session the next run should use.
+
+        Returns:
+            Tuple of (session_id, history_events) where history_events is
+            the number of events the run inherits from earlier refreshes
+        """
+        if self._lock is None:
+            # Created lazily so it binds to the agent worker's event loop
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._session_id is not None and self._turns < self._turns_allowed():
+                session = await _resolve(self.session_service.get_session(
+                    app_name=self.app_name,
+                    user_id=self.user_id,
+                    session_id=self._session_id,
+                ))
+                if session is not None:
+                    self._turns += 1
+                    return self._session_id, len(session.events)
+
+            await self._delete(self._session_id)
+            session = await _resolve(self.session_service.create_session(
+                app_name=self.app_name,
+                user_id=self.user_id,
+                state={},
+            ))
+            self._session_id = session.id
+            self._turns = 1
+            return session.id, 0
+
+    @asynccontextmanager
+    async def scratch(self):
+        """A fresh session outside the rotation for a one-off run, deleted afterwards"""
+        session = await _resolve(self.session_service.create_session(
+            app_name=self.app_name,
+            user_id=self.user_id,
+            state={},
+        ))
+        try:
+            yield session.id
+        finally:
+            await self._delete(session.id)
+
+    def record_run(self, session_id, history_events, prompt_tokens, started_at):
+        """Remember how large a run's prompt was and how long it took"""
+        run = {
+            "session_id": session_id,
+            "turn": self._turns,
+            "history_events": history_events,
+            "prompt_tokens": prompt_tokens,
+            "duration": round(time.monotonic() - started_at, 3),
+            "finished_at": time.time(),
+        }
+        self.runs.append(run)
+        print(
+            f"Agent run used {prompt_tokens} prompt tokens "
+            f"({history_events} history events, turn {run['turn']})"
+        )  # Debug logging
+        return run
+
+    def retire(self, session_id):
+        """Start a new session on the next refresh, e.g. after a run was cut off mid-turn"""
+        if session_id == self._session_id:
+            self._turns = self._turns_allowed()
+
+    def stats(self):
+        """Summary of the policy and recent runs for the stats endpoint"""
+        runs = list(self.runs)
+        tokens = [run["prompt_tokens"] for run in runs]
+        return {
+            "policy": self.policy,
+            "max_turns": self.max_turns if self.policy == "window" else 1,
+            "runs": runs,
+            "avg_prompt_tokens": round(sum(tokens) / len(tokens), 1) if tokens else None,
+        }
+
+    def _turns_allowed(self):
+        return self.max_turns if self.policy == "window" else 1
+
+    async def _delete(self, session_id):
+        if session_id is None:
+            return
+        try:
+            await _resolve(self.session_service.delete_session(
+                app_name=self.app_name,
+                user_id=self.user_id,
+                session_id=session_id,
+            ))
+        except Exception as e:
+            print(f"Error deleting session {session_id}: {str(e)}")  # Debug logging
@@ -0,0 +1,179 @@
+"""
+Cross-Process Snapshot Store
+
+Lets several server processes (e.g. gunicorn workers) share one headline
+snapshot and one refresh. The snapshot and a refresh lease live in a small
+SQLite file that every worker opens; whichever worker takes the lease runs
+the agent, the rest wait for its snapshot to appear. The holder renews the
+lease on a heartbeat for as long as its refresh runs, so the lease only
+expires when the holder has died.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshot (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    items TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SharedSnapshotStore:
+    """Headline snapshot and refresh lease shared through a SQLite file"""
+
+    def __init__(self, path, lease_ttl=30, poll_interval=0.05):
+        """
+        Args:
+            path: Database file every worker opens
+            lease_ttl: Seconds a lease lasts unless its holder renews it, i.e.
+                how long a worker that died mid-refresh holds up the others
+            poll_interval: Seconds between checks while waiting on another
+                worker's refresh
+        """
+        self.path = path
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def version(self):
+        """Version of the stored snapshot, 0 if there is none yet"""
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM snapshot WHERE id = 1").fetchone()
+        return row[0] if row else 0
+
+    def load(self):
+        """
+        Read the stored snapshot.
+
+        Returns:
+            (version, fetched_at, items) with fetched_at as a Unix timestamp,
+            or None if no worker has stored one yet
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, fetched_at, items FROM snapshot WHERE id = 1"
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def save(self, items):
+        """Store a new snapshot and return its version"""
+        payload = json.dumps(items, separators=(",", ":"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO snapshot (id, version, fetched_at, items) VALUES (1, 1, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET version = version + 1, "
+                "fetched_at = excluded.fetched_at, items = excluded.items",
+                (time.time(), payload),
+            )
+            row = self._conn.execute("SELECT version FROM snapshot WHERE id = 1").fetchone()
+        return row[0]
+
+    def acquire(self, name):
+        """Take the named lease unless another live worker holds it"""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, "
+                "expires_at = excluded.expires_at "
+                "WHERE leases.expires_at < ? OR leases.owner = excluded.owner",
+                (name, self.owner, now + self.lease_ttl, now),
+            )
+        return cursor.rowcount == 1
+
+    def renew(self, name):
+        """Extend the named lease by lease_ttl if this worker still holds it"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE name = ? AND owner = ?",
+                (time.time() + self.lease_ttl, name, self.owner),
+            )
+        return cursor.rowcount == 1
+
+    @contextmanager
+    def keep_alive(self, name, interval=None):
+        """
+        Renew the named lease every interval seconds (a third of lease_ttl by
+        default) while the block runs, however long it takes.
+        """
+        interval = self.lease_ttl / 3 if interval is None else interval
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(interval):
+                try:
+                    if not self.renew(name):
+                        print(f"Lost the {name} lease")  # Debug logging
+                        return
+                except sqlite3.Error as e:
+                    # Retried on the next beat, well before the lease expires
+                    print(f"Renewing the {name} lease failed: {str(e)}")  # Debug logging
+
+        thread = threading.Thread(target=heartbeat, name=f"lease-{name}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def release(self, name):
+        """Give up the named lease if this worker holds it"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM leases WHERE name = ? AND owner = ?", (name, self.owner)
+            )
+
+    def is_held(self, name):
+        """Check whether any worker currently holds the named lease"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM leases WHERE name = ? AND expires_at >= ?", (name, time.time())
+            ).fetchone()
+        return row is not None
+
+    def wait_for_update(self, name, version):
+        """
+        Wait for the lease holder to store a snapshot newer than version.
+
+        Returns:
+            The new snapshot as returned by load(), or None if the lease was
+            released (or expired) without a new snapshot being stored
+        """
+        while True:
+            snapshot = self.load()
+            if snapshot is not None and snapshot[0] > version:
+                return snapshot
+            if not self.is_held(name):
+                # Re-check in case the snapshot landed just before the release
+                snapshot = self.load()
+                if snapshot is not None and snapshot[0] > version:
+                    return snapshot
+                return None
+            time.sleep(self.poll_interval)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
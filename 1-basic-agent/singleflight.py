@@ -0,0 +1,65 @@
+"""
+Single-Flight Call Coalescing
+
+Concurrent callers asking for the same key share one execution: the first
+caller runs the function and everyone who arrives while it is in progress
+waits for it and receives the same result (or exception).
+"""
+
+import threading
+
+
+class _Call:
+    """An in-progress call that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Run fn() for key, or wait for the run already in progress.
+
+        Returns:
+            Tuple of (result, shared) where shared is True if this caller
+            joined a run started by someone else
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def in_flight(self, key):
+        """Check whether a call for key is currently running"""
+        with self._lock:
+            return key in self._calls
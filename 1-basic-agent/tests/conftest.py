@@ -0,0 +1,109 @@
+"""
+Shared fixtures for the ticker tests.
+
+The app runs in mock mode (no API key or network needed), with a throwaway
+archive and the search cache turned off, like the benchmarks.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+# Force mock mode before the app is imported so no real agent runs happen
+os.environ["GOOGLE_API_KEY"] = ""
+os.environ.setdefault("NEWS_ARCHIVE_PATH", ":memory:")
+os.environ.setdefault("SEARCH_CACHE_TTL", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import app as ticker  # noqa: E402
+from dedup import SimHashIndex  # noqa: E402
+from headline_store import HeadlineStore  # noqa: E402
+from news_cache import NewsCache  # noqa: E402
+
+
+@pytest.fixture
+def news_cache(monkeypatch):
+    """An empty snapshot cache in place of the app's, with an empty archive and story index"""
+    monkeypatch.setattr(ticker, "headline_store", HeadlineStore(":memory:"))
+    monkeypatch.setattr(ticker, "story_index", SimHashIndex(
+        max_distance=ticker.NEWS_DEDUP_DISTANCE, capacity=ticker.NEWS_DEDUP_CAPACITY
+    ))
+    cache = NewsCache(ticker.fetch_news, ttl=ticker.NEWS_CACHE_TTL)
+    monkeypatch.setattr(ticker, "news_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def agent_runs(monkeypatch):
+    """Messages of the agent runs started, with each run taking 0.3s"""
+    runs = []
+    lock = threading.Lock()
+    original = ticker.run_agent_sync
+
+    def slow_run_agent_sync(user_message, on_text=None, on_articles=None, **options):
+        with lock:
+            runs.append(user_message)
+        time.sleep(0.3)
+        return original(user_message, on_text, on_articles, **options)
+
+    monkeypatch.setattr(ticker, "run_agent_sync", slow_run_agent_sync)
+    return runs
+
+
+@pytest.fixture
+def client():
+    return ticker.app.test_client()
+
+
+@pytest.fixture
+def fake_agents(monkeypatch):
+    """
+    The app running its real agent graph against scripted fake models.
+
+    Every agent's model and the app's runners are put back afterwards.
+    Returns install(agent, **options), which swaps in another fake model.
+    """
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+
+    from agent_utils import iter_agents
+    from fake_llm import install_fake_llm
+    from greeting_agent import agent as news_agent
+    from news_parser import parse_news_text
+    from news_session import NewsSessionManager
+
+    roots = (news_agent.news_pipeline, news_agent.root_agent, news_agent.feed_formatter, news_agent.topic_classifier)
+    for root in roots:
+        for current in iter_agents(root):
+            if hasattr(current, "model"):
+                monkeypatch.setattr(current, "model", current.model)
+
+    def install(agent, **options):
+        return install_fake_llm(agent, **dict({"latency": 0, "chunk_delay": 0}, **options))
+
+    mock_articles = lambda: json.dumps({"articles": parse_news_text(ticker.mock_news_response())})
+    install(news_agent.news_pipeline, scripts={
+        **{searcher.name: [ticker.mock_news_response] for searcher in news_agent.group_searchers},
+        news_agent.pipeline_formatter.name: [mock_articles],
+    })
+    install(news_agent.feed_formatter, responder=lambda llm_request, step: json.dumps(
+        {"articles": parse_news_text(ticker.request_text(llm_request))[:5]}
+    ))
+    install(news_agent.topic_classifier, responder=lambda llm_request, step: ticker.fake_topic_assignments(
+        ticker.request_text(llm_request)
+    ))
+
+    session_service = InMemorySessionService()
+    for name, agent in (("runner", news_agent.news_pipeline), ("feed_runner", news_agent.feed_formatter),
+                        ("classifier_runner", news_agent.topic_classifier)):
+        monkeypatch.setattr(ticker, name, Runner(agent=agent, app_name="test", session_service=session_service))
+    monkeypatch.setattr(ticker, "news_sessions", NewsSessionManager(
+        session_service, app_name="test", user_id=ticker.GLOBAL_USER_ID
+    ))
+    monkeypatch.setattr(ticker, "ADK_AVAILABLE", True)
+    return install
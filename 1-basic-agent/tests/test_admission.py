@@ -0,0 +1,85 @@
+"""Per-client limit on /api/refresh and the process-wide agent run budget"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import app as ticker
+from admission import RateLimiter, RunBudget, Saturated
+from news_cache import NewsCache
+
+
+def test_burst_then_steady_rate():
+    limiter = RateLimiter(rate=10, burst=2)
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") >= 1
+    # Clients have their own buckets
+    assert limiter.acquire("b") == 0
+    time.sleep(0.15)
+    assert limiter.acquire("a") == 0
+
+
+def test_refresh_burst_is_answered_429(news_cache, client, monkeypatch):
+    monkeypatch.setattr(ticker, "refresh_limiter", RateLimiter(rate=1 / 60, burst=2))
+    statuses = [client.post("/api/refresh").status_code for _ in range(2)]
+    response = client.post("/api/refresh")
+    assert statuses == [200, 200]
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.get_json()["reason"] == "rate_limited"
+    # Another client is unaffected
+    assert client.post("/api/refresh", environ_overrides={"REMOTE_ADDR": "10.9.1.1"}).status_code == 200
+
+
+@pytest.mark.parametrize("priority, other", [("scheduled", "manual"), ("manual", "scheduled")])
+def test_reserve_is_left_to_the_priority_kind(priority, other):
+    budget = RunBudget(rate=1 / 60, burst=3, reserve=2, priority=priority)
+    assert budget.acquire(other) == 0
+    # Only the reserve is left: the other kind is turned away, the priority kind is not
+    assert budget.acquire(other) >= 1
+    assert budget.acquire(priority) == 0
+    assert budget.acquire(priority) == 0
+    assert budget.acquire(priority) >= 1
+    assert budget.stats()["started"] == {priority: 2, other: 1}
+    assert budget.stats()["refused"] == {priority: 1, other: 1}
+
+
+def test_spent_budget_answers_manual_refresh_429(client, monkeypatch):
+    budget = RunBudget(rate=1 / 60, burst=2, reserve=1, priority="scheduled")
+    monkeypatch.setattr(ticker, "news_cache", NewsCache(ticker.fetch_news, ttl=ticker.NEWS_CACHE_TTL, run_budget=budget))
+    monkeypatch.setattr(ticker, "refresh_limiter", RateLimiter(rate=100, burst=100))
+    assert client.post("/api/refresh").status_code == 200
+    response = client.post("/api/refresh")
+    assert response.status_code == 429
+    assert response.get_json()["reason"] == "saturated"
+    assert int(response.headers["Retry-After"]) >= 1
+    # Scheduled revalidation still gets the reserved run
+    ticker.news_cache.refresh("scheduled")
+    with pytest.raises(Saturated):
+        ticker.news_cache.refresh("scheduled")
+
+
+def test_joining_a_running_refresh_is_free(agent_runs, monkeypatch):
+    budget = RunBudget(rate=1 / 60, burst=1)
+    cache = NewsCache(ticker.fetch_news, ttl=ticker.NEWS_CACHE_TTL, run_budget=budget)
+    threads = [threading.Thread(target=cache.refresh, args=("manual",)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(agent_runs) == 1
+    assert budget.stats()["refused"] == {"scheduled": 0, "manual": 0}
+
+
+@pytest.mark.parametrize("name", ["NEWS_REFRESH_RATE", "NEWS_REFRESH_BURST"])
+def test_zero_refresh_rate_is_rejected(name):
+    env = dict(os.environ, **{name: "0"})
+    result = subprocess.run([sys.executable, "-c", "import app"], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.returncode != 0
+    assert "ValueError" in result.stderr and name in result.stderr
@@ -0,0 +1,43 @@
+"""Agent profiler spans on runs that don't finish"""
+
+import asyncio
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from agent_profiler import AgentProfiler
+from fake_llm import install_fake_llm
+
+
+def run(agent):
+    async def main():
+        service = InMemorySessionService()
+        runner = Runner(agent=agent, app_name="test", session_service=service)
+        session = await service.create_session(app_name="test", user_id="user")
+        message = types.Content(role="user", parts=[types.Part(text="news")])
+        async for _ in runner.run_async(user_id="user", session_id=session.id, new_message=message):
+            pass
+
+    asyncio.run(main())
+
+
+def test_failed_run_inside_scope_is_closed_and_recorded():
+    agent = Agent(name="failing", model="gemini-2.0-flash", instruction="News")
+
+    def model_down(llm_request, step):
+        raise RuntimeError("model down")
+
+    install_fake_llm(agent, responder=model_down, latency=0)
+    profiler = AgentProfiler()
+    profiler.instrument(agent)
+
+    with pytest.raises(RuntimeError):
+        with profiler.scope():
+            run(agent)
+
+    assert profiler._open == {}
+    assert len(profiler.runs()) == 1
+    assert "failing" in profiler.last_run()["agents"]
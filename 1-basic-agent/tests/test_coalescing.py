@@ -0,0 +1,36 @@
+"""Concurrent /api/news and /api/refresh calls share a single agent run"""
+
+import threading
+
+
+def test_concurrent_requests_share_one_agent_run(news_cache, agent_runs, client):
+    clients = 8
+    barrier = threading.Barrier(clients)
+    results = [None] * clients
+
+    def request(index):
+        barrier.wait()
+        if index % 2:
+            # Separate browsers, so the per-client refresh limit doesn't apply
+            response = client.post("/api/refresh", environ_overrides={"REMOTE_ADDR": f"10.9.0.{index}"})
+        else:
+            response = client.get("/api/news")
+        results[index] = (response.status_code, response.get_json())
+
+    threads = [threading.Thread(target=request, args=(index,)) for index in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(agent_runs) == 1
+    assert all(status == 200 for status, _ in results), results
+    assert all(body == results[0][1] for _, body in results)
+    assert len(results[0][1]) == 5
+
+
+def test_requests_after_a_run_are_served_from_the_snapshot(news_cache, agent_runs, client):
+    first = client.get("/api/news").get_json()
+    for _ in range(5):
+        assert client.get("/api/news").get_json() == first
+    assert len(agent_runs) == 1
@@ -0,0 +1,65 @@
+"""ETag, Last-Modified and compression on /api/news"""
+
+import gzip
+import zlib
+
+import pytest
+
+
+def wire_bytes(response):
+    """Approximate bytes on the wire: status line, headers and body"""
+    head = f"HTTP/1.1 {response.status}\r\n" + "".join(
+        f"{name}: {value}\r\n" for name, value in response.headers.items()
+    ) + "\r\n"
+    return len(head.encode("latin-1")) + len(response.get_data())
+
+
+@pytest.fixture
+def first(news_cache, client):
+    response = client.get("/api/news")
+    assert response.status_code == 200
+    return response
+
+
+def test_validators_are_sent(first):
+    assert first.headers["ETag"].startswith('W/"')
+    assert first.headers["Last-Modified"]
+    assert "Accept-Encoding" in first.headers["Vary"]
+
+
+@pytest.mark.parametrize("header", ["If-None-Match", "If-Modified-Since"])
+def test_unchanged_snapshot_is_answered_with_304(first, client, header):
+    validator = first.headers["ETag" if header == "If-None-Match" else "Last-Modified"]
+    response = client.get("/api/news", headers={header: validator})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert response.headers["ETag"] == first.headers["ETag"]
+    # A polling client pays a small fraction of the full response
+    assert wire_bytes(response) < wire_bytes(first) / 2
+
+
+def test_stale_etag_gets_the_full_snapshot(first, client):
+    response = client.get("/api/news", headers={"If-None-Match": 'W/"outdated"'})
+    assert response.status_code == 200
+    assert response.get_data() == first.get_data()
+
+
+@pytest.mark.parametrize("encoding, decompress", [
+    ("gzip", gzip.decompress),
+    ("deflate", zlib.decompress),
+])
+def test_payload_is_compressed(first, client, monkeypatch, encoding, decompress):
+    import app as ticker
+
+    # The five mock headlines are below the default threshold
+    monkeypatch.setattr(ticker, "NEWS_COMPRESS_MIN_BYTES", 0)
+    response = client.get("/api/news", headers={"Accept-Encoding": encoding})
+    assert response.headers["Content-Encoding"] == encoding
+    assert decompress(response.get_data()) == first.get_data()
+    assert len(response.get_data()) < len(first.get_data())
+
+
+def test_refresh_with_the_same_headlines_keeps_the_etag(first, news_cache, client):
+    news_cache.refresh()
+    response = client.get("/api/news", headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
@@ -0,0 +1,58 @@
+"""Run deadline: slow agents are cancelled and the headlines found so far are served"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+import app as ticker
+from greeting_agent import agent as news_agent
+from news_parser import parse_news_text
+
+DEADLINE = 0.5
+
+
+@pytest.fixture
+def deadline(monkeypatch, news_cache, fake_agents):
+    # The first run in a process spends a while setting up the runner
+    ticker.run_agent_sync(ticker.build_news_prompt())
+    monkeypatch.setattr(ticker, "NEWS_RUN_DEADLINE", DEADLINE)
+    return fake_agents
+
+
+async def leftover_tasks():
+    return len([task for task in asyncio.all_tasks() if not task.done()]) - 1
+
+
+def test_slow_formatter_is_cut_off_with_the_search_findings(deadline):
+    deadline(news_agent.pipeline_formatter, latency=5)
+    partial = ticker.news_parse_stats["partial"]
+    started = time.monotonic()
+    items = ticker.news_cache.refresh()
+    assert time.monotonic() - started < DEADLINE + 1
+    assert items and all(item.get("partial") for item in items)
+    assert ticker.news_parse_stats["partial"] == partial + 1
+    # Nothing of the cancelled run is left running or open in the profiler
+    assert ticker.agent_worker.run(leftover_tasks()) == 0
+    assert not ticker.agent_profiler._open
+
+
+def test_every_searcher_slow_keeps_the_current_ticker(deadline):
+    current = ticker.news_cache.refresh()
+    for searcher in news_agent.group_searchers:
+        deadline(searcher, latency=5)
+    started = time.monotonic()
+    items = ticker.news_cache.refresh()
+    assert time.monotonic() - started < DEADLINE + 1
+    assert [item["headline"] for item in items] == [item["headline"] for item in current]
+
+
+def test_complete_refresh_clears_the_partial_mark(deadline):
+    deadline(news_agent.pipeline_formatter, latency=5)
+    assert all(item.get("partial") for item in ticker.news_cache.refresh())
+    deadline(news_agent.pipeline_formatter, scripts={news_agent.pipeline_formatter.name: [
+        lambda: json.dumps({"articles": parse_news_text(ticker.mock_news_response())})
+    ]})
+    items = ticker.news_cache.refresh()
+    assert items and not any(item.get("partial") for item in items)
@@ -0,0 +1,38 @@
+"""Near-duplicate headlines collapsed within and across refreshes"""
+
+import app as ticker
+from dedup import SimHashIndex
+
+
+def test_reworded_story_matches_the_original():
+    index = SimHashIndex(max_distance=6)
+    original = {"headline": "[Industry] OpenAI launches GPT-5 for developers worldwide today"}
+    assert index.check_and_add(original["headline"], original) is None
+    assert index.check_and_add("[Research] OpenAI Launched GPT-5 for Developers Worldwide Today!") is original
+    assert index.check_and_add("Google DeepMind opens a robotics lab in London") is None
+
+
+def test_least_recently_seen_story_is_evicted():
+    index = SimHashIndex(capacity=2)
+    first, second, third = ("Nvidia reports record data center revenue",
+                            "EU agrees final text of the AI Act",
+                            "Anthropic publishes interpretability research")
+    index.check_and_add(first)
+    index.check_and_add(second)
+    # Seeing the first story again keeps it, so the second one goes
+    assert index.check_and_add(first) == first
+    index.check_and_add(third)
+    assert len(index) == 2
+    assert index.check_and_add(first) == first
+    assert index.check_and_add(second) is None
+
+
+def test_repeated_refresh_streams_and_archives_nothing_new(news_cache):
+    first, second = [], []
+    ticker.fetch_news(on_item=first.append)
+    archived = ticker.headline_store.count()
+    items = ticker.fetch_news(on_item=second.append)
+    assert first and archived == len(first)
+    assert second == [] and ticker.headline_store.count() == archived
+    # The ticker keeps the stories it already had
+    assert {item["headline"] for item in items} >= {item["headline"] for item in first[:ticker.NEWS_TICKER_SIZE]}
@@ -0,0 +1,39 @@
+"""Cursor-based deltas on /api/news?since="""
+
+import app as ticker
+
+
+def add_stories(count):
+    return ticker.headline_store.add_items([
+        {"date": "2025-07-01 10:00", "source": "Wire", "headline": f"Delta story {index}"} for index in range(count)
+    ])
+
+
+def test_client_pages_through_only_what_it_has_not_seen(news_cache, client):
+    client.get("/api/news")
+    cursor = ticker.headline_store.last_id
+    ids = add_stories(5)
+
+    seen = []
+    while True:
+        body = client.get(f"/api/news?since={cursor}&limit=2").get_json()
+        seen += [item["id"] for item in body["items"]]
+        cursor = body["cursor"]
+        if not body["has_more"]:
+            break
+    assert seen == ids and cursor == ids[-1]
+
+    # Caught up: nothing new, same cursor
+    body = client.get(f"/api/news?since={cursor}").get_json()
+    assert body == {"items": [], "cursor": cursor, "has_more": False}
+
+
+def test_limit_is_capped(news_cache, client, monkeypatch):
+    monkeypatch.setattr(ticker, "NEWS_DELTA_LIMIT", 3)
+    add_stories(5)
+    assert len(client.get("/api/news?since=0&limit=50").get_json()["items"]) == 3
+
+
+def test_bad_cursor_is_rejected(news_cache, client):
+    response = client.get("/api/news?since=latest")
+    assert response.status_code == 400
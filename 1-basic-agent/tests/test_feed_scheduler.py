@@ -0,0 +1,86 @@
+"""Adaptive feed polling: intervals from publish rates, the archive and errors"""
+
+from datetime import datetime
+
+import pytest
+
+from feed_scheduler import FeedScheduler
+from headline_store import HeadlineStore
+
+HOUR = 3600
+NOW = datetime(2025, 7, 1, 12, 0).timestamp()
+
+
+class StubPoller:
+    """Feeds answering with scripted publish times, or failing"""
+
+    max_workers = 4
+
+    def __init__(self, published):
+        self.urls = list(published)
+        self.responses = dict(published)
+        self.failing = set()
+        self.feeds = {url: {"last": None} for url in self.urls}
+
+    def published(self, url):
+        return list(self.responses[url])
+
+    def poll(self, urls):
+        entries = []
+        for url in urls:
+            failed = url in self.failing
+            self.feeds[url]["last"] = {"result": "error" if failed else "modified"}
+            if not failed:
+                entries += [{"feed": url, "source": url, "published": datetime.fromtimestamp(stamp)}
+                            for stamp in self.responses[url]]
+        return entries
+
+
+def scheduler(poller, **options):
+    return FeedScheduler(poller, min_interval=60, max_interval=HOUR, jitter=0, clock=lambda: NOW, **options)
+
+
+def test_busy_feeds_are_polled_more_often():
+    poller = StubPoller({
+        "busy": [NOW - minutes * 60 for minutes in range(0, 120, 10)],
+        "quiet": [NOW - 12 * HOUR],
+        "empty": [],
+    })
+    feeds = scheduler(poller)
+    feeds.poll_due()
+    intervals = {feed["url"]: feed["interval"] for feed in feeds.stats()["feeds"]}
+    assert intervals["busy"] == pytest.approx(600, rel=0.1)
+    assert intervals["busy"] < intervals["quiet"] == HOUR
+    assert intervals["empty"] == HOUR
+
+
+def test_failing_feed_backs_off():
+    poller = StubPoller({"down": []})
+    poller.failing.add("down")
+    feeds = scheduler(poller)
+    feeds.poll_due()
+    first = feeds.feeds["down"]["interval"]
+    feeds.feeds["down"]["next_poll"] = 0
+    feeds.poll_due()
+    assert first == 120 and feeds.feeds["down"]["interval"] == 240
+
+
+def test_archive_fills_in_entries_the_feed_no_longer_lists(tmp_path):
+    # The feed lists its last 3 entries, one every 10 minutes; the archive
+    # has the earlier ones at the same pace, plus the listed ones again
+    listed = [NOW - minutes * 60 for minutes in (0, 10, 20)]
+    archived = [NOW - minutes * 60 for minutes in range(20, 240, 10)]
+    store = HeadlineStore(str(tmp_path / "archive.db"))
+    store.add_items([
+        {"date": datetime.fromtimestamp(stamp).strftime("%Y-%m-%d %H:%M"), "source": "wire", "headline": f"story {n}"}
+        for n, stamp in enumerate(archived)
+    ] + [{"date": "2025-07-01 11:00", "source": "other", "headline": "elsewhere"}])
+    assert sorted(store.published_times("wire", NOW - HOUR)) == [NOW - minutes * 60 for minutes in (60, 50, 40, 30, 20)]
+
+    alone = scheduler(StubPoller({"wire": listed}))
+    blended = scheduler(StubPoller({"wire": listed}), history=store.published_times)
+    alone.poll_due()
+    blended.poll_due()
+    # 3 entries in 20 minutes look like one per 6:40; with the archive it is one per 10 minutes
+    assert alone.feeds["wire"]["interval"] == pytest.approx(400, rel=0.05)
+    assert blended.feeds["wire"]["interval"] == pytest.approx(600, rel=0.05)
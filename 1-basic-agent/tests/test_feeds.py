@@ -0,0 +1,156 @@
+"""RSS/Atom ingestion from local feed fixtures served from disk"""
+
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app as ticker
+from feed_fixtures import feed_fixture, serve_feed_fixtures
+from feeds import FeedPoller, clean_summary, parse_feed
+from news_parser import parse_news_text
+
+SOURCES = [("techcrunch.xml", "TechCrunch"), ("theverge.atom", "The Verge"),
+           ("openai.xml", "OpenAI News"), ("google.atom", "Google AI Blog")]
+
+LATENCY = 0.2
+
+rng = random.Random()
+
+
+def story(source):
+    """A headline unlike any other, so the story index never drops it"""
+    return f"{source} " + " ".join("".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=7)) for _ in range(4))
+
+
+@pytest.fixture
+def feed_dir(tmp_path):
+    """Writes fixtures; every rewrite gets a newer mtime, since Last-Modified has 1s resolution"""
+    stamps = iter(range(0, 10 ** 6, 2))
+
+    def write(name, source, entries):
+        path = tmp_path / name
+        path.write_text(feed_fixture("atom" if name.endswith(".atom") else "rss", source, entries))
+        stamp = time.time() + next(stamps)
+        os.utime(path, (stamp, stamp))
+        return path
+
+    write.path = tmp_path
+    return write
+
+
+@pytest.fixture
+def feed_server(feed_dir):
+    server = serve_feed_fixtures(str(feed_dir.path), LATENCY)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def recent(source, count):
+    """Newest first, plus two entries from last week that are too old to pass on"""
+    now = datetime.now(timezone.utc)
+    return [(story(source), now - timedelta(minutes=7 * index)) for index in range(count)] + [
+        (story(source), now - timedelta(days=7, minutes=index)) for index in range(2)
+    ]
+
+
+def test_poll_passes_on_only_new_entries(feed_dir, feed_server):
+    written = {source: recent(source, 5) for _, source in SOURCES}
+    for name, source in SOURCES:
+        feed_dir(name, source, written[source])
+    base = f"http://127.0.0.1:{feed_server.server_address[1]}"
+    poller = FeedPoller([f"{base}/{name}" for name, _ in SOURCES])
+
+    first = poller.poll()
+    assert len(first) == 5 * len(SOURCES)
+    assert {entry["source"] for entry in first} == {source for _, source in SOURCES}
+    assert [entry["published"] for entry in first] == sorted((entry["published"] for entry in first), reverse=True)
+    # Feeds are fetched concurrently: the slow server had them all in hand at once
+    assert feed_server.peak_requests == len(SOURCES)
+
+    # ETag (.atom) and Last-Modified (.xml) both get a 304 when unchanged
+    assert poller.poll() == []
+    assert all(feed["result"] == "not_modified" for feed in poller.stats()["feeds"].values())
+
+    name, source = SOURCES[0]
+    breaking = story(source)
+    feed_dir(name, source, [(breaking, datetime.now(timezone.utc))] + written[source])
+    updated = poller.poll()
+    assert [entry["title"] for entry in updated] == [breaking]
+
+
+def test_file_urls_are_read_from_disk(feed_dir):
+    path = feed_dir("local.atom", "Local", recent("Local", 3))
+    entries = FeedPoller([path.as_uri()]).poll()
+    assert len(entries) == 3 and entries[0]["source"] == "Local"
+    assert entries[0]["summary"].startswith("What happened in")
+
+
+def test_reading_stops_after_max_entries(feed_dir):
+    path = feed_dir("big.xml", "Big", recent("Big", 500))
+    with open(path, "rb") as stream:
+        assert len(list(parse_feed(stream, max_entries=10))) == 10
+    assert len(FeedPoller([path.as_uri()], max_entries=4).poll()) == 4
+
+
+@pytest.mark.parametrize("value", [
+    "Big &lt;img src=x onerror=alert(1)&gt; news",
+    "Big &amp;lt;img src=x onerror=alert(1)&amp;gt; news",
+    "Big <b>&lt;script&gt;alert(1)&lt;/script&gt;</b> news",
+])
+def test_clean_summary_never_returns_markup(value):
+    assert "<" not in clean_summary(value) and ">" not in clean_summary(value)
+
+
+@pytest.fixture
+def feed_refresh(feed_dir, monkeypatch):
+    """
+    Feed ingestion through fetch_news with a formatter that echoes the
+    entries of its prompt; formatter.fail makes the next run answer nothing.
+    """
+    path = feed_dir("wire.atom", "Wire", recent("Wire", 7))
+    monkeypatch.setattr(ticker, "feed_poller", FeedPoller([path.as_uri()]))
+    monkeypatch.setattr(ticker, "feed_scheduler", None)
+    monkeypatch.setattr(ticker, "NEWS_FEED_MAX_ENTRIES", 3)
+    monkeypatch.setattr(ticker, "feed_backlog", [])
+
+    def formatter(user_message, on_text=None, on_articles=None, **options):
+        formatter.prompts.append(parse_news_text(user_message))
+        if formatter.fail:
+            formatter.fail = False
+            return ""
+        text = "\n\n".join(
+            f"Date: {item['date']}\nSource: {item['source']}\nHeadline: {item['headline']}"
+            for item in formatter.prompts[-1]
+        )
+        if on_text:
+            on_text(text + "\n")
+        return text
+
+    formatter.prompts = []
+    formatter.fail = False
+    monkeypatch.setattr(ticker, "run_agent_sync", formatter)
+    return formatter
+
+
+def test_entries_beyond_the_prompt_go_to_the_next_refresh(feed_refresh):
+    ticker.fetch_news()
+    ticker.fetch_news()
+    ticker.fetch_news()
+    headlines = [[item["headline"] for item in prompt] for prompt in feed_refresh.prompts]
+    assert [len(batch) for batch in headlines] == [3, 3, 1]
+    assert len(set(sum(headlines, []))) == 7
+    # Nothing left: no model call
+    ticker.fetch_news()
+    assert len(feed_refresh.prompts) == 3
+
+
+def test_entries_of_a_failed_run_are_formatted_again(feed_refresh):
+    feed_refresh.fail = True
+    ticker.fetch_news()
+    ticker.fetch_news()
+    first, retried = feed_refresh.prompts
+    assert retried == first
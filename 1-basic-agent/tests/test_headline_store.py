@@ -0,0 +1,42 @@
+"""Headline archive ids and full-text index under concurrent writers"""
+
+import multiprocessing
+import sqlite3
+
+from headline_store import HeadlineStore
+
+
+def archive_batches(path, worker, batches):
+    store = HeadlineStore(path)
+    ids = []
+    for batch in range(batches):
+        items = [
+            {"date": "2025-07-01 10:00", "source": f"Source {worker}", "headline": f"worker{worker} batch{batch} item{index}"}
+            for index in range(3)
+        ]
+        ids += zip(store.add_items(items), (item["headline"] for item in items))
+    return ids
+
+
+def test_returned_ids_match_rows(tmp_path):
+    store = HeadlineStore(str(tmp_path / "archive.db"))
+    ids = store.add_items([{"date": "2025-07-01 10:00", "source": "S", "headline": f"story {n}"} for n in range(5)])
+    assert ids == [1, 2, 3, 4, 5] and store.last_id == 5
+    assert [item["headline"] for item in store.search("story")][::-1] == [f"story {n}" for n in range(5)]
+
+
+def test_concurrent_processes_get_their_own_ids(tmp_path):
+    path = str(tmp_path / "archive.db")
+    HeadlineStore(path)
+    workers, batches = 4, 100
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        results = pool.starmap(archive_batches, [(path, worker, batches) for worker in range(workers)])
+
+    conn = sqlite3.connect(path)
+    rows = dict(conn.execute("SELECT id, headline FROM headlines"))
+    assigned = [pair for result in results for pair in result]
+    assert len(rows) == len(assigned) == workers * batches * 3
+    assert all(rows[item_id] == headline for item_id, headline in assigned)
+    # Every row indexed exactly once
+    assert conn.execute("SELECT COUNT(*) FROM headlines_fts_docsize").fetchone()[0] == len(rows)
+    conn.execute("INSERT INTO headlines_fts (headlines_fts) VALUES ('integrity-check')")
@@ -0,0 +1,66 @@
+"""Prometheus text format of the metrics registry and the /metrics endpoint"""
+
+import pytest
+
+import app as ticker
+from metrics import CONTENT_TYPE, Registry
+
+
+def samples(text):
+    """Sample name with labels -> value, for every non-comment line"""
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines() if line and not line.startswith("#")
+    }
+
+
+def test_counter_gauge_and_histogram_render():
+    registry = Registry(prefix="test_")
+    requests = registry.counter("requests_total", "Requests", ["path"])
+    requests.inc(path='/a"b')
+    requests.inc(2, path='/a"b')
+    registry.gauge("in_flight", "Running").set(3)
+    latency = registry.histogram("seconds", "Latency", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        latency.observe(value)
+
+    text = registry.render()
+    assert "# TYPE test_requests_total counter" in text and "# TYPE test_seconds histogram" in text
+    assert samples(text) == {
+        'test_requests_total{path="/a\\"b"}': 3,
+        "test_in_flight": 3,
+        'test_seconds_bucket{le="0.1"}': 1,
+        'test_seconds_bucket{le="1"}': 2,
+        'test_seconds_bucket{le="+Inf"}': 3,
+        "test_seconds_sum": 5.55,
+        "test_seconds_count": 3,
+    }
+
+
+def test_counters_only_go_up_and_labels_must_match():
+    counter = Registry().counter("errors_total", "Errors", ["kind"])
+    with pytest.raises(ValueError):
+        counter.inc(-1, kind="x")
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+def test_failing_scrape_function_does_not_hide_the_rest():
+    registry = Registry()
+    registry.gauge("broken", "Fails").set_function(lambda: 1 / 0)
+    registry.gauge("working", "Works").set_function(lambda: 7)
+    assert samples(registry.render()) == {"working": 7}
+
+
+def test_endpoint_counts_requests_and_agent_runs(news_cache, client):
+    before = samples(client.get("/metrics").get_data(as_text=True))
+    assert client.get("/api/news").status_code == 200
+    response = client.get("/metrics")
+    after = samples(response.get_data(as_text=True))
+
+    assert response.content_type == CONTENT_TYPE
+    request = 'news_ticker_http_requests_total{endpoint="/api/news",method="GET",status="200"}'
+    run = 'news_ticker_agent_runs_total{outcome="mock"}'
+    assert after[request] == before.get(request, 0) + 1
+    assert after[run] == before.get(run, 0) + 1
+    assert after['news_ticker_snapshot_lookups_total{result="miss"}'] >= 1
@@ -0,0 +1,55 @@
+"""Snapshot cache: single-flight refreshes and backoff after failures"""
+
+import threading
+import time
+
+from news_cache import NewsCache
+
+
+def failing_fetch():
+    calls = []
+
+    def fetch(on_item=None):
+        calls.append(time.monotonic())
+        time.sleep(0.05)
+        return []
+
+    fetch.calls = calls
+    return fetch
+
+
+def test_failed_first_fetch_is_not_repeated_per_request():
+    fetch = failing_fetch()
+    cache = NewsCache(fetch, retry_interval=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for _ in range(20):
+        results.append(cache.get())
+
+    assert len(fetch.calls) == 1
+    assert all(result == [] for result in results)
+
+
+def test_failed_first_fetch_is_retried_in_the_background():
+    fetch = failing_fetch()
+    cache = NewsCache(fetch, retry_interval=0.2)
+    assert cache.get() == []
+
+    # The retry waits for retry_interval and doesn't hold up the caller
+    time.sleep(0.25)
+    started = time.perf_counter()
+    assert cache.get() == []
+    assert time.perf_counter() - started < 0.05
+    time.sleep(0.1)
+    assert len(fetch.calls) == 2
+
+    fetch_items = [{"date": "2025-07-01 10:00", "source": "S", "headline": "Back"}]
+    cache._fetch = lambda on_item=None: fetch_items
+    time.sleep(0.2)
+    cache.get()
+    time.sleep(0.1)
+    assert cache.get() == fetch_items
@@ -0,0 +1,41 @@
+"""Streaming parser for the agent's labelled article text"""
+
+import pytest
+
+from news_parser import NewsStreamParser, parse_news_text
+
+ARTICLES = """Date: 2025-07-01 14:30
+Source: TechCrunch
+Headline: [Industry] First story
+
+Date: 2025-07-01 13:15
+Source: The Verge
+Headline: [Research] Second story
+"""
+
+
+def test_chunked_text_parses_like_the_whole_text():
+    expected = parse_news_text(ARTICLES)
+    assert len(expected) == 2
+    for size in (1, 7, 64):
+        parser = NewsStreamParser()
+        items = []
+        for position in range(0, len(ARTICLES), size):
+            items += parser.feed(ARTICLES[position:position + size])
+        assert items + parser.close() == expected
+
+
+@pytest.mark.parametrize("text", [
+    # Source missing: the next article's source must not complete it
+    "Date: A\nHeadline: One\n\nSource: S2\nHeadline: Two\nDate: B\n",
+    # Headline missing, articles separated by a rule
+    "Date: A\nSource: S1\n---\nHeadline: Two\nSource: S2\nDate: B\n",
+    "**Date:** A\n**Source:** S1\n\n**Headline:** Two\n**Source:** S2\n**Date:** B\n",
+])
+def test_incomplete_article_does_not_borrow_fields(text):
+    assert parse_news_text(text) == [{"date": "B", "source": "S2", "headline": "Two"}]
+
+
+def test_articles_without_separators_still_split_on_repeated_fields():
+    text = "Date: A\nSource: S1\nDate: B\nSource: S2\nHeadline: Two"
+    assert parse_news_text(text) == [{"date": "B", "source": "S2", "headline": "Two"}]
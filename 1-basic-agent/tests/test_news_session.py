@@ -0,0 +1,60 @@
+"""Ticker session rotation and the prompt size it keeps bounded"""
+
+import asyncio
+
+import pytest
+from google.adk.sessions import InMemorySessionService
+
+import app as ticker
+from news_session import NewsSessionManager
+
+
+def acquire_all(sessions, count, retire_after=None):
+    async def main():
+        acquired = []
+        for index in range(count):
+            acquired.append(await sessions.acquire())
+            if index == retire_after:
+                sessions.retire(acquired[-1][0])
+        return acquired
+
+    return asyncio.run(main())
+
+
+def manager(**options):
+    return NewsSessionManager(InMemorySessionService(), app_name="test", user_id="user", **options)
+
+
+def test_refresh_policy_starts_every_run_in_a_new_session():
+    sessions = manager()
+    acquired = acquire_all(sessions, 3)
+    assert len({session_id for session_id, _ in acquired}) == 3
+    assert all(history == 0 for _, history in acquired)
+
+
+def test_window_policy_rotates_after_max_turns():
+    acquired = acquire_all(manager(policy="window", max_turns=2), 5)
+    ids = [session_id for session_id, _ in acquired]
+    assert ids[0] == ids[1] != ids[2] == ids[3] != ids[4]
+
+
+def test_retired_session_is_not_reused():
+    acquired = acquire_all(manager(policy="window", max_turns=3), 2, retire_after=0)
+    assert acquired[0][0] != acquired[1][0]
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        manager(policy="forever")
+
+
+@pytest.mark.parametrize("policy, grows", [("refresh", False), ("window", True)])
+def test_prompt_grows_only_when_the_session_is_reused(fake_agents, monkeypatch, policy, grows):
+    sessions = NewsSessionManager(ticker.runner.session_service, app_name="test",
+                                  user_id=ticker.GLOBAL_USER_ID, policy=policy, max_turns=3)
+    monkeypatch.setattr(ticker, "news_sessions", sessions)
+    for _ in range(2):
+        ticker.run_agent_sync(ticker.build_news_prompt())
+    first, second = sessions.runs
+    assert (second["history_events"] > 0) == grows
+    assert (second["prompt_tokens"] > first["prompt_tokens"]) == grows
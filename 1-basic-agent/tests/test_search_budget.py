@@ -0,0 +1,37 @@
+"""Per-refresh search budget: early stop at the target and the deadline reserve"""
+
+import time
+
+import app as ticker
+from greeting_agent import agent as news_agent
+from greeting_agent.search_budget import SearchBudget
+
+
+def budget(**options):
+    return SearchBudget(max_searches=8, max_tokens=200000, max_seconds=90, target_articles=5, **options)
+
+
+def test_searching_stops_once_the_target_is_found():
+    spent = budget()
+    spent.add_articles("Headline: One\nHeadline: one!\nHeadline: Two\nHeadline: Three\nHeadline: Four")
+    assert spent.stop_reason() is None
+    spent.add_articles("Title: Five")
+    assert spent.stop_reason() == "found 5 articles"
+
+
+def test_reserve_is_capped_at_a_quarter_of_a_short_run():
+    short = budget(deadline=time.monotonic() + 0.4, deadline_reserve=20)
+    assert short.deadline_reserve <= 0.1
+    assert short.stop_reason() is None
+    time.sleep(0.35)
+    assert short.stop_reason().startswith("run deadline")
+    # A long run keeps the whole reserve
+    assert budget(deadline=time.monotonic() + 600, deadline_reserve=20).deadline_reserve == 20
+
+
+def test_deadline_shorter_than_the_reserve_still_searches(fake_agents, monkeypatch):
+    monkeypatch.setattr(ticker, "NEWS_RUN_DEADLINE", 8)
+    monkeypatch.setattr(news_agent.search_budget, "deadline_reserve", 20)
+    ticker.run_agent_sync(ticker.build_news_prompt())
+    assert ticker.last_search_budget["searches"] == len(news_agent.group_searchers)
+    assert ticker.last_search_budget["skipped"] == 0
@@ -0,0 +1,50 @@
+"""Search cache on the news pipeline, at the default article target, and its file"""
+
+import asyncio
+import os
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+import app as ticker
+from greeting_agent import agent as news_agent
+from greeting_agent.search_cache import SearchCache, default_path
+
+
+def refresh():
+    async def main():
+        service = InMemorySessionService()
+        runner = Runner(agent=news_agent.news_pipeline, app_name="test", session_service=service)
+        session = await service.create_session(app_name="test", user_id="user")
+        message = types.Content(role="user", parts=[types.Part(text=ticker.build_news_prompt())])
+        async for _ in runner.run_async(user_id="user", session_id=session.id, new_message=message):
+            pass
+
+    asyncio.run(main())
+
+
+def test_cached_answers_do_not_stop_the_other_groups(tmp_path, monkeypatch, fake_agents):
+    monkeypatch.setattr(news_agent, "search_cache", SearchCache(str(tmp_path / "search_cache.db"), ttl=3600))
+    groups = len(news_agent.group_searchers)
+
+    refresh()
+    assert news_agent.search_cache.stats()["misses"] == groups
+
+    # Every group is answered from the cache on the next refreshes
+    refresh()
+    refresh()
+    stats = news_agent.search_cache.stats()
+    assert stats["hits"] == groups * 2 and stats["misses"] == groups, stats
+
+
+def test_turned_off_cache_creates_no_file(tmp_path):
+    path = tmp_path / "cache" / "search_cache.db"
+    cache = SearchCache(str(path), ttl=0)
+    assert cache.get("agent", "query") is None
+    assert not os.path.exists(tmp_path / "cache")
+
+
+def test_examples_default_to_their_own_files():
+    assert default_path("1-basic-agent") != default_path("2-tool-agent")
+    assert default_path("7-multi-agent").endswith(os.path.join("7-multi-agent", "search_cache.db"))
@@ -0,0 +1,47 @@
+"""Headline snapshot and refresh lease shared between worker processes"""
+
+import sqlite3
+import threading
+import time
+
+from news_cache import NewsCache
+from shared_cache import SharedSnapshotStore
+
+
+def lease_expiry(path):
+    return sqlite3.connect(path).execute("SELECT expires_at FROM leases WHERE name = 'refresh'").fetchone()[0]
+
+
+def test_only_the_holder_renews_the_lease(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first, second = SharedSnapshotStore(path, lease_ttl=60), SharedSnapshotStore(path, lease_ttl=600)
+    assert first.acquire("refresh")
+    assert not second.acquire("refresh")
+    expires_at = lease_expiry(path)
+    assert not second.renew("refresh")
+    assert lease_expiry(path) == expires_at
+    assert first.renew("refresh")
+    assert lease_expiry(path) >= expires_at
+
+
+def test_refresh_longer_than_the_lease_ttl_runs_once(tmp_path):
+    path = str(tmp_path / "shared.db")
+    runs = []
+    started = threading.Event()
+
+    def fetch(on_item=None):
+        runs.append(1)
+        started.set()
+        # Several times the lease TTL
+        time.sleep(1.0)
+        return [{"date": "2025-07-01 10:00", "source": "S", "headline": "One run"}]
+
+    workers = [NewsCache(fetch, store=SharedSnapshotStore(path, lease_ttl=0.2)) for _ in range(2)]
+    first = threading.Thread(target=workers[0].refresh)
+    first.start()
+    started.wait()
+    assert workers[1].refresh()[0]["headline"] == "One run"
+    first.join()
+    assert len(runs) == 1
+    # Released once the refresh is done
+    assert not workers[0]._store.is_held("refresh")
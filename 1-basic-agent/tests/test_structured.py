@@ -0,0 +1,57 @@
+"""Formatter articles read from its structured JSON output as it streams"""
+
+import json
+
+import pytest
+
+import app as ticker
+from greeting_agent import agent as news_agent
+from news_parser import ArticleObjectStream, parse_structured_articles
+
+ARTICLES = {"articles": [
+    {"date": "2025-07-01 14:30", "source": "TechCrunch", "headline": '[Industry] A "quoted" {braced} story'},
+    {"date": "2025-07-01 13:15", "source": "The Verge", "headline": "[Research] Escaped \\\\ ] story"},
+    {"date": "2025-07-01 12:00", "source": "Wired", "headline": ""},
+    {"date": "2025-07-01 11:45", "source": "Reuters", "headline": "[Policy] Last story"},
+]}
+
+
+@pytest.mark.parametrize("size", [1, 3, 40, 10000])
+def test_streamed_json_yields_the_same_articles(size):
+    text = "```json\n" + json.dumps(ARTICLES, indent=2) + "\n```"
+    stream = ArticleObjectStream()
+    batches = [stream.feed(text[start:start + size]) for start in range(0, len(text), size)]
+    assert [item for batch in batches for item in batch] == parse_structured_articles(ARTICLES)
+    # Articles missing a field are skipped but still counted
+    assert stream.objects == 4
+
+
+def test_each_article_is_finished_as_soon_as_its_object_closes():
+    text = json.dumps(ARTICLES)
+    first_end = text.index("}, {") + 1
+    stream = ArticleObjectStream()
+    assert stream.feed(text[:first_end - 1]) == []
+    assert [item["source"] for item in stream.feed(text[first_end - 1:first_end])] == ["TechCrunch"]
+
+
+def test_articles_are_passed_on_one_at_a_time(fake_agents):
+    fake_agents(news_agent.pipeline_formatter, scripts={
+        news_agent.pipeline_formatter.name: [lambda: json.dumps(ARTICLES)],
+    }, chunk_size=16)
+    batches = []
+    ticker.run_agent_sync(ticker.build_news_prompt(), on_articles=batches.append)
+    assert [[item["source"] for item in batch["articles"]] for batch in batches] == [
+        ["TechCrunch"], ["The Verge"], ["Reuters"],
+    ]
+
+
+def test_refresh_publishes_each_item_once_before_the_snapshot(fake_agents, news_cache):
+    events = news_cache.subscribe()
+    news_cache.refresh()
+    received = []
+    while not events.empty():
+        received.append(events.get_nowait())
+    kinds = [event for event, _ in received]
+    assert kinds == ["refresh"] + ["item"] * 5 + ["snapshot"]
+    streamed = [data["headline"] for event, data in received if event == "item"]
+    assert streamed == [item["headline"] for item in received[-1][1]]
@@ -0,0 +1,109 @@
+"""Per-topic tickers cut from one shared fetch and one classifier batch"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import app as ticker
+from greeting_agent import agent as news_agent
+from topics import TopicViews
+
+TOPICS = ["AI", "Climate"]
+
+
+def story(topic, index):
+    return {"date": f"2025-07-01 1{index}:00", "source": f"{topic} Desk",
+            "headline": f"[Research] {topic} story number {index} - " + "abcdefghij"[index] * 6}
+
+
+@pytest.fixture
+def topics(monkeypatch, news_cache, fake_agents):
+    monkeypatch.setattr(ticker, "NEWS_TOPICS", TOPICS)
+    monkeypatch.setattr(ticker, "topic_views", TopicViews(TOPICS, ticker.NEWS_TICKER_SIZE))
+    articles = [story(topic, index) for topic in TOPICS for index in range(5)]
+    fake_agents(news_agent.pipeline_formatter, scripts={
+        news_agent.pipeline_formatter.name: [lambda: json.dumps({"articles": articles})],
+    })
+    return articles
+
+
+def test_each_topic_gets_its_ticker_from_one_fetch(topics, client):
+    profiled = len(ticker.agent_profiler.runs())
+    tickers = {topic: client.get(f"/api/news?topic={topic}").get_json() for topic in TOPICS}
+    for topic, items in tickers.items():
+        assert len(items) == 5
+        assert all(item["headline"].startswith(f"[Research] {topic} ") for item in items)
+    # One search and format run plus one classifier run, however many topics
+    assert [run["agents"].keys() & {"news_pipeline", "news_topic_classifier"}
+            for run in ticker.agent_profiler.runs()[profiled:]] == [{"news_pipeline"}, {"news_topic_classifier"}]
+    assert client.get("/api/news?topic=Sports").status_code == 404
+
+
+def test_classifier_gets_what_is_left_of_the_run_deadline(topics, monkeypatch):
+    timeouts = []
+
+    async def classifier(prompt, timeout=None):
+        timeouts.append(timeout)
+        return None
+
+    monkeypatch.setattr(ticker, "run_classifier_async", classifier)
+    items = [story("AI", 1), story("Climate", 2)]
+    expires_at = time.monotonic() + 30
+    ticker.classify_topics(items, expires_at)
+    assert 0 < timeouts[0] <= 30
+
+    # Nothing left: no classifier run, topics come from the headlines
+    skipped = ticker.topic_stats["skipped"]
+    labelled = ticker.classify_topics(items, time.monotonic() - 1)
+    assert len(timeouts) == 1
+    assert ticker.topic_stats["skipped"] == skipped + 1
+    assert [item["topics"] for item in labelled] == [["AI"], ["Climate"]]
+
+
+def test_refresh_cut_off_by_the_deadline_skips_the_classifier(topics, monkeypatch, fake_agents):
+    # The first run in a process spends a while setting up the runner
+    ticker.run_agent_sync(ticker.build_news_prompt())
+    monkeypatch.setattr(ticker, "NEWS_RUN_DEADLINE", 0.5)
+    # The formatter never answers within the deadline; the searchers' findings are served
+    fake_agents(news_agent.pipeline_formatter, latency=5)
+    profiled = len(ticker.agent_profiler.runs())
+    skipped = ticker.topic_stats["skipped"]
+    items = ticker.news_cache.refresh()
+    assert items and all(item.get("partial") for item in items)
+    assert ticker.topic_stats["skipped"] == skipped + 1
+    assert all("news_topic_classifier" not in run["agents"] for run in ticker.agent_profiler.runs()[profiled:])
+
+
+def agent_instructions(topics):
+    """Instructions of the agents built for NEWS_TOPICS, in a fresh interpreter"""
+    script = (
+        "import json\n"
+        "from greeting_agent import agent\n"
+        "print(json.dumps({current.name: current.instruction for current in [*agent.group_searchers,"
+        " agent.search_specialist, agent.pipeline_formatter, agent.feed_formatter]}))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=dict(os.environ, NEWS_TOPICS=topics), capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_agents_search_for_and_keep_every_configured_topic():
+    instructions = agent_instructions("AI,Climate")
+    for name in ("tech_news_searcher", "business_news_searcher", "company_news_searcher",
+                 "general_news_searcher", "news_search_specialist"):
+        assert '- "Climate ' in instructions[name]
+        assert "artificial intelligence" in instructions[name]
+    for name in ("news_pipeline_formatter", "news_feed_formatter"):
+        assert "AI and Climate" in instructions[name]
+    assert "not about AI" not in instructions["news_feed_formatter"]
+
+    # Without AI the AI-specific queries are left out
+    instructions = agent_instructions("Climate,Space")
+    assert "artificial intelligence" not in instructions["general_news_searcher"]
+    assert '- "Space news when:1d"' in instructions["general_news_searcher"]
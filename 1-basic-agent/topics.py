@@ -0,0 +1,145 @@
+"""
+Topic Tickers
+
+Serves one ticker per configured topic from a single shared headline
+snapshot. A refresh fetches the stories of every topic at once and labels
+them with their topics in one classification call; the per-topic tickers are
+then cut from the shared snapshot once per refresh and cached with their
+encoded payloads, so ten topics cost one fetch, one classification and ten
+list filters.
+
+Items carry their topics in a "topics" list. Items without one (e.g. from the
+archive after a restart) are matched by topic name in the headline, falling
+back to the default topic.
+"""
+
+import json
+import re
+import threading
+
+from http_cache import PayloadCache
+
+
+def match_topics(headline, topics):
+    """Topics whose name appears as a phrase in the headline"""
+    return [
+        topic for topic in topics
+        if re.search(rf"(?<!\w){re.escape(topic)}(?!\w)", headline, re.IGNORECASE)
+    ]
+
+
+def item_topics(item, topics):
+    """The topics an item belongs to, the first (default) topic if it names none"""
+    labelled = [topic for topic in item.get("topics") or [] if topic in topics]
+    return labelled or match_topics(item.get("headline", ""), topics) or topics[:1]
+
+
+def parse_topic_assignments(value, count, topics):
+    """
+    Turn the classifier's structured output into one topic list per item.
+
+    Args:
+        value: {"assignments": [{"index": n, "topics": [...]}, ...]} as a dict
+            or JSON string, with 1-based item numbers
+        count: Number of items that were classified
+        topics: Configured topic names; other names are matched case-insensitively
+            or dropped
+
+    Returns:
+        List of count topic lists (empty for items the classifier left out)
+
+    Raises:
+        ValueError: If value is not an assignments object
+    """
+    if isinstance(value, (str, bytes)):
+        value = json.loads(value)
+    assignments = value.get("assignments") if isinstance(value, dict) else None
+    if not isinstance(assignments, list):
+        raise ValueError("expected an object with an 'assignments' list")
+
+    names = {topic.lower(): topic for topic in topics}
+    result = [[] for _ in range(count)]
+    for assignment in assignments:
+        if not isinstance(assignment, dict):
+            continue
+        index = assignment.get("index")
+        if not isinstance(index, int) or not 1 <= index <= count:
+            continue
+        for name in assignment.get("topics") or []:
+            topic = names.get(str(name).strip().lower())
+            if topic is not None and topic not in result[index - 1]:
+                result[index - 1].append(topic)
+    return result
+
+
+def select_per_topic(items, topics, size):
+    """
+    Keep the newest items until every topic has size of them.
+
+    Items must be sorted newest first. An item is kept while any of its
+    topics still has room, so the result holds every topic's ticker.
+    """
+    if len(topics) == 1:
+        return items[:size]
+    counts = dict.fromkeys(topics, 0)
+    selected = []
+    for item in items:
+        belongs = item_topics(item, topics)
+        if any(counts[topic] < size for topic in belongs):
+            selected.append(item)
+            for topic in belongs:
+                counts[topic] += 1
+    return selected
+
+
+class TopicViews:
+    """Per-topic tickers and encoded payloads cut from one shared snapshot"""
+
+    def __init__(self, topics, size=5):
+        """
+        Args:
+            topics: Topic names; the first one is served when no topic is asked for
+            size: Headlines per topic ticker
+        """
+        self.topics = list(topics)
+        self.size = size
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._views = {}
+        self._payloads = {topic: PayloadCache() for topic in self.topics}
+
+    @property
+    def default(self):
+        return self.topics[0]
+
+    def resolve(self, name):
+        """Configured topic matching name (case-insensitive), the default for None"""
+        if name is None:
+            return self.default
+        for topic in self.topics:
+            if topic.lower() == name.strip().lower():
+                return topic
+        return None
+
+    def view(self, snapshot, topic):
+        """A topic's ticker, split from the snapshot once for all topics"""
+        with self._lock:
+            if snapshot is not self._snapshot:
+                self._views = self._split(snapshot)
+                self._snapshot = snapshot
+            return self._views[topic]
+
+    def payload(self, snapshot, topic):
+        """Encoded payload of a topic's ticker, re-encoded only when it changes"""
+        return self._payloads[topic].get(self.view(snapshot, topic))
+
+    def _split(self, snapshot):
+        if len(self.topics) == 1:
+            # A single topic is served the snapshot itself
+            return {self.default: snapshot}
+        views = {topic: [] for topic in self.topics}
+        for item in snapshot:
+            for topic in item_topics(item, self.topics):
+                if len(views[topic]) < self.size:
+                    views[topic].append(item)
+        return views
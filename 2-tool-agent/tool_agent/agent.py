@@ -1,6 +1,18 @@
+import os
+
 from google.adk.agents import Agent
 from google.adk.tools import google_search
 
+from .search_cache import SearchCache, default_path
+
+# Reuse answers to repeated searches for SEARCH_CACHE_TTL seconds, from this
+# example's own cache file
+search_cache = SearchCache(
+    os.getenv("SEARCH_CACHE_PATH", default_path("2-tool-agent")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "600")),
+    max_entries=int(os.getenv("SEARCH_CACHE_SIZE", "500")),
+)
+
 # def get_current_time() -> dict:
 #     """
 #     Get the current time in the format YYYY-MM-DD HH:MM:SS
@@ -18,6 +30,8 @@ root_agent = Agent(
     - google_search
     """,
     tools=[google_search],
+    before_model_callback=search_cache.before_model_callback,
+    after_model_callback=search_cache.after_model_callback,
     # tools=[get_current_time],
     # tools=[google_search, get_current_time], # <--- Doesn't work
 )
@@ -1,6 +1,18 @@
+import os
+
 from google.adk.agents import Agent
 from google.adk.tools import google_search
 
+from ...tools.search_cache import SearchCache, default_path
+
+# Reuse answers to repeated searches for SEARCH_CACHE_TTL seconds, from this
+# example's own cache file
+search_cache = SearchCache(
+    os.getenv("SEARCH_CACHE_PATH", default_path("7-multi-agent")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "600")),
+    max_entries=int(os.getenv("SEARCH_CACHE_SIZE", "500")),
+)
+
 news_analyst = Agent(
     name="news_analyst",
     model="gemini-2.0-flash",
@@ -13,4 +25,6 @@ news_analyst = Agent(
     If the user ask for news using a relative time, you should use the get_current_time tool to get the current time to use in the search query.
     """,
     tools=[google_search],
+    before_model_callback=search_cache.before_model_callback,
+    after_model_callback=search_cache.after_model_callback,
 )